@@ -0,0 +1,94 @@
+import os
+import random
+import argparse
+from typing import List
+
+from reportlab.lib.pagesizes import LETTER
+from reportlab.pdfgen import canvas
+
+TITLES = ["Market Opportunity", "Traction", "Financials", "Competition", "Team", "Go To Market", "Product", "Roadmap"]
+
+# Every claim carries at least one figure; filler text never does (see fakes.FakeLLMClient)
+CLAIM_TEMPLATES = [
+    "The {sector} market is projected to reach ${size}B by {year}.",
+    "We grew revenue to ${arr}M ARR with {growth}% year over year growth.",
+    "We serve {users}k monthly active users across {regions} regions.",
+    "Gross margin reached {margin}% in {year}.",
+    "We signed {contracts} enterprise contracts worth ${acv}k each.",
+    "Customer acquisition cost fell {cac}% while retention held at {retention}%.",
+]
+SECTORS = ["waste management", "logistics", "cloud security", "agritech", "devtools", "healthcare software"]
+FILLER = (
+    "Our team combines deep domain expertise with a relentless focus on customers. "
+    "We believe the incumbents have underinvested in automation and data quality."
+)
+
+
+def make_claims(count: int, rng: random.Random) -> List[str]:
+    claims = []
+    for i in range(count):
+        template = CLAIM_TEMPLATES[i % len(CLAIM_TEMPLATES)]
+        claims.append(template.format(
+            sector=rng.choice(SECTORS),
+            size=rng.randint(2, 900) + i,
+            year=rng.randint(2026, 2035),
+            arr=rng.randint(1, 40) + i,
+            growth=rng.randint(20, 400),
+            users=rng.randint(5, 900) + i,
+            regions=rng.randint(2, 30),
+            margin=rng.randint(30, 90),
+            contracts=rng.randint(3, 80) + i,
+            acv=rng.randint(20, 500),
+            cac=rng.randint(5, 60),
+            retention=rng.randint(70, 99)
+        ))
+    return claims
+
+
+def generate_deck(filename: str, pages: int = 10, claims: int = 8, seed: int = 0) -> List[str]:
+    """
+    Writes an N-page deck with M claims spread evenly over its pages.
+    Returns the claim statements in page order.
+    """
+    rng = random.Random(seed)
+    statements = make_claims(claims, rng)
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    c = canvas.Canvas(filename, pagesize=LETTER)
+    width, height = LETTER
+
+    # Title Page
+    c.setFont("Helvetica-Bold", 24)
+    c.drawCentredString(width / 2, height - 200, "Benchmark Startup")
+    c.showPage()
+
+    content_pages = max(1, pages - 1)
+    for page_index in range(content_pages):
+        c.setFont("Helvetica-Bold", 18)
+        c.drawString(72, height - 100, TITLES[page_index % len(TITLES)])
+        c.setFont("Helvetica", 11)
+        y = height - 130
+        for sentence in FILLER.split(". "):
+            c.drawString(72, y, sentence.strip(". ") + ".")
+            y -= 18
+        for statement in statements[page_index::content_pages]:
+            c.drawString(72, y, statement)
+            y -= 18
+        c.showPage()
+
+    c.save()
+    return statements
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic pitch deck for benchmarking")
+    parser.add_argument("--output", default="data/samples/benchmark_deck.pdf")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--claims", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate_deck(args.output, args.pages, args.claims, args.seed)
+    print(f"Created {args.output}")
@@ -0,0 +1,159 @@
+import re
+import json
+import time
+import random
+import asyncio
+import threading
+from typing import List, Dict, Any, Optional, Iterator
+
+from src.utils.llm_client import LLMClient
+from src.utils.model_router import ModelRouter
+from src.utils.prompt_budget import count_tokens
+from src.utils import metrics
+
+PAGE_MARKER = re.compile(r"^\[Page (\d+)\]")
+
+
+class LatencyProfile:
+    """
+    Log-normal latency around `median_ms` (spread set by `sigma`) plus a failure probability.
+    Sampling is seeded so runs with the same settings are comparable.
+    """
+    def __init__(self, median_ms: float = 0.0, sigma: float = 0.5, failure_rate: float = 0.0, seed: int = 0):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> tuple:
+        """Returns (delay_seconds, should_fail)."""
+        with self._lock:
+            delay = self.median_ms * self._rng.lognormvariate(0, self.sigma) / 1000 if self.median_ms > 0 else 0.0
+            return delay, self._rng.random() < self.failure_rate
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"median_ms": self.median_ms, "sigma": self.sigma, "failure_rate": self.failure_rate}
+
+
+class FakeLLMClient(LLMClient):
+    """
+    Offline LLM stand-in. Claim extraction returns every deck line that carries a figure
+    (see deck_generator); other prompts reuse LLMClient's mock responses.
+    `profiles` overrides the default latency per call site. Calls go through the
+    configured model routes (SAGO_MODEL_ROUTES), so `route_stats` reports them.
+    """
+    def __init__(self, default: Optional[LatencyProfile] = None, profiles: Optional[Dict[str, LatencyProfile]] = None,
+                 router: Optional[ModelRouter] = None):
+        super().__init__(router=router)
+        # Mock mode even when OPENAI_API_KEY is set
+        self.api_key = None
+        self.client = None
+        # Injected latency stands in for provider throttling, so no rate limiter
+        self.rate_limiter = None
+        self.cache = None
+        self.default = default or LatencyProfile()
+        self.profiles = profiles or {}
+        self.calls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    @property
+    def async_client(self):
+        return None
+
+    def chat_completion(self, messages: List[Dict[str, str]], json_mode: bool = False,
+                        use_cache: bool = True, call_site: str = "default") -> str:
+        delay, fail = self._begin(call_site)
+        time.sleep(delay)
+        return self._finish(messages, json_mode, call_site, delay, fail)
+
+    async def achat_completion(self, messages: List[Dict[str, str]], json_mode: bool = False,
+                               use_cache: bool = True, call_site: str = "default") -> str:
+        delay, fail = self._begin(call_site)
+        await asyncio.sleep(delay)
+        return self._finish(messages, json_mode, call_site, delay, fail)
+
+    def stream_chat_completion(self, messages: List[Dict[str, str]], json_mode: bool = False,
+                               use_cache: bool = True, call_site: str = "default") -> Iterator[str]:
+        """Spreads the injected latency evenly over the lines of the response."""
+        delay, fail = self._begin(call_site)
+        content = self._finish(messages, json_mode, call_site, delay, fail)
+        lines = content.splitlines(keepends=True) or [content]
+        for line in lines:
+            time.sleep(delay / len(lines))
+            yield line
+
+    def _begin(self, call_site: str) -> tuple:
+        with self._lock:
+            self.calls += 1
+        return self.profiles.get(call_site, self.default).sample()
+
+    def _finish(self, messages: List[Dict[str, str]], json_mode: bool, call_site: str,
+                delay: float, fail: bool) -> str:
+        route_name, _ = self.router.resolve(call_site)
+        model = self.router.select_model(route_name)
+        if fail:
+            with self._lock:
+                self.failures += 1
+            self.router.record(route_name, model, delay, "error")
+            metrics.record_llm_call(call_site, "error", delay)
+            raise RuntimeError(f"Injected LLM failure ({call_site})")
+
+        self.router.record(route_name, model, delay, "ok")
+
+        content = self._get_mock_response(messages, json_mode)
+        metrics.record_llm_call(
+            call_site, "api", delay,
+            prompt_tokens=sum(count_tokens(m.get("content") or "") for m in messages),
+            completion_tokens=count_tokens(content)
+        )
+        return content
+
+    def _get_mock_response(self, messages: List[Dict[str, str]], json_mode: bool) -> str:
+        if "extract specific, verifiable claims" in messages[0]["content"]:
+            # One field per line, so streamed extraction emits claims one by one
+            return json.dumps({"claims": self._claims_from_deck(messages[-1]["content"])}, indent=2)
+        return super()._get_mock_response(messages, json_mode)
+
+    @staticmethod
+    def _claims_from_deck(deck_text: str) -> List[Dict[str, Any]]:
+        claims = []
+        page = 1
+        for line in deck_text.splitlines():
+            line = line.strip()
+            marker = PAGE_MARKER.match(line)
+            if marker:
+                page = int(marker.group(1))
+                continue
+            if re.search(r"\d", line):
+                claims.append({"statement": line, "category": "Financials", "confidence_score": 0.9, "page": page})
+        return claims
+
+
+class FakeSearchClient:
+    """Offline SearchClient stand-in. Failures return no results, as SearchClient does."""
+    def __init__(self, profile: Optional[LatencyProfile] = None):
+        self.profile = profile or LatencyProfile()
+        self.calls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
+        with self._lock:
+            self.calls += 1
+        delay, fail = self.profile.sample()
+        time.sleep(delay)
+        if fail:
+            with self._lock:
+                self.failures += 1
+            metrics.record_search("error", delay)
+            return []
+        metrics.record_search("network", delay)
+        return [
+            {"title": f"Result {i + 1} for {query}", "href": f"https://example.com/{i}", "body": f"Report covering {query}."}
+            for i in range(max_results)
+        ]
+
+    def close(self):
+        pass
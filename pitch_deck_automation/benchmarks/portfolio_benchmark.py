@@ -0,0 +1,93 @@
+"""
+Portfolio lookups at scale: index build, conflict scans over a whole deck and context rendering.
+
+    python -m benchmarks.portfolio_benchmark --companies 10000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from typing import List, Dict, Any, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.analysis.portfolio_manager import PortfolioManager
+from benchmarks.deck_generator import SECTORS, FILLER, make_claims
+
+WORDS = ["robotics", "ledger", "sensor", "payments", "compliance", "fleet", "genomics", "battery", "vision",
+         "carbon", "freight", "identity", "billing", "warehouse", "imaging", "tutoring", "insurance", "quantum"]
+
+
+def make_companies(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    companies = []
+    for i in range(count):
+        first, second = rng.sample(WORDS, 2)
+        companies.append({
+            "name": f"{first.title()}{second.title()}{i}",
+            "sector": rng.choice(SECTORS),
+            "description": f"{first} and {second} software for {rng.choice(SECTORS)} teams",
+            "aliases": [f"{first}{second}{i}"],
+            "keywords": [f"{first} {second} {i}"]
+        })
+    return companies
+
+
+def make_deck_text(pages: int, rng: random.Random) -> str:
+    claims = make_claims(pages * 2, rng)
+    return "\f".join(f"{FILLER}\n{claims[2 * p]}\n{claims[2 * p + 1]}" for p in range(pages))
+
+
+def naive_conflicts(companies: List[Dict[str, Any]], text: str) -> List[str]:
+    """The old approach, extended to every term: one lowercase substring scan per term per company."""
+    lowered = text.lower()
+    found = []
+    for co in companies:
+        terms = [co["name"], co["sector"], *co.get("aliases", []), *co.get("keywords", [])]
+        if any(term.lower() in lowered for term in terms):
+            found.append(co["name"])
+    return found
+
+
+def timed(fn, repeat: int = 1) -> float:
+    """Mean milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Portfolio matcher and context benchmark")
+    parser.add_argument("--companies", type=int, default=10000)
+    parser.add_argument("--deck-pages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    companies = make_companies(args.companies, rng)
+    deck = make_deck_text(args.deck_pages, rng)
+
+    with tempfile.TemporaryDirectory(prefix="sago_portfolio_") as workdir:
+        pm = PortfolioManager(index_path=os.path.join(workdir, "portfolio"))
+        results = {
+            "add_companies_ms": timed(lambda: pm.add_companies(companies)),
+            "matcher_build_ms": timed(lambda: pm.find_conflicts("")),
+            "find_conflicts_ms": timed(lambda: pm.find_conflicts(deck), args.repeat),
+            "naive_conflicts_ms": timed(lambda: naive_conflicts(pm.portfolio_companies, deck), args.repeat),
+            "context_cold_ms": timed(lambda: pm.get_context(query_text=deck)),
+            "context_memoized_ms": timed(lambda: pm.get_context(query_text=deck), args.repeat),
+            "save_ms": timed(pm.save),
+            "load_ms": timed(lambda: PortfolioManager(index_path=os.path.join(workdir, "portfolio")))
+        }
+        conflicts = len(pm.find_conflicts(deck))
+
+    print(f"companies={len(companies)} deck_chars={len(deck)} conflicts={conflicts}")
+    for name, value in results.items():
+        print(f"{name:<22}{value:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Offline throughput benchmark for the analysis pipeline.
+
+Runs AgentOrchestrator.run directly and through SagoSystem's worker pool against
+latency-injecting LLM and search stand-ins, then reports decks/min, latency
+percentiles and calls per deck. Needs no network access.
+
+    python -m benchmarks.run_benchmark --decks 20 --llm-latency-ms 800 --search-latency-ms 300
+    python -m benchmarks.run_benchmark --save-baseline
+    python -m benchmarks.run_benchmark --compare
+"""
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.main import AgentOrchestrator
+from src.core import SagoSystem
+from src.integrations.slack_connector import SlackIntegration
+from src.utils.idempotency import IdempotencyStore
+from benchmarks.deck_generator import generate_deck
+from benchmarks.fakes import FakeLLMClient, FakeSearchClient, LatencyProfile
+
+logger = logging.getLogger("SagoBenchmark")
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+MODES = ("orchestrator", "system")
+
+
+class NullDB:
+    """Stands in for DBClient so the benchmark neither needs nor waits on MongoDB."""
+    def __init__(self, *args, **kwargs):
+        self.saved = 0
+
+    def save_analysis(self, metadata: Dict[str, Any], claims: list, report: str) -> bool:
+        self.saved += 1
+        return True
+
+    def find_recent_analysis(self, fingerprint: str, max_age_seconds: float) -> Optional[Dict[str, Any]]:
+        return None
+
+    def close(self):
+        pass
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@contextmanager
+def offline_components(llm: FakeLLMClient, search: FakeSearchClient):
+    """Orchestrators built inside use the fakes and never touch MongoDB or the real API clients."""
+    # The cross-deck verdict store would turn repeat runs into cache hits
+    with patch("src.main.DBClient", NullDB), patch("src.main.ClaimVerificationStore.from_env", return_value=None), \
+            patch("src.main.LLMClient", return_value=llm), patch("src.main.SearchClient", return_value=search):
+        yield
+
+
+def build_orchestrator(llm: FakeLLMClient, search: FakeSearchClient, args: argparse.Namespace) -> AgentOrchestrator:
+    with offline_components(llm, search):
+        return AgentOrchestrator(**orchestrator_options(args))
+
+
+def orchestrator_options(args: argparse.Namespace) -> Dict[str, Any]:
+    return {"max_concurrency": args.concurrency, "batch_size": args.batch_size, "reuse_max_age_hours": 0,
+            "pipeline": args.pipeline}
+
+
+class BenchSlack(SlackIntegration):
+    """Slack connector that receives nothing and only counts the replies it is asked to post."""
+    def __init__(self):
+        self.replies = 0
+        self.updates = 0
+
+    def listen(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    def start_reply(self, destination: str, content: str) -> Dict[str, str]:
+        self.replies += 1
+        return {"channel": destination, "ts": str(self.replies)}
+
+    def update_reply(self, handle: Dict[str, str], content: str) -> bool:
+        self.updates += 1
+        return True
+
+    def send_reply(self, destination: str, content: str) -> bool:
+        self.replies += 1
+        return True
+
+
+def summarize(mode: str, latencies: List[float], elapsed: float, decks: int, errors: int,
+              llm: FakeLLMClient, search: FakeSearchClient) -> Dict[str, Any]:
+    return {
+        "mode": mode,
+        "decks": decks,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "decks_per_min": round(decks / elapsed * 60, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1)
+        },
+        "llm_calls_per_deck": round(llm.calls / decks, 2) if decks else 0.0,
+        "search_calls_per_deck": round(search.calls / decks, 2) if decks else 0.0,
+        "llm_failures": llm.failures,
+        "search_failures": search.failures,
+        "llm_routes": llm.route_stats()
+    }
+
+
+def run_orchestrator_mode(deck_paths: List[str], args: argparse.Namespace) -> Dict[str, Any]:
+    """Runs `args.decks` analyses on `args.parallel_runs` threads sharing one orchestrator."""
+    llm, search = make_fakes(args)
+    orchestrator = build_orchestrator(llm, search, args)
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def analyze(index: int):
+        nonlocal errors
+        started = time.perf_counter()
+        result = orchestrator.run(deck_paths[index % len(deck_paths)], user_context={"user_id": "bench", "source": "cli"})
+        with lock:
+            latencies.append(time.perf_counter() - started)
+            if result["status"] != "success":
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.parallel_runs) as pool:
+        list(pool.map(analyze, range(args.decks)))
+    elapsed = time.perf_counter() - started
+    orchestrator.close()
+    return summarize("orchestrator", latencies, elapsed, args.decks, errors, llm, search)
+
+
+def run_system_mode(deck_paths: List[str], args: argparse.Namespace, workdir: str) -> Dict[str, Any]:
+    """
+    Pushes `args.decks` Slack events through SagoSystem's queue and its real event path
+    (reply routing, streamed updates, limits). Latency includes time spent queued.
+    """
+    llm, search = make_fakes(args)
+    # Connectors are never polled here, so the Gmail one stays idle
+    with offline_components(llm, search), patch("src.core.SlackIntegration", BenchSlack), \
+            patch("src.core.AgentOrchestrator", lambda: AgentOrchestrator(**orchestrator_options(args))):
+        system = SagoSystem(
+            num_workers=args.parallel_runs,
+            idempotency_store=IdempotencyStore(os.path.join(workdir, "seen_events.sqlite"))
+        )
+
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    run, process_event = system.orchestrator.run, system._process_event
+
+    def counted_run(*run_args, **kwargs) -> Dict[str, Any]:
+        nonlocal errors
+        result = run(*run_args, **kwargs)
+        if result["status"] != "success":
+            with lock:
+                errors += 1
+        return result
+
+    def timed_process_event(event: Dict[str, Any]):
+        try:
+            process_event(event)
+        finally:
+            with lock:
+                latencies.append(time.perf_counter() - event["enqueued_at"])
+
+    system.orchestrator.run = counted_run
+    system._process_event = timed_process_event
+
+    system.is_running = True
+    system._accepting = True
+    system._start_workers()
+    started = time.perf_counter()
+    for i in range(args.decks):
+        system.enqueue({
+            "source": "slack",
+            "sender": "bench",
+            "channel_id": "C-bench",
+            "message_id": f"bench-{started}-{i}",
+            "attachment_path": deck_paths[i % len(deck_paths)],
+            "enqueued_at": time.perf_counter()
+        })
+    system.event_queue.join()
+    elapsed = time.perf_counter() - started
+    system.stop()
+    return summarize("system", latencies, elapsed, args.decks, errors, llm, search)
+
+
+def make_fakes(args: argparse.Namespace):
+    llm = FakeLLMClient(
+        default=LatencyProfile(args.llm_latency_ms, args.latency_sigma, args.llm_failure_rate, seed=args.seed)
+    )
+    search = FakeSearchClient(
+        LatencyProfile(args.search_latency_ms, args.latency_sigma, args.search_failure_rate, seed=args.seed + 1)
+    )
+    return llm, search
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Returns a description of every metric that regressed by more than `tolerance` (a fraction)."""
+    if baseline.get("config") != results["config"]:
+        logger.warning("Baseline was recorded with a different configuration; comparison may be misleading.")
+
+    regressions = []
+    for mode, current in results["modes"].items():
+        reference = baseline.get("modes", {}).get(mode)
+        if not reference:
+            continue
+        if current["decks_per_min"] < reference["decks_per_min"] * (1 - tolerance):
+            regressions.append(f"{mode}: decks/min {current['decks_per_min']} < baseline {reference['decks_per_min']}")
+        for key in ("p95", "p99"):
+            if current["latency_ms"][key] > reference["latency_ms"][key] * (1 + tolerance):
+                regressions.append(f"{mode}: {key} {current['latency_ms'][key]}ms > baseline {reference['latency_ms'][key]}ms")
+        for key in ("llm_calls_per_deck", "search_calls_per_deck"):
+            if current[key] > reference[key] * (1 + tolerance):
+                regressions.append(f"{mode}: {key} {current[key]} > baseline {reference[key]}")
+    return regressions
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    modes = MODES if args.mode == "both" else (args.mode,)
+    # Portfolio index and other local caches go to the scratch directory, not .sago_cache
+    with tempfile.TemporaryDirectory(prefix="sago_bench_") as workdir, patch.dict(os.environ, {"SAGO_CACHE_DIR": workdir}):
+        deck_paths = [
+            os.path.join(workdir, f"deck_{i}.pdf")
+            for i in range(min(args.decks, args.distinct_decks))
+        ]
+        for i, path in enumerate(deck_paths):
+            generate_deck(path, pages=args.pages, claims=args.claims, seed=args.seed + i)
+
+        results = {"config": config_of(args), "modes": {}}
+        for mode in modes:
+            if mode == "orchestrator":
+                results["modes"][mode] = run_orchestrator_mode(deck_paths, args)
+            else:
+                results["modes"][mode] = run_system_mode(deck_paths, args, workdir)
+    return results
+
+
+def config_of(args: argparse.Namespace) -> Dict[str, Any]:
+    keys = ("decks", "distinct_decks", "pages", "claims", "parallel_runs", "concurrency", "batch_size", "pipeline",
+            "llm_latency_ms", "llm_failure_rate", "search_latency_ms", "search_failure_rate", "latency_sigma", "seed")
+    return {key: getattr(args, key) for key in keys}
+
+
+def print_report(results: Dict[str, Any]):
+    print(f"{'mode':<14}{'decks/min':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'llm/deck':>10}{'search/deck':>12}{'errors':>8}")
+    for mode, r in results["modes"].items():
+        print(
+            f"{mode:<14}{r['decks_per_min']:>10}{r['latency_ms']['p50']:>10}{r['latency_ms']['p95']:>10}"
+            f"{r['latency_ms']['p99']:>10}{r['llm_calls_per_deck']:>10}{r['search_calls_per_deck']:>12}{r['errors']:>8}"
+        )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline Sago pipeline benchmark")
+    parser.add_argument("--mode", choices=MODES + ("both",), default="both")
+    parser.add_argument("--decks", type=int, default=20, help="Analyses to run")
+    parser.add_argument("--distinct-decks", type=int, default=4, help="Distinct generated decks to rotate through")
+    parser.add_argument("--pages", type=int, default=12)
+    parser.add_argument("--claims", type=int, default=10)
+    parser.add_argument("--parallel-runs", type=int, default=2, help="Decks analyzed at once (SagoSystem workers)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Claims verified in parallel per deck")
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Verify claims while extraction is still running (one extra LLM call per extra batch)")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="Median injected LLM latency")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--search-latency-ms", type=float, default=100.0, help="Median injected search latency")
+    parser.add_argument("--search-failure-rate", type=float, default=0.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread of injected latency")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save-baseline", action="store_true", help=f"Write results to {BASELINE_PATH}")
+    parser.add_argument("--compare", action="store_true", help="Compare against the saved baseline; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed regression as a fraction of the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--output", help="Also write results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    results = run_benchmark(args)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Cold-start benchmark: time to import the pipeline and construct an AgentOrchestrator in a
+fresh interpreter, with MongoDB and the LLM API unreachable.
+
+    python -m benchmarks.startup_benchmark --runs 5
+    python -m benchmarks.startup_benchmark --max-ms 1000   # exit 1 if the median is slower
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import statistics
+from typing import List, Dict, Any, Optional
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Runs in the child interpreter; everything it reports is measured in-process
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from src.main import AgentOrchestrator
+imported = time.perf_counter()
+# Taken before construction, which starts connecting to Mongo (and importing pymongo) in the background
+modules = sorted(m for m in ("openai", "pypdf", "pymongo", "duckduckgo_search") if m in sys.modules)
+orchestrator = AgentOrchestrator()
+constructed = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "construct_ms": (constructed - imported) * 1000,
+    "heavy_modules_imported": modules
+}))
+"""
+
+
+def probe_once(workdir: str) -> Dict[str, Any]:
+    env = {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "SAGO_CACHE_DIR": workdir,
+        # Nothing listens on port 1, so every service is unreachable
+        "MONGO_URI": "mongodb://127.0.0.1:1/",
+        "OPENAI_API_KEY": "sk-startup-benchmark",
+        "SAGO_METRICS_PORT": "0",
+    }
+    # The orchestrator's close() would wait on the background Mongo check; the probe exits without it
+    output = subprocess.run([sys.executable, "-c", PROBE], env=env, cwd=workdir,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_startup_benchmark(runs: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="sago_startup_") as workdir:
+        samples = [probe_once(workdir) for _ in range(runs)]
+    totals = [s["import_ms"] + s["construct_ms"] for s in samples]
+    return {
+        "runs": runs,
+        "import_ms_median": round(statistics.median(s["import_ms"] for s in samples), 1),
+        "construct_ms_median": round(statistics.median(s["construct_ms"] for s in samples), 1),
+        "total_ms_median": round(statistics.median(totals), 1),
+        "total_ms_max": round(max(totals), 1),
+        "heavy_modules_imported": samples[-1]["heavy_modules_imported"]
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Orchestrator cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the median import + construct time exceeds this")
+    args = parser.parse_args(argv)
+
+    results = run_startup_benchmark(args.runs)
+    print(json.dumps(results, indent=2))
+    if args.max_ms is not None and results["total_ms_median"] > args.max_ms:
+        print(f"Median cold start {results['total_ms_median']}ms exceeds {args.max_ms}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,133 @@
-import json
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 from ..utils.llm_client import LLMClient
+from ..utils.prompt_budget import compact_claims, fit_text
+from ..utils import metrics
 
 logger = logging.getLogger(__name__)
 
+REPORT_ERROR = "Error generating report."
+REPORT_INTERRUPTED = "_Report generation was interrupted._"
+
+
+def report_failed(report: Any) -> bool:
+    """True for a report whose generation failed or was cut short; such reports are not stored."""
+    return not isinstance(report, str) or report.startswith(REPORT_ERROR) or REPORT_INTERRUPTED in report
+
+
 class Analyst:
-    def __init__(self, llm_client: LLMClient):
+    def __init__(self, llm_client: LLMClient, claims_token_budget: int = 3000, context_token_budget: int = 1500):
         self.llm = llm_client
+        self.claims_token_budget = claims_token_budget
+        self.context_token_budget = context_token_budget
 
     def generate_report(self, processed_claims: List[Dict[str, Any]], portfolio_context: str = "") -> str:
         logger.info("Generating final analyst report...")
-        
-        claims_summary = json.dumps(processed_claims, indent=2)
-        
+
+        try:
+            report = self.llm.chat_completion(
+                messages=self._build_messages(processed_claims, portfolio_context),
+                json_mode=False,
+                call_site="report"
+            )
+            return report + self._reused_verdicts_section(processed_claims)
+        except Exception as e:
+            logger.error(f"Report generation failed: {e}")
+            return REPORT_ERROR
+
+    async def agenerate_report(self, processed_claims: List[Dict[str, Any]], portfolio_context: str = "") -> str:
+        """Async variant of `generate_report` using `LLMClient.achat_completion`."""
+        logger.info("Generating final analyst report...")
+
+        try:
+            report = await self.llm.achat_completion(
+                messages=self._build_messages(processed_claims, portfolio_context),
+                json_mode=False,
+                call_site="report"
+            )
+            return report + self._reused_verdicts_section(processed_claims)
+        except Exception as e:
+            logger.error(f"Report generation failed: {e}")
+            return REPORT_ERROR
+
+    def stream_report(self, processed_claims: List[Dict[str, Any]], portfolio_context: str = "") -> Iterator[str]:
+        """
+        Streaming variant of `generate_report`: yields the memo one markdown section at a time,
+        as soon as the model has finished writing it. The sections concatenate to the full report.
+        """
+        logger.info("Streaming final analyst report...")
+        buffer = ""
+        emitted = False
+        try:
+            for chunk in self.llm.stream_chat_completion(
+                messages=self._build_messages(processed_claims, portfolio_context),
+                call_site="report"
+            ):
+                buffer += chunk
+                # A heading at the start of a line closes the section before it
+                while True:
+                    boundary = self._next_heading(buffer)
+                    if boundary is None:
+                        break
+                    section, buffer = buffer[:boundary], buffer[boundary:]
+                    if section.strip():
+                        emitted = True
+                        yield section
+        except Exception as e:
+            logger.error(f"Report generation failed: {e}")
+            if not emitted:
+                yield REPORT_ERROR
+                return
+            buffer += f"\n\n{REPORT_INTERRUPTED}\n"
+
+        yield buffer + self._reused_verdicts_section(processed_claims)
+
+    @staticmethod
+    def _next_heading(text: str) -> Optional[int]:
+        """Offset of the first line starting with '#' after the opening line, or None."""
+        offset = text.find("\n#", 1)
+        while offset != -1:
+            if text[:offset].strip():
+                return offset + 1
+            offset = text.find("\n#", offset + 1)
+        return None
+
+    @staticmethod
+    def verdict_table(processed_claims: List[Dict[str, Any]]) -> str:
+        """Markdown table of claim verdicts, sent to the user before the memo is ready."""
+        rows = ["## Claim Verdicts", "", "| # | Claim | Verdict | Sources |", "|---|---|---|---|"]
+        for i, claim in enumerate(processed_claims, 1):
+            statement = str(claim.get("statement", "")).replace("|", "\\|").replace("\n", " ")
+            status = claim.get("verification_status", "Unknown")
+            if claim.get("reused_verdict"):
+                status += " (reused)"
+            rows.append(f"| {i} | {statement} | {status} | {len(claim.get('sources') or [])} |")
+        if not processed_claims:
+            rows.append("| - | No verifiable claims found | - | - |")
+        return "\n".join(rows) + "\n"
+
+    @staticmethod
+    def _reused_verdicts_section(processed_claims: List[Dict[str, Any]]) -> str:
+        """Lists verdicts taken from earlier analyses rather than verified for this deck."""
+        reused = [c for c in processed_claims if c.get("reused_verdict")]
+        if not reused:
+            return ""
+        lines = [
+            f"- {c.get('statement')} -> **{c.get('verification_status')}** "
+            f"(verified {c.get('verified_at')} for: \"{c.get('matched_statement')}\")"
+            for c in reused
+        ]
+        return "\n\n## Reused Verdicts\nThese verdicts come from earlier analyses of matching claims and were not re-checked:\n" + "\n".join(lines) + "\n"
+
+    def _build_messages(self, processed_claims: List[Dict[str, Any]], portfolio_context: str) -> List[Dict[str, str]]:
+        claims_summary, stats = compact_claims(processed_claims, self.claims_token_budget)
+        logger.info(
+            f"Claims prompt: {stats['final_tokens']} tokens "
+            f"(saved {stats['saved_tokens']} of {stats['original_tokens']})"
+        )
+        metrics.PROMPT_TOKENS_SAVED.inc(stats['saved_tokens'], call_site="report")
+        portfolio_context = fit_text(portfolio_context, self.context_token_budget, label="portfolio context")
+
         prompt = (
             "You are a Senior Partner at Sago Ventures. generating an investment memo.\n"
             "Your Goal: Determine if this opportunity matches our specific Investment Thesis and Portfolio Strategy.\n\n"
@@ -24,19 +138,11 @@ class Analyst:
             "2. **Portfolio Check**: Identify potential conflicts or synergies with existing portfolio companies listed above.\n"
             "3. **Risk Analysis**: Summarize the verification findings (Red Flags/Contradictions).\n"
             "4. **Strategic Questions**: 3-5 sharp questions for the founder, specifically addressing Thesis Fit and Portfolio conflicts if any.\n"
-            "   - **IMPORTANT**: If a specific claim in the question was 'Unverified' or 'Inconclusive', you MUST prefix that part of the question with **[UNVERIFIED CLAIM]**.\n\n"
+            "   - **IMPORTANT**: If a specific claim in the question was 'Unverified', 'Inconclusive' or 'Not checked (budget)', you MUST prefix that part of the question with **[UNVERIFIED CLAIM]**.\n\n"
             "Output Format: Professional Markdown Memo."
         )
 
-        try:
-            response = self.llm.chat_completion(
-                messages=[
-                    {"role": "system", "content": "You are a VC Partner at Sago Ventures."}, 
-                    {"role": "user", "content": prompt}
-                ],
-                json_mode=False
-            )
-            return response
-        except Exception as e:
-            logger.error(f"Report generation failed: {e}")
-            return "Error generating report."
+        return [
+            {"role": "system", "content": "You are a VC Partner at Sago Ventures."},
+            {"role": "user", "content": prompt}
+        ]
@@ -1,17 +1,268 @@
+import re
 import json
+import asyncio
 import logging
-from typing import List, Dict
+import threading
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+from typing import List, Dict, Any, Tuple, Callable, Optional
 from ..utils.llm_client import LLMClient
+from ..utils.prompt_budget import count_tokens, truncate_to_tokens
+from ..utils import metrics
+from ..ingestion.pdf_processor import PAGE_BREAK
 
 logger = logging.getLogger(__name__)
 
+# Statements at least this similar (after normalization) are treated as the same claim
+DUPLICATE_SIMILARITY = 0.9
+
+# A figure with its currency sign, magnitude suffix or word, and percent sign
+FIGURE = re.compile(
+    r"(\$)?\s*(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)\s*"
+    r"(thousand|million|billion|trillion|bn|tn|[kmbt]\b)?\s*(%|percent\b)?",
+    re.IGNORECASE
+)
+MAGNITUDES = {
+    "k": 10 ** 3, "thousand": 10 ** 3,
+    "m": 10 ** 6, "million": 10 ** 6,
+    "b": 10 ** 9, "bn": 10 ** 9, "billion": 10 ** 9,
+    "t": 10 ** 12, "tn": 10 ** 12, "trillion": 10 ** 12
+}
+
+
+def normalize_statement(statement: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9$%.]+", statement.lower())).strip(" .")
+
+
+def extract_numbers(statement: str) -> List[str]:
+    """
+    Figures in `statement` with magnitude and unit applied, so "$2B" and "$2 billion"
+    both give "$2000000000" while "$2T" does not. Percentages keep their "%".
+    """
+    figures = []
+    for currency, number, magnitude, percent in FIGURE.findall(statement):
+        value = Decimal(number.replace(",", "")) * MAGNITUDES.get(magnitude.lower(), 1)
+        figures.append(f"{currency}{value.normalize():f}{'%' if percent else ''}")
+    return figures
+
+
+def is_near_duplicate(a: str, b: str) -> bool:
+    """Near-identical wording with the same figures. '$2T' and '$2000T' are different claims."""
+    if extract_numbers(a) != extract_numbers(b):
+        return False
+    norm_a, norm_b = normalize_statement(a), normalize_statement(b)
+    return norm_a == norm_b or SequenceMatcher(None, norm_a, norm_b).ratio() >= DUPLICATE_SIMILARITY
+
+
+def merge_claims(claim_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Flattens per-chunk claims in chunk order, dropping near-duplicates.
+    The first occurrence is kept, with the highest confidence seen for it.
+    """
+    merged: List[Dict[str, Any]] = []
+    for claims in claim_lists:
+        for claim in claims:
+            statement = claim.get("statement")
+            if not statement:
+                continue
+            existing = next((m for m in merged if is_near_duplicate(m["statement"], statement)), None)
+            if existing is None:
+                merged.append(claim)
+            elif claim.get("confidence_score", 0) > existing.get("confidence_score", 0):
+                existing["confidence_score"] = claim["confidence_score"]
+    return merged
+
+
+class StreamingClaimParser:
+    """
+    Incremental parser for the extractor's {"claims": [...]} JSON.
+    `feed` takes the next piece of a streamed completion and returns every claim object
+    that was closed in it; the rest of the document is only scanned, not parsed.
+    """
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._in_claims = False
+        self._object_start = -1
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self.text += chunk
+        text = self.text
+        closed = []
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = text[self._string_start:i + 1]
+            elif char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in "{[":
+                self._depth += 1
+                # Depth 1 is the top-level object, 2 the claims array, 3 a claim
+                if char == "[" and self._depth == 2 and self._last_key == '"claims"':
+                    self._in_claims = True
+                elif char == "{" and self._in_claims and self._depth == 3:
+                    self._object_start = i
+            elif char in "}]":
+                if char == "}" and self._in_claims and self._depth == 3 and self._object_start >= 0:
+                    try:
+                        claim = json.loads(text[self._object_start:i + 1])
+                        if isinstance(claim, dict):
+                            closed.append(claim)
+                    except ValueError:
+                        pass
+                    self._object_start = -1
+                elif char == "]" and self._in_claims and self._depth == 2:
+                    self._in_claims = False
+                self._depth -= 1
+        self._pos = len(text)
+        return closed
+
+
 class ClaimExtractor:
-    def __init__(self, llm_client: LLMClient):
+    def __init__(self, llm_client: LLMClient, chunk_tokens: int = 3000, max_workers: int = 4):
         self.llm = llm_client
+        # Budget of deck text per extraction call
+        self.chunk_tokens = chunk_tokens
+        self.max_workers = max_workers
+
+    def extract_claims(self, text: str,
+                       on_claim: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Extracts and de-duplicates claims. If `on_claim` is given, completions are streamed and
+        each claim is passed to it as soon as its JSON object closes, before extraction finishes.
+        Streamed claims are provisional: the returned list is parsed from the full completions,
+        exactly as without `on_claim`, and may differ (e.g. a near-duplicate from an earlier chunk wins).
+        """
+        logger.info("Extracting claims from text...")
+
+        chunks = self._chunk_pages(text)
+        extract = self._extract_chunk
+        if on_claim is not None:
+            forward = self._forward_new(on_claim)
+            extract = lambda chunk: self._stream_chunk(chunk, forward)
+
+        if len(chunks) == 1:
+            return merge_claims([extract(chunks[0])])
+
+        logger.info(f"Extracting claims from {len(chunks)} chunks in parallel")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks)), thread_name_prefix="extractor") as pool:
+            futures = [metrics.submit(pool, extract, chunk) for chunk in chunks]
+            claim_lists = [future.result() for future in futures]
+        return merge_claims(claim_lists)
+
+    @staticmethod
+    def _forward_new(on_claim: Callable[[Dict[str, Any]], None]) -> Callable[[Dict[str, Any]], None]:
+        """Wraps `on_claim` so near-duplicates of claims already streamed (from any chunk) are skipped."""
+        seen: List[str] = []
+        lock = threading.Lock()
+
+        def forward(claim: Dict[str, Any]):
+            statement = claim.get("statement")
+            if not statement:
+                return
+            with lock:
+                if any(is_near_duplicate(s, statement) for s in seen):
+                    return
+                seen.append(statement)
+            on_claim(dict(claim))
+        return forward
+
+    def _stream_chunk(self, chunk: Tuple[int, int, str],
+                      on_claim: Callable[[Dict[str, Any]], None]) -> List[Dict[str, Any]]:
+        first_page, last_page, chunk_text = chunk
+        parser = StreamingClaimParser()
+        try:
+            for piece in self.llm.stream_chat_completion(
+                messages=self._build_messages(chunk_text),
+                json_mode=True,
+                call_site="claim_extraction"
+            ):
+                for claim in parser.feed(piece):
+                    self._set_source_page(claim, first_page, last_page)
+                    on_claim(claim)
+            return self._parse_claims(parser.text, first_page, last_page)
+        except Exception as e:
+            logger.error(f"Claim extraction failed for pages {first_page}-{last_page}: {str(e)}")
+            return []
 
-    def extract_claims(self, text: str) -> List[Dict[str, str]]:
+    async def aextract_claims(self, text: str) -> List[Dict[str, Any]]:
+        """Async variant of `extract_claims` using `LLMClient.achat_completion`."""
         logger.info("Extracting claims from text...")
-        
+
+        claim_lists = await asyncio.gather(*[self._aextract_chunk(chunk) for chunk in self._chunk_pages(text)])
+        return merge_claims(list(claim_lists))
+
+    def _extract_chunk(self, chunk: Tuple[int, int, str]) -> List[Dict[str, Any]]:
+        first_page, last_page, chunk_text = chunk
+        try:
+            response = self.llm.chat_completion(
+                messages=self._build_messages(chunk_text),
+                json_mode=True,
+                call_site="claim_extraction"
+            )
+            return self._parse_claims(response, first_page, last_page)
+        except Exception as e:
+            logger.error(f"Claim extraction failed for pages {first_page}-{last_page}: {str(e)}")
+            return []
+
+    async def _aextract_chunk(self, chunk: Tuple[int, int, str]) -> List[Dict[str, Any]]:
+        first_page, last_page, chunk_text = chunk
+        try:
+            response = await self.llm.achat_completion(
+                messages=self._build_messages(chunk_text),
+                json_mode=True,
+                call_site="claim_extraction"
+            )
+            return self._parse_claims(response, first_page, last_page)
+        except Exception as e:
+            logger.error(f"Claim extraction failed for pages {first_page}-{last_page}: {str(e)}")
+            return []
+
+    def _chunk_pages(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Packs consecutive pages into chunks of at most `chunk_tokens`, tagging each page
+        with a [Page N] marker. Returns (first_page, last_page, chunk_text) tuples.
+        A single page over budget is split into several chunks.
+        """
+        pieces: List[Tuple[int, str, int]] = []
+        for page_num, page_text in enumerate(text.split(PAGE_BREAK), start=1):
+            marker = f"[Page {page_num}]\n"
+            remaining = page_text.strip()
+            while remaining:
+                head = truncate_to_tokens(remaining, max(1, self.chunk_tokens - count_tokens(marker))) or remaining[:1]
+                remaining = remaining[len(head):]
+                piece = marker + head
+                pieces.append((page_num, piece, count_tokens(piece)))
+
+        chunks: List[Tuple[int, int, str]] = []
+        current: List[Tuple[int, str, int]] = []
+        size = 0
+        for page_num, piece, tokens in pieces:
+            if current and size + tokens > self.chunk_tokens:
+                chunks.append((current[0][0], current[-1][0], "\n\n".join(p for _, p, _ in current)))
+                current, size = [], 0
+            current.append((page_num, piece, tokens))
+            size += tokens
+        if current:
+            chunks.append((current[0][0], current[-1][0], "\n\n".join(p for _, p, _ in current)))
+
+        return chunks or [(1, 1, "")]
+
+    def _build_messages(self, text: str) -> List[Dict[str, str]]:
         system_prompt = (
             "You are a Diligent Investment Analyst. Your goal is to extract specific, verifiable claims "
             "from a pitch deck. Focus on: \n"
@@ -20,21 +271,26 @@ class ClaimExtractor:
             "3. Tractions (User numbers, partnerships, contracts)\n"
             "4. Competitors (Claims about being better/unique)\n"
             "Do NOT extract generic marketing fluff (e.g., 'We are the best').\n"
-            "Output JSON format: {'claims': [{'statement': 'We have 50k DAU', 'category': 'Traction', 'confidence_score': 0.9}]}"
+            "Pages are marked with [Page N]; report the page each claim appears on.\n"
+            "Output JSON format: {'claims': [{'statement': 'We have 50k DAU', 'category': 'Traction', 'confidence_score': 0.9, 'page': 3}]}"
         )
-        
-        user_prompt = f"Here is the pitch deck text:\n\n{text[:15000]}" 
 
-        try:
-            response = self.llm.chat_completion(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                json_mode=True
-            )
-            data = json.loads(response)
-            return data.get("claims", [])
-        except Exception as e:
-            logger.error(f"Claim extraction failed: {str(e)}")
-            return []
+        user_prompt = f"Here is the pitch deck text:\n\n{text}"
+
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    @staticmethod
+    def _parse_claims(response: str, first_page: int = 1, last_page: int = 1) -> List[Dict[str, Any]]:
+        data = json.loads(response)
+        claims = data.get("claims", [])
+        for claim in claims:
+            ClaimExtractor._set_source_page(claim, first_page, last_page)
+        return claims
+
+    @staticmethod
+    def _set_source_page(claim: Dict[str, Any], first_page: int, last_page: int):
+        page = claim.pop("page", None)
+        claim["source_page"] = page if isinstance(page, int) and first_page <= page <= last_page else first_page
@@ -0,0 +1,224 @@
+import os
+import re
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from .claim_extractor import normalize_statement, extract_numbers
+from ..utils.cache import cache_dir
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = {"a", "an", "the", "of", "in", "on", "by", "to", "for", "and", "or", "is", "are", "was", "were",
+             "will", "be", "our", "we", "its", "at", "with", "as", "that", "this"}
+
+# Only these verdicts are worth reusing; errors and failed searches are not
+REUSABLE_STATUSES = {"Verified", "Contradicted", "Inconclusive"}
+# Claims about the market rather than the company; a traction or financials claim from
+# another deck reads the same but is about a different company
+REUSABLE_CATEGORIES = {"Market Size", "Competitors"}
+
+NEGATION = re.compile(r"\b(?:not|no|never|none|nor|non|without|cannot)\b|n['’]t\b")
+
+_PRIME = (1 << 61) - 1
+
+
+def statement_tokens(statement: str) -> Set[str]:
+    return {t for t in normalize_statement(statement).split() if t not in STOPWORDS}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def count_negations(statement: str) -> int:
+    """Negation markers in `statement`. "The only company" and "not the only company" are opposite claims."""
+    return len(NEGATION.findall(statement.lower()))
+
+
+class MinHashLSH:
+    """
+    MinHash signatures over statement tokens, bucketed into LSH bands.
+    Statements whose token sets overlap strongly share at least one band with high probability,
+    so candidates are found without comparing against every stored statement.
+    """
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = {}
+
+    def signature(self, tokens: Set[str]) -> List[int]:
+        hashes = [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "big") for t in tokens] or [0]
+        return [min((a * h + b) % _PRIME for h in hashes) for a, b in self._perms]
+
+    def _band_keys(self, signature: List[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [(i, tuple(signature[i * self.rows:(i + 1) * self.rows])) for i in range(self.bands)]
+
+    def add(self, item_id: int, signature: List[int]):
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(item_id)
+
+    def remove(self, item_id: int, signature: List[int]):
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def candidates(self, signature: List[int]) -> Set[int]:
+        found: Set[int] = set()
+        for key in self._band_keys(signature):
+            found |= self._buckets.get(key, set())
+        return found
+
+
+class ClaimVerificationStore:
+    """
+    Verdicts shared across decks, stored in SQLite.
+    A claim reuses a stored verdict when its statement is a near-duplicate of a stored one
+    (token Jaccard >= `threshold`, exactly the same figures and negations, same category)
+    verified within `max_age_hours`. Only company-agnostic categories are stored or reused.
+    """
+    def __init__(self, path: str, max_age_hours: float = 720, threshold: float = 0.7):
+        self.path = path
+        self.max_age_seconds = max_age_hours * 3600
+        self.threshold = threshold
+        self.lsh = MinHashLSH()
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            "id INTEGER PRIMARY KEY, normalized TEXT UNIQUE NOT NULL, statement TEXT NOT NULL, "
+            "verdict TEXT NOT NULL, signature TEXT NOT NULL, verified_at REAL NOT NULL, category TEXT)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(verdicts)")}
+        if "category" not in columns:
+            # Stores written before categories were tracked may hold company-specific verdicts
+            self._conn.execute("ALTER TABLE verdicts ADD COLUMN category TEXT")
+        self._conn.execute(
+            "DELETE FROM verdicts WHERE verified_at < ? OR category IS NULL", (time.time() - self.max_age_seconds,)
+        )
+        self._conn.commit()
+        for row in self._conn.execute("SELECT id, statement, verdict, signature, verified_at, category FROM verdicts"):
+            self._index(*row)
+
+    @classmethod
+    def from_env(cls) -> Optional["ClaimVerificationStore"]:
+        """Store configured by SAGO_CLAIM_STORE_* env vars; None when SAGO_CLAIM_STORE_MAX_AGE_HOURS=0."""
+        max_age_hours = float(os.getenv("SAGO_CLAIM_STORE_MAX_AGE_HOURS", "720"))
+        if max_age_hours <= 0:
+            return None
+        try:
+            return cls(
+                os.path.join(cache_dir(), "claim_verdicts.sqlite"),
+                max_age_hours=max_age_hours,
+                threshold=float(os.getenv("SAGO_CLAIM_MATCH_THRESHOLD", "0.7"))
+            )
+        except Exception as e:
+            logger.warning(f"Claim verification store unavailable: {e}")
+            return None
+
+    def _index(self, entry_id: int, statement: str, verdict: str, signature: str, verified_at: float,
+               category: str):
+        entry = {
+            "statement": statement,
+            "category": category,
+            "tokens": statement_tokens(statement),
+            "numbers": extract_numbers(statement),
+            "negations": count_negations(statement),
+            "verdict": json.loads(verdict),
+            "signature": json.loads(signature),
+            "verified_at": verified_at
+        }
+        self._entries[entry_id] = entry
+        self.lsh.add(entry_id, entry["signature"])
+
+    def lookup(self, statement: str, category: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Returns the stored verdict for the closest fresh near-duplicate of `statement`,
+        marked with `reused_verdict`, `verified_at` and `matched_statement`. None on a miss
+        or when `category` is not reusable. A match must state the same figures once
+        magnitude and unit are applied: "$2B" never answers for "$2T" or "$2 trillion".
+        """
+        if category not in REUSABLE_CATEGORIES:
+            return None
+        tokens = statement_tokens(statement)
+        numbers = extract_numbers(statement)
+        negations = count_negations(statement)
+        signature = self.lsh.signature(tokens)
+        cutoff = time.time() - self.max_age_seconds
+
+        with self._lock:
+            best, best_score = None, self.threshold
+            for entry_id in self.lsh.candidates(signature):
+                entry = self._entries[entry_id]
+                if (entry["verified_at"] < cutoff or entry["category"] != category
+                        or entry["numbers"] != numbers or entry["negations"] != negations):
+                    continue
+                score = jaccard(tokens, entry["tokens"])
+                if score >= best_score:
+                    best, best_score = entry, score
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        logger.info(f"Reusing verdict for '{statement}' from '{best['statement']}' (similarity {best_score:.2f})")
+        return {
+            **best["verdict"],
+            "reused_verdict": True,
+            "verified_at": datetime.fromtimestamp(best["verified_at"], timezone.utc).isoformat(timespec="seconds"),
+            "matched_statement": best["statement"]
+        }
+
+    def record(self, statement: str, verdict: Dict[str, Any], category: Optional[str]):
+        """Stores a freshly synthesized verdict. Verdicts without evidence or about the company are skipped."""
+        if category not in REUSABLE_CATEGORIES:
+            return
+        if verdict.get("verification_status") not in REUSABLE_STATUSES or not verdict.get("sources"):
+            return
+        stored = {k: verdict.get(k) for k in ("verification_status", "reasoning", "sources")}
+        signature = self.lsh.signature(statement_tokens(statement))
+        now = time.time()
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO verdicts (normalized, statement, verdict, signature, verified_at, category) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(normalized) DO UPDATE SET statement = excluded.statement, verdict = excluded.verdict, "
+                "signature = excluded.signature, verified_at = excluded.verified_at, "
+                "category = excluded.category RETURNING id",
+                (normalize_statement(statement), statement, json.dumps(stored), json.dumps(signature), now, category)
+            )
+            entry_id = cursor.fetchone()[0]
+            self._conn.commit()
+            previous = self._entries.get(entry_id)
+            if previous is not None:
+                self.lsh.remove(entry_id, previous["signature"])
+            self._index(entry_id, statement, json.dumps(stored), json.dumps(signature), now, category)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
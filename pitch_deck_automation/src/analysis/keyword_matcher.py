@@ -0,0 +1,67 @@
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over case-insensitive keywords.
+    After `build`, `find_all` reports every whole-word occurrence of every keyword in one
+    pass over the text, however many keywords there are.
+    """
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (keyword length, payload) for every keyword ending there
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self._built = False
+
+    def add(self, keyword: str, payload: Any):
+        keyword = keyword.lower().strip()
+        if not keyword:
+            return
+        state = 0
+        for char in keyword:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(keyword), payload))
+        self._built = False
+
+    def build(self) -> "KeywordMatcher":
+        queue = deque(self._goto[0].values())
+        for child in queue:
+            self._fail[child] = 0
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._built = True
+        return self
+
+    def find_all(self, text: str) -> List[Tuple[int, int, Any]]:
+        """Returns (start, end, payload) for each whole-word match, in order of where it ends."""
+        if not self._built:
+            self.build()
+        text = text.lower()
+        matches = []
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, payload in self._out[state]:
+                start, end = i - length + 1, i + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    matches.append((start, end, payload))
+        return matches
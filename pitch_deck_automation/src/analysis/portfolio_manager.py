@@ -1,14 +1,25 @@
+import os
 import logging
-import json
-from typing import List, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from .vector_index import HashedTfidfIndex
+from .keyword_matcher import KeywordMatcher
+from ..utils.cache import cache_dir
 
 logger = logging.getLogger(__name__)
 
+# Overlaps listed in the Analyst context; a common sector term can match hundreds of companies
+MAX_LISTED_CONFLICTS = 20
+
 class PortfolioManager:
     """
-    Simulates a Vector Database / Knowledge Base of the VC's portfolio and thesis.
+    Knowledge base of the VC's portfolio and thesis.
+    Company descriptions and thesis memos live in a local TF-IDF vector index, so the
+    Analyst only sees the entries most relevant to the deck at hand.
     """
-    def __init__(self):
+    def __init__(self, index_path: Optional[str] = None, top_k: Optional[int] = None):
         # Mock Data representing Sago's specific investment thesis and existing portfolio
         self.thesis = {
             "focus_sectors": ["B2B SaaS", "DevTools", "Climate Tech", "Vertical AI"],
@@ -16,39 +27,163 @@ class PortfolioManager:
             "check_size": "$1M - $5M (Seed to Series A)",
             "geography": "North America, Europe"
         }
-        
+
         self.portfolio_companies = [
             {"name": "CloudScale", "sector": "DevTools", "description": "Serverless infrastructure scaling"},
             {"name": "GreenGrid", "sector": "Climate Tech", "description": "AI for energy grid optimization"},
             {"name": "DocuFlow", "sector": "B2B SaaS", "description": "Legal document automation"}
         ]
 
-    def get_context(self) -> str:
+        # Bumped on every portfolio change; the conflict matcher and rendered contexts are rebuilt per version
+        self.version = 0
+        self._matcher: Optional[Tuple[KeywordMatcher, Dict[str, List[str]]]] = None
+        self._matcher_version = -1
+        self._context_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Companies and memos returned per query
+        self.top_k = top_k or int(os.getenv("SAGO_PORTFOLIO_TOP_K", "8"))
+        self.index_path = index_path or os.getenv("SAGO_PORTFOLIO_INDEX") or os.path.join(cache_dir(), "portfolio_index")
+        self.index = HashedTfidfIndex.load(self.index_path)
+        if self.index is None:
+            self.index = HashedTfidfIndex(path=self.index_path)
+            self.add_companies(self.portfolio_companies)
+        else:
+            logger.info(f"Loaded portfolio index with {len(self.index)} entries from {self.index_path}")
+            self.portfolio_companies = [d["metadata"] for d in self.index.docs if d["kind"] == "company"]
+
+    def add_companies(self, companies: List[Dict[str, Any]]):
         """
-        Retrieves relevant context for the Analyst agent.
-        In a real system, this would do a semantic search related to the pitch deck's content.
+        Adds or updates portfolio companies in the index. Each is a dict with 'name', 'sector'
+        and 'description', plus optional 'aliases' and 'keywords' used for conflict detection.
+        """
+        positions = {co["name"]: i for i, co in enumerate(self.portfolio_companies)}
+        for co in companies:
+            self.index.add(f"company:{co['name']}", f"{co['name']} {co['sector']} {co['description']}", "company", co)
+            if co["name"] in positions:
+                self.portfolio_companies[positions[co["name"]]] = co
+            else:
+                positions[co["name"]] = len(self.portfolio_companies)
+                self.portfolio_companies.append(co)
+        self.bump_version()
+
+    def add_thesis_document(self, doc_id: str, title: str, text: str):
+        """Adds or updates a thesis memo in the index."""
+        self.index.add(f"thesis:{doc_id}", f"{title}\n{text}", "thesis", {"title": title})
+        self.bump_version()
+
+    def bump_version(self):
+        """Invalidates cached contexts and the conflict matcher. Call after editing `thesis` directly."""
+        with self._lock:
+            self.version += 1
+            self._context_cache.clear()
+
+    def save(self):
+        """Persists the index so later runs load it instead of rebuilding."""
+        self.index.save(self.index_path)
+
+    def get_context(self, query_text: Optional[str] = None, top_k: Optional[int] = None,
+                    deck_text: Optional[str] = None) -> str:
+        """
+        Retrieves relevant context for the Analyst agent: the thesis, plus the portfolio
+        companies and thesis memos closest to `query_text` (e.g. the deck's claims).
+        Without a query, the first `top_k` companies are listed.
+        If `deck_text` is given, companies whose sector or keywords it mentions are appended.
+        Rendered contexts are memoized until the portfolio version changes.
         """
         logger.info("Retrieving Portfolio Context...")
-        
-        context_str = (
-            "## Sago Investment Thesis\n"
-            f"- **Focus Areas**: {', '.join(self.thesis['focus_sectors'])}\n"
-            f"- **Anti-Portfolio**: {', '.join(self.thesis['avoid_sectors'])}\n"
-            f"- **Sweet Spot**: {self.thesis['check_size']}\n\n"
-            "## Existing Portfolio Conflicts/Synergies\n"
-        )
-        
-        for co in self.portfolio_companies:
-            context_str += f"- {co['name']} ({co['sector']}): {co['description']}\n"
-            
+        top_k = top_k or self.top_k
+        key = (self.version, query_text, top_k)
+        with self._lock:
+            context_str = self._context_cache.get(key)
+            if context_str is not None:
+                self._context_cache.move_to_end(key)
+
+        if context_str is None:
+            context_str = self._render_context(query_text, top_k)
+            with self._lock:
+                if key[0] == self.version:
+                    self._context_cache[key] = context_str
+                    while len(self._context_cache) > 64:
+                        self._context_cache.popitem(last=False)
+
+        conflicts = self.find_conflicts(deck_text) if deck_text else []
+        if conflicts:
+            logger.info(f"Deck overlaps with {len(conflicts)} portfolio companies.")
+            shown = conflicts[:MAX_LISTED_CONFLICTS]
+            context_str += "\n## Detected Portfolio Overlaps\n" + "".join(
+                f"- {c['company']} (deck mentions '{c['term']}')\n" for c in shown
+            )
+            if len(conflicts) > len(shown):
+                context_str += f"- ...and {len(conflicts) - len(shown)} more portfolio companies\n"
         return context_str
 
+    def _render_context(self, query_text: Optional[str], top_k: int) -> str:
+        parts = [
+            "## Sago Investment Thesis\n",
+            f"- **Focus Areas**: {', '.join(self.thesis['focus_sectors'])}\n",
+            f"- **Anti-Portfolio**: {', '.join(self.thesis['avoid_sectors'])}\n",
+            f"- **Sweet Spot**: {self.thesis['check_size']}\n\n",
+            "## Existing Portfolio Conflicts/Synergies\n"
+        ]
+
+        if query_text:
+            companies = [doc["metadata"] for _, doc in self.index.search(query_text, top_k, kind="company")]
+            memos = [doc for _, doc in self.index.search(query_text, max(1, top_k // 4), kind="thesis")]
+        else:
+            companies = self.portfolio_companies[:top_k]
+            memos = []
+
+        parts.extend(f"- {co['name']} ({co['sector']}): {co['description']}\n" for co in companies)
+        if not companies:
+            parts.append("- No closely related portfolio companies.\n")
+
+        if memos:
+            parts.append("\n## Relevant Thesis Memos\n")
+            # Memo text starts with its title line
+            parts.extend(f"### {memo['text']}\n" for memo in memos)
+
+        return "".join(parts)
+
+    def _conflict_matcher(self) -> Tuple[KeywordMatcher, Dict[str, List[str]]]:
+        with self._lock:
+            if self._matcher is None or self._matcher_version != self.version:
+                # Many companies share a sector, so each distinct term is compiled once
+                term_companies: Dict[str, List[str]] = {}
+                for co in self.portfolio_companies:
+                    for term in [co["name"], co["sector"], *co.get("aliases", []), *co.get("keywords", [])]:
+                        term = " ".join(term.lower().split())
+                        companies = term_companies.setdefault(term, [])
+                        if co["name"] not in companies:
+                            companies.append(co["name"])
+                matcher = KeywordMatcher()
+                for term in term_companies:
+                    matcher.add(term, term)
+                self._matcher = (matcher.build(), term_companies)
+                self._matcher_version = self.version
+            return self._matcher
+
+    def find_conflicts(self, text: str) -> List[Dict[str, str]]:
+        """
+        Scans `text` (a sector name or a whole deck) once for every portfolio company's
+        name, sector, aliases and keywords. Returns one {'company', 'term'} per overlapping
+        company, in order of first mention.
+        """
+        matcher, term_companies = self._conflict_matcher()
+        conflicts: Dict[str, str] = {}
+        for start, end, term in matcher.find_all(text):
+            for company in term_companies[term]:
+                if company not in conflicts:
+                    conflicts[company] = text[start:end]
+        return [{"company": company, "term": term} for company, term in conflicts.items()]
+
     def check_conflict(self, startup_sector: str) -> List[str]:
         """
-        Simple keyword check for conflicts.
+        Simple keyword check for conflicts: portfolio companies whose sector contains `startup_sector`.
+        Use `find_conflicts` to scan a whole deck.
         """
-        conflicts = []
-        for co in self.portfolio_companies:
-            if startup_sector.lower() in co['sector'].lower():
-                conflicts.append(f"Potential overlap with portfolio company: {co['name']}")
-        return conflicts
+        needle = startup_sector.lower()
+        return [
+            f"Potential overlap with portfolio company: {co['name']}"
+            for co in self.portfolio_companies if needle in co['sector'].lower()
+        ]
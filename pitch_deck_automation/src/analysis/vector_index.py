@@ -0,0 +1,139 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = {"a", "an", "the", "of", "in", "on", "by", "to", "for", "and", "or", "is", "are", "was", "were",
+             "will", "be", "our", "we", "its", "at", "with", "as", "that", "this", "from", "it"}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words without stopwords, plus adjacent-word bigrams."""
+    words = [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class HashedTfidfIndex:
+    """
+    TF-IDF vectors over hashed features, held in a NumPy matrix for brute-force cosine top-k.
+    Feature hashing keeps the vocabulary fixed, so documents can be added one at a time
+    without refitting. Persists to `<path>.npz` (vectors) and `<path>.json` (documents).
+    """
+    def __init__(self, dim: int = 2048, path: Optional[str] = None):
+        self.dim = dim
+        self.path = path
+        self.docs: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        # Row buffer with spare capacity; only the first len(docs) rows are live
+        self._tf = np.zeros((0, dim), dtype=np.float32)
+        self._df = np.zeros(dim, dtype=np.float32)
+        # Normalized TF-IDF matrix, rebuilt lazily after adds since IDF shifts with every document
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _vectorize(self, text: str) -> np.ndarray:
+        counts = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text):
+            bucket = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big") % self.dim
+            counts[bucket] += 1
+        # Sublinear term frequency
+        return np.log1p(counts)
+
+    def add(self, doc_id: str, text: str, kind: str = "document", metadata: Optional[Dict[str, Any]] = None):
+        """Adds a document, or replaces the one already stored under `doc_id`."""
+        tf = self._vectorize(text)
+        doc = {"id": doc_id, "kind": kind, "text": text, "metadata": metadata or {}}
+        with self._lock:
+            position = self._positions.get(doc_id)
+            if position is None:
+                position = len(self.docs)
+                if position == len(self._tf):
+                    # Grow geometrically so bulk loads stay linear
+                    grown = np.zeros((max(16, 2 * len(self._tf)), self.dim), dtype=np.float32)
+                    grown[:position] = self._tf[:position]
+                    self._tf = grown
+                self._positions[doc_id] = position
+                self.docs.append(doc)
+                self._tf[position] = tf
+            else:
+                self._df -= self._tf[position] > 0
+                self.docs[position] = doc
+                self._tf[position] = tf
+            self._df += tf > 0
+            self._matrix = None
+
+    def add_many(self, documents: List[Tuple[str, str, str, Dict[str, Any]]]):
+        """Adds (doc_id, text, kind, metadata) tuples."""
+        for doc_id, text, kind, metadata in documents:
+            self.add(doc_id, text, kind, metadata)
+
+    def _idf(self) -> np.ndarray:
+        return np.log((1 + len(self.docs)) / (1 + self._df)) + 1
+
+    def _weighted(self) -> np.ndarray:
+        if self._matrix is None:
+            weighted = self._tf[:len(self.docs)] * self._idf()
+            norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+            self._matrix = weighted / np.maximum(norms, 1e-12)
+        return self._matrix
+
+    def search(self, query: str, top_k: int = 5, kind: Optional[str] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """Returns up to `top_k` (cosine score, document) pairs with a positive score, best first."""
+        with self._lock:
+            if not self.docs:
+                return []
+            matrix = self._weighted()
+            query_vec = self._vectorize(query) * self._idf()
+            norm = np.linalg.norm(query_vec)
+            if norm == 0:
+                return []
+            scores = matrix @ (query_vec / norm)
+            if kind is not None:
+                mask = np.fromiter((d["kind"] == kind for d in self.docs), dtype=bool, count=len(self.docs))
+                scores = np.where(mask, scores, -1.0)
+
+            k = min(top_k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(float(scores[i]), self.docs[i]) for i in top if scores[i] > 0]
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        if not path:
+            raise ValueError("No path to save the index to")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            # Write to temporary files first so a crash never leaves a half-written index
+            np.savez(f"{path}.tmp.npz", tf=self._tf[:len(self.docs)], df=self._df)
+            with open(f"{path}.tmp.json", "w", encoding="utf-8") as f:
+                json.dump({"dim": self.dim, "docs": self.docs}, f)
+            os.replace(f"{path}.tmp.npz", f"{path}.npz")
+            os.replace(f"{path}.tmp.json", f"{path}.json")
+        logger.info(f"Saved vector index with {len(self.docs)} documents to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> Optional["HashedTfidfIndex"]:
+        """Loads an index saved with `save`; None if there is none at `path`."""
+        if not (os.path.exists(f"{path}.npz") and os.path.exists(f"{path}.json")):
+            return None
+        with open(f"{path}.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = np.load(f"{path}.npz")
+        index = cls(dim=meta["dim"], path=path)
+        index.docs = meta["docs"]
+        index._positions = {doc["id"]: i for i, doc in enumerate(index.docs)}
+        index._tf = arrays["tf"]
+        index._df = arrays["df"]
+        return index
@@ -1,44 +1,238 @@
 import json
+import asyncio
 import logging
-from typing import List, Dict, Any
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Optional, Tuple
 from ..utils.llm_client import LLMClient
 from ..utils.search_client import SearchClient
+from ..utils.prompt_budget import truncate_to_tokens
+from ..utils import metrics
+from .claim_store import ClaimVerificationStore
 
 logger = logging.getLogger(__name__)
 
+VALID_STATUSES = {"Verified", "Contradicted", "Inconclusive"}
+
+# Search snippets are trimmed to this many tokens each before synthesis
+SNIPPET_TOKENS = 80
+
+# Verification order under a deadline or budget; lower first, unknown categories last
+CATEGORY_PRIORITY = {"Financials": 0, "Market Size": 1, "Traction": 2, "Competitors": 3}
+NOT_CHECKED_STATUS = "Not checked (budget)"
+# LLM call sites that count against a verification budget
+VERIFICATION_CALL_SITES = ("query_generation", "query_generation_batch",
+                           "verification_synthesis", "verification_synthesis_batch")
+
 class Verifier:
-    def __init__(self, llm_client: LLMClient, search_client: SearchClient):
+    def __init__(self, llm_client: LLMClient, search_client: SearchClient,
+                 batch_size: int = 5, max_workers: int = 4,
+                 claim_store: Optional[ClaimVerificationStore] = None):
         self.llm = llm_client
         self.search = search_client
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        # Verdicts shared across decks; near-duplicate claims skip search and synthesis
+        self.claim_store = claim_store
 
     def verify_claim(self, claim: Dict[str, Any]) -> Dict[str, Any]:
         statement = claim.get('statement')
         logger.info(f"Verifying claim: {statement}")
 
-        if not statement:
+        if not statement or self._reuse(claim):
             return claim
 
         queries = self._generate_search_queries(statement)
-        
+
         search_results = []
-        for q in queries[:2]: 
+        for q in queries[:2]:
             results = self.search.search(q, max_results=3)
             search_results.extend(results)
 
         verification_result = self._synthesize_verification(statement, search_results)
-        
+        self._remember(claim, verification_result)
+
         claim.update(verification_result)
         return claim
 
-    def _generate_search_queries(self, statement: str) -> List[str]:
+    async def averify_claim(self, claim: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of `verify_claim`. Searches run in worker threads concurrently."""
+        statement = claim.get('statement')
+        logger.info(f"Verifying claim: {statement}")
+
+        if not statement or self._reuse(claim):
+            return claim
+
+        queries = await self._agenerate_search_queries(statement)
+
+        batches = await asyncio.gather(
+            *[asyncio.to_thread(self.search.search, q, max_results=3) for q in queries[:2]]
+        )
+        search_results = [r for batch in batches for r in batch]
+
+        verification_result = await self._asynthesize_verification(statement, search_results)
+        self._remember(claim, verification_result)
+
+        claim.update(verification_result)
+        return claim
+
+    def verify_claims(self, claims: List[Dict[str, Any]], batch_size: Optional[int] = None,
+                      max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Batched counterpart of `verify_claim`.
+        Queries for every claim come from a single LLM call and verdicts are synthesized
+        `batch_size` claims at a time, so a deck costs 1 + ceil(N / batch_size) LLM calls
+        instead of 2N. Any claim missing from a malformed batch response falls back to
+        the per-claim path; if a whole batch fails, only its claims are marked Error.
+        """
+        batch_size = max(1, batch_size or self.batch_size)
+        max_workers = max(1, max_workers or self.max_workers)
+        pending = [claim for claim in claims if claim.get('statement') and not self._reuse(claim)]
+        if not pending:
+            return claims
+
+        logger.info(f"Verifying {len(pending)} claims in batches of {batch_size}")
+        statements = [claim['statement'] for claim in pending]
+        queries = self._generate_search_queries_batch(statements)
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="verifier-batch") as pool:
+            search_futures = [
+                [metrics.submit(pool, self.search.search, q, max_results=3) for q in claim_queries[:2]]
+                for claim_queries in queries
+            ]
+            search_results = [[r for f in futures for r in f.result()] for futures in search_futures]
+
+            batches = [list(range(i, min(i + batch_size, len(pending)))) for i in range(0, len(pending), batch_size)]
+            verdict_futures = [
+                metrics.submit(pool, self._synthesize_verification_batch,
+                            [statements[i] for i in batch], [search_results[i] for i in batch])
+                for batch in batches
+            ]
+            for batch, future in zip(batches, verdict_futures):
+                try:
+                    verdicts = future.result()
+                except Exception as e:
+                    # Only this batch's claims fail; the other batches keep their verdicts
+                    logger.error(f"Verification failed for a batch of {len(batch)} claims: {e}")
+                    for i in batch:
+                        pending[i].update({"verification_status": "Error", "reasoning": f"Verification failed: {e}", "sources": []})
+                    continue
+                for i, verdict in zip(batch, verdicts):
+                    self._remember(pending[i], verdict)
+                    pending[i].update(verdict)
+
+        return claims
+
+    def _reuse(self, claim: Dict[str, Any]) -> bool:
+        """Applies a stored verdict for a near-duplicate claim, if there is a fresh one."""
+        if self.claim_store is None:
+            return False
+        verdict = self.claim_store.lookup(claim['statement'], claim.get('category'))
+        if verdict is None:
+            return False
+        claim.update(verdict)
+        return True
+
+    def _remember(self, claim: Dict[str, Any], verdict: Dict[str, Any]):
+        # Mock verdicts (no API key) must not be served to later real runs
+        if self.claim_store is not None and self.llm.client is not None:
+            self.claim_store.record(claim['statement'], verdict, claim.get('category'))
+
+    def _generate_search_queries_batch(self, statements: List[str]) -> List[List[str]]:
+        listing = "\n".join(f"[{i}] {statement}" for i, statement in enumerate(statements))
         prompt = (
-            f"You are a researcher. Generate 2 specific google search queries to verify this claim: '{statement}'.\n"
-            "Output JSON: {'queries': ['query 1', 'query 2']}"
+            "You are a researcher. For each claim below, generate 2 specific google search queries to verify it.\n\n"
+            f"Claims:\n{listing}\n\n"
+            "Output JSON: {'claims': [{'id': 0, 'queries': ['query 1', 'query 2']}]}"
         )
+
+        by_id: Dict[int, List[str]] = {}
         try:
             response = self.llm.chat_completion(
                 messages=[{"role": "user", "content": prompt}],
-                json_mode=True
+                json_mode=True,
+                call_site="query_generation_batch"
+            )
+            for item in json.loads(response).get('claims', []):
+                queries = item.get('queries')
+                if isinstance(item.get('id'), int) and isinstance(queries, list) and queries:
+                    by_id[item['id']] = [str(q) for q in queries]
+        except Exception as e:
+            logger.error(f"Batched query generation failed: {e}")
+
+        missing = [i for i in range(len(statements)) if i not in by_id]
+        if missing:
+            logger.warning(f"Batched query generation missed {len(missing)} claims. Falling back per claim.")
+            for i in missing:
+                by_id[i] = self._generate_search_queries(statements[i])
+
+        return [by_id[i] for i in range(len(statements))]
+
+    def _synthesize_verification_batch(self, statements: List[str],
+                                       search_results: List[List[Dict[str, str]]]) -> List[Dict[str, Any]]:
+        verdicts: Dict[int, Dict[str, Any]] = {
+            i: self._no_results() for i, results in enumerate(search_results) if not results
+        }
+        to_synthesize = [i for i in range(len(statements)) if i not in verdicts]
+        if not to_synthesize:
+            return [verdicts[i] for i in range(len(statements))]
+
+        sections = "\n\n".join(
+            f"### Claim [{i}]: '{statements[i]}'\nSearch Results:\n{self._format_results(search_results[i])}"
+            for i in to_synthesize
+        )
+        prompt = (
+            f"{sections}\n\n"
+            "Based on these results, verify each claim above independently.\n"
+            "Status options: 'Verified' (Results support it), 'Contradicted' (Results oppose it), 'Inconclusive' (Not enough info/Ambiguous).\n"
+            "Output JSON: {'verdicts': [{'id': 0, 'verification_status': '...', 'reasoning': '...', 'sources': ['url1', 'url2']}]}"
+        )
+
+        try:
+            response = self.llm.chat_completion(
+                messages=[{"role": "user", "content": prompt}],
+                json_mode=True,
+                call_site="verification_synthesis_batch"
+            )
+            for item in json.loads(response).get('verdicts', []):
+                claim_id = item.get('id')
+                if claim_id in to_synthesize and item.get('verification_status') in VALID_STATUSES:
+                    verdicts[claim_id] = {
+                        "verification_status": item['verification_status'],
+                        "reasoning": item.get('reasoning', ''),
+                        "sources": item.get('sources') or []
+                    }
+        except Exception as e:
+            logger.error(f"Batched synthesis failed: {e}")
+
+        for i in to_synthesize:
+            if i not in verdicts:
+                logger.warning(f"No valid batched verdict for claim [{i}]. Falling back per claim.")
+                verdicts[i] = self._synthesize_verification(statements[i], search_results[i])
+
+        return [verdicts[i] for i in range(len(statements))]
+
+    def _generate_search_queries(self, statement: str) -> List[str]:
+        try:
+            response = self.llm.chat_completion(
+                messages=[{"role": "user", "content": self._query_prompt(statement)}],
+                json_mode=True,
+                call_site="query_generation"
+            )
+            data = json.loads(response)
+            return data.get('queries', [])
+        except Exception as e:
+            logger.error(f"Query generation failed: {e}")
+            return [statement]
+
+    async def _agenerate_search_queries(self, statement: str) -> List[str]:
+        try:
+            response = await self.llm.achat_completion(
+                messages=[{"role": "user", "content": self._query_prompt(statement)}],
+                json_mode=True,
+                call_site="query_generation"
             )
             data = json.loads(response)
             return data.get('queries', [])
@@ -48,15 +242,53 @@ class Verifier:
 
     def _synthesize_verification(self, statement: str, search_results: List[Dict[str, str]]) -> Dict[str, Any]:
         if not search_results:
-            return {
-                "verification_status": "Unverified",
-                "reasoning": "No search results found.",
-                "sources": []
-            }
-        
-        context = "\n".join([f"- {r['title']}: {r['body']} ({r['href']})" for r in search_results])
-        
-        prompt = (
+            return self._no_results()
+
+        try:
+            response = self.llm.chat_completion(
+                messages=[{"role": "user", "content": self._synthesis_prompt(statement, search_results)}],
+                json_mode=True,
+                call_site="verification_synthesis"
+            )
+            return json.loads(response)
+        except Exception as e:
+            logger.error(f"Synthesis failed: {e}")
+            return self._synthesis_failed()
+
+    async def _asynthesize_verification(self, statement: str, search_results: List[Dict[str, str]]) -> Dict[str, Any]:
+        if not search_results:
+            return self._no_results()
+
+        try:
+            response = await self.llm.achat_completion(
+                messages=[{"role": "user", "content": self._synthesis_prompt(statement, search_results)}],
+                json_mode=True,
+                call_site="verification_synthesis"
+            )
+            return json.loads(response)
+        except Exception as e:
+            logger.error(f"Synthesis failed: {e}")
+            return self._synthesis_failed()
+
+    @staticmethod
+    def _query_prompt(statement: str) -> str:
+        return (
+            f"You are a researcher. Generate 2 specific google search queries to verify this claim: '{statement}'.\n"
+            "Output JSON: {'queries': ['query 1', 'query 2']}"
+        )
+
+    @staticmethod
+    def _format_results(search_results: List[Dict[str, str]]) -> str:
+        return "\n".join([
+            f"- {r['title']}: {truncate_to_tokens(r['body'], SNIPPET_TOKENS, marker='...')} ({r['href']})"
+            for r in search_results
+        ])
+
+    @classmethod
+    def _synthesis_prompt(cls, statement: str, search_results: List[Dict[str, str]]) -> str:
+        context = cls._format_results(search_results)
+
+        return (
             f"Claim: '{statement}'\n\n"
             f"Search Results:\n{context}\n\n"
             "Based on these results, verify the claim.\n"
@@ -64,16 +296,256 @@ class Verifier:
             "Output JSON: {'verification_status': '...', 'reasoning': '...', 'sources': ['url1', 'url2']}"
         )
 
+    @staticmethod
+    def _no_results() -> Dict[str, Any]:
+        return {
+            "verification_status": "Unverified",
+            "reasoning": "No search results found.",
+            "sources": []
+        }
+
+    @staticmethod
+    def _synthesis_failed() -> Dict[str, Any]:
+        return {
+            "verification_status": "Error",
+            "reasoning": "LLM Synthesis failed.",
+            "sources": []
+        }
+
+
+class VerificationPipeline:
+    """
+    Verifies claims while extraction is still running. `submit` takes each claim as soon as it
+    is parsed; claims are verified `batch_size` at a time on a background pool.
+    `results` returns verdicts for the final claim list, in its order: claims that were never
+    submitted are verified then, and verdicts for submitted claims that were dropped are discarded.
+    """
+    def __init__(self, verifier: Verifier, max_workers: int = 4, batch_size: int = 5):
+        self.verifier = verifier
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size)
+        # `max_workers` is split between concurrent batches and the searches within each batch,
+        # so no more than `max_workers` calls are in flight at once
+        self._batch_workers = min(2, self.max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self._batch_workers, thread_name_prefix="verify-pipeline")
+        self._queued: List[Dict[str, Any]] = []
+        # statement -> (future of the batch, position in the batch)
+        self._submitted: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, claim: Dict[str, Any]):
+        statement = claim.get('statement')
+        if not statement:
+            return
+        with self._lock:
+            if statement in self._submitted or any(c['statement'] == statement for c in self._queued):
+                return
+            self._queued.append(dict(claim))
+            if len(self._queued) >= self.batch_size:
+                self._dispatch()
+
+    def _dispatch(self):
+        batch, self._queued = self._queued, []
+        if not batch:
+            return
+        future = metrics.submit(self._pool, self._verify_batch, batch)
+        for position, claim in enumerate(batch):
+            self._submitted[claim['statement']] = (future, position)
+
+    def _verify_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if len(batch) > 1:
+            try:
+                return self.verifier.verify_claims(
+                    batch, batch_size=self.batch_size, max_workers=max(1, self.max_workers // self._batch_workers)
+                )
+            except Exception as e:
+                logger.error(f"Batched verification failed, verifying claims individually: {e}")
+
+        results = []
+        for claim in batch:
+            try:
+                results.append(self.verifier.verify_claim(claim))
+            except Exception as e:
+                logger.error(f"Verification failed for claim '{claim.get('statement')}': {e}")
+                results.append({**claim, "verification_status": "Error",
+                                "reasoning": f"Verification failed: {e}", "sources": []})
+        return results
+
+    def results(self, claims: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for claim in claims:
+            self.submit(claim)
+        with self._lock:
+            self._dispatch()
+            submitted = dict(self._submitted)
+
+        verified_claims = []
+        for claim in claims:
+            if not claim.get('statement'):
+                verified_claims.append(claim)
+                continue
+            future, position = submitted[claim['statement']]
+            try:
+                verdict = future.result()[position]
+            except Exception as e:
+                logger.error(f"Verification failed for claim '{claim.get('statement')}': {e}")
+                verdict = {"verification_status": "Error", "reasoning": f"Verification failed: {e}", "sources": []}
+            # The final claim's own fields win; a streamed copy may carry a lower confidence score
+            result = {**verdict, **claim}
+            verified_claims.append(result)
+            logger.info(f"Verified: {result.get('statement')} -> {result.get('verification_status')}")
+        return verified_claims
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+class VerificationBudget:
+    """
+    Limits on one run's verification: a wall-clock deadline (epoch seconds) and caps on
+    LLM and search calls. Cache hits are free. None means unlimited.
+    """
+    def __init__(self, deadline: Optional[float] = None, max_llm_calls: Optional[int] = None,
+                 max_search_calls: Optional[int] = None):
+        self.deadline = deadline
+        self.max_llm_calls = max_llm_calls
+        self.max_search_calls = max_search_calls
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"deadline": self.deadline, "max_llm_calls": self.max_llm_calls, "max_search_calls": self.max_search_calls}
+
+
+def parse_budget_limits(deadline_seconds: Any = None, max_llm_calls: Any = None,
+                        max_search_calls: Any = None) -> Tuple[Optional[float], Optional[int], Optional[int]]:
+    """
+    Coerces requester-supplied limits, e.g. strings from an event payload. None means unlimited;
+    negative values count as 0, so a deadline of 0 has already expired. Raises ValueError for non-numbers.
+    """
+    def coerce(value: Any, kind: type, name: str):
+        if value is None:
+            return None
         try:
-            response = self.llm.chat_completion(
-                messages=[{"role": "user", "content": prompt}],
-                json_mode=True
-            )
-            return json.loads(response)
-        except Exception as e:
-            logger. error(f"Synthesis failed: {e}")
-            return {
-                "verification_status": "Error",
-                "reasoning": "LLM Synthesis failed.",
-                "sources": []
-            }
+            number = kind(float(value))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"{name} must be a number, got {value!r}")
+        if number != number:
+            raise ValueError(f"{name} must be a number, got {value!r}")
+        return max(number, 0)
+
+    return (coerce(deadline_seconds, float, "deadline_seconds"),
+            coerce(max_llm_calls, int, "max_llm_calls"),
+            coerce(max_search_calls, int, "max_search_calls"))
+
+
+class VerificationScheduler:
+    """
+    Verifies claims most important first (by CATEGORY_PRIORITY, then confidence) and stops
+    starting new work once the budget's deadline passes or the next unit of work could exceed
+    its call caps. Work already started is allowed to finish; claims never started are
+    marked NOT_CHECKED_STATUS. Budget a finished unit reserved but did not use goes to the
+    units after it. Results keep the original claim order.
+    """
+    def __init__(self, verifier: Verifier, budget: VerificationBudget, max_workers: int = 4, batch_size: int = 5):
+        self.verifier = verifier
+        self.budget = budget
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size)
+
+    @staticmethod
+    def priority(claim: Dict[str, Any]) -> tuple:
+        confidence = claim.get("confidence_score")
+        return (CATEGORY_PRIORITY.get(claim.get("category"), len(CATEGORY_PRIORITY)),
+                -(confidence if isinstance(confidence, (int, float)) else 0))
+
+    @staticmethod
+    def _usage() -> Tuple[int, int]:
+        """Billable (non-cached) verification LLM calls and search requests so far in this run."""
+        run = metrics.current_run()
+        if run is None:
+            return 0, 0
+        snapshot = run.snapshot()
+        llm = sum(site["calls"] - site.get("cache", 0)
+                  for name, site in snapshot["llm_calls"].items() if name in VERIFICATION_CALL_SITES)
+        search = snapshot["search"].get("network", 0) + snapshot["search"].get("error", 0)
+        return llm, search
+
+    @staticmethod
+    def unit_cost(size: int) -> Tuple[int, int]:
+        """
+        Worst-case (LLM calls, searches) for verifying `size` claims together. A single claim costs
+        2 LLM calls; a batch costs 2, plus 2 per claim if both batch responses are malformed and every
+        claim falls back to the per-claim path. Each claim costs up to 2 searches.
+        """
+        return (2 if size == 1 else 2 + 2 * size), 2 * size
+
+    def _expired(self) -> bool:
+        return self.budget.deadline is not None and time.time() >= self.budget.deadline
+
+    def _next_unit(self, queue: "deque[int]", used: Tuple[int, int], reserved: Tuple[int, int]) -> Optional[List[int]]:
+        """The next claims to start, sized so their worst case fits the remaining budget; None if nothing fits now."""
+        if not queue or self._expired():
+            return None
+        size = min(self.batch_size, len(queue))
+        if self.budget.max_llm_calls is not None:
+            llm_left = self.budget.max_llm_calls - used[0] - reserved[0]
+            if llm_left < 2:
+                return None
+            # Batches shrink as the budget runs low, down to single claims
+            while size > 1 and self.unit_cost(size)[0] > llm_left:
+                size -= 1
+        if self.budget.max_search_calls is not None:
+            search_left = self.budget.max_search_calls - used[1] - reserved[1]
+            if search_left < 2:
+                return None
+            size = min(size, search_left // 2)
+        return [queue.popleft() for _ in range(size)]
+
+    def _verify_unit(self, unit: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if len(unit) > 1:
+            return self.verifier.verify_claims(unit, batch_size=len(unit), max_workers=self.max_workers)
+        return [self.verifier.verify_claim(unit[0])]
+
+    def verify(self, claims: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        queue = deque(sorted(range(len(claims)), key=lambda i: self.priority(claims[i])))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(claims)
+        baseline = self._usage()
+        running: Dict[Any, Tuple[List[int], Tuple[int, int]]] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="verify-scheduled") as pool:
+            stopped = False
+            while running or (queue and not stopped):
+                while not stopped and queue and len(running) < self.max_workers:
+                    current = self._usage()
+                    used = (current[0] - baseline[0], current[1] - baseline[1])
+                    # In-flight work is charged at its estimate, on top of what it has already used
+                    reserved = (sum(c[0] for _, c in running.values()), sum(c[1] for _, c in running.values()))
+                    unit = self._next_unit(queue, used, reserved)
+                    if unit is None:
+                        # Running units may hand back part of their reservation when they finish,
+                        # so only an expired deadline ends the run while work is in flight
+                        stopped = self._expired()
+                        break
+                    future = metrics.submit(pool, self._verify_unit, [dict(claims[i]) for i in unit])
+                    running[future] = (unit, self.unit_cost(len(unit)))
+                if not running:
+                    # Nothing in flight and nothing fits the budget that is left
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    unit, _ = running.pop(future)
+                    try:
+                        verified = future.result()
+                    except Exception as e:
+                        logger.error(f"Verification failed for {len(unit)} claims: {e}")
+                        verified = [{**claims[i], "verification_status": "Error",
+                                     "reasoning": f"Verification failed: {e}", "sources": []} for i in unit]
+                    for i, result in zip(unit, verified):
+                        results[i] = result
+
+        if queue:
+            logger.warning(f"Verification budget exhausted; {len(queue)} claims not checked")
+        for i in queue:
+            results[i] = {**claims[i], "verification_status": NOT_CHECKED_STATUS,
+                          "reasoning": "Skipped to stay within the deadline or call budget.", "sources": []}
+        for result in results:
+            logger.info(f"Verified: {result.get('statement')} -> {result.get('verification_status')}")
+        return results
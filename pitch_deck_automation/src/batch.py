@@ -0,0 +1,129 @@
+import os
+import glob
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_inputs(pattern: str) -> List[str]:
+    """PDFs named by `pattern`: a single file, a directory (searched recursively) or a glob."""
+    if os.path.isdir(pattern):
+        paths = glob.glob(os.path.join(pattern, "**", "*.pdf"), recursive=True)
+    elif glob.has_magic(pattern):
+        paths = glob.glob(pattern, recursive=True)
+    else:
+        paths = [pattern] if os.path.exists(pattern) else []
+    return sorted(p for p in paths if os.path.isfile(p))
+
+
+def load_completed(summary_path: str) -> Dict[str, Dict[str, Any]]:
+    """Successful entries of an existing summary, keyed by deck fingerprint."""
+    completed: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(summary_path):
+        return completed
+    with open(summary_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write leaves a partial last line
+                continue
+            if entry.get("status") == "success" and entry.get("fingerprint"):
+                completed[entry["fingerprint"]] = entry
+    return completed
+
+
+class BatchRunner:
+    """
+    Analyzes many decks with one shared orchestrator, `jobs` decks at a time.
+    Each deck's report is written to `output_dir` and a line is appended to the JSONL summary
+    as soon as it finishes, so an interrupted batch resumes where it stopped: decks whose
+    fingerprint already has a successful entry (and report file) are skipped.
+    """
+    def __init__(self, orchestrator, output_dir: str, summary_path: Optional[str] = None,
+                 jobs: Optional[int] = None, user_context: Optional[Dict[str, str]] = None,
+                 force: bool = False, resume: bool = True):
+        self.orchestrator = orchestrator
+        self.output_dir = output_dir
+        self.summary_path = summary_path or os.path.join(output_dir, "summary.jsonl")
+        self.jobs = max(1, jobs or int(os.getenv("SAGO_BATCH_JOBS", "2")))
+        self.user_context = user_context or {"user_id": "batch", "source": "cli_batch"}
+        self.force = force
+        self.resume = resume
+        self._lock = threading.Lock()
+
+    def run(self, paths: List[str]) -> Dict[str, int]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        summary_dir = os.path.dirname(self.summary_path)
+        if summary_dir:
+            os.makedirs(summary_dir, exist_ok=True)
+        completed = load_completed(self.summary_path) if self.resume else {}
+        counts = {"total": len(paths), "success": 0, "error": 0, "skipped": 0}
+
+        pending = []
+        seen: Set[str] = set()
+        for path in paths:
+            try:
+                fingerprint = self.orchestrator.ingestor.fingerprint(path)
+            except Exception as e:
+                logger.error(f"Cannot read {path}: {e}")
+                self._append({"input": path, "status": "error", "error": str(e)})
+                counts["error"] += 1
+                continue
+            done = completed.get(fingerprint)
+            if fingerprint in seen:
+                logger.info(f"Skipping {path}: same deck as another file in this batch")
+                counts["skipped"] += 1
+                continue
+            if done and os.path.exists(done.get("report_path", "")):
+                logger.info(f"Skipping {path}: already analyzed ({done['report_path']})")
+                counts["skipped"] += 1
+                continue
+            seen.add(fingerprint)
+            pending.append((path, fingerprint))
+
+        logger.info(f"Batch: {len(pending)} decks to analyze, {counts['skipped']} skipped, {self.jobs} at a time")
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="batch") as pool:
+            for status in pool.map(lambda item: self._analyze(*item), pending):
+                counts[status] += 1
+        return counts
+
+    def _analyze(self, path: str, fingerprint: str) -> str:
+        entry: Dict[str, Any] = {"input": path, "fingerprint": fingerprint}
+        try:
+            results = self.orchestrator.run(path, user_context=dict(self.user_context), force=self.force)
+            entry["status"] = results.get("status", "error")
+            if entry["status"] == "success":
+                entry["report_path"] = self._write_report(path, fingerprint, results["report"])
+                entry["claims"] = len(results.get("claims", []))
+                entry["reused"] = results.get("reused", False)
+                entry["time_ms"] = results.get("metrics", {}).get("time_ms")
+            else:
+                entry["error"] = results.get("report")
+        except Exception as e:
+            logger.error(f"Batch analysis failed for {path}: {e}")
+            entry.update({"status": "error", "error": str(e)})
+
+        self._append(entry)
+        logger.info(f"Batch: {path} -> {entry['status']}")
+        return "success" if entry["status"] == "success" else "error"
+
+    def _write_report(self, path: str, fingerprint: str, report: str) -> str:
+        # Decks in different folders may share a name, so the fingerprint disambiguates
+        stem = os.path.splitext(os.path.basename(path))[0]
+        report_path = os.path.join(self.output_dir, f"{stem}-{fingerprint[:8]}.md")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(report)
+        return report_path
+
+    def _append(self, entry: Dict[str, Any]):
+        entry["finished_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock:
+            with open(self.summary_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
@@ -1,23 +1,80 @@
+import os
 import logging
 import time
-from typing import List, Dict, Any
+import itertools
+from typing import List, Dict, Any, Optional, Tuple
 import threading
-from queue import Queue, Empty
+from queue import PriorityQueue, Empty, Full
 
 from .main import AgentOrchestrator
 from .integrations.base import BaseIntegration
 from .integrations.gmail_connector import GmailIntegration
 from .integrations.slack_connector import SlackIntegration
+from .integrations.webhook_server import WebhookServer
+from .utils.cache import cache_dir
+from .utils.idempotency import IdempotencyStore, event_key
+from .analysis.verifier import parse_budget_limits
+from .utils import metrics
 
 logger = logging.getLogger("SagoCore")
 
+# Lower value is served first: partner Slack requests outrank cold inbound email
+SOURCE_PRIORITY = {"slack": 0, "cli": 1, "gmail": 2}
+DEFAULT_PRIORITY = 5
+
+
+class AdaptivePollInterval:
+    """
+    Poll delay that drops to `min_interval` while events are flowing,
+    grows by `idle_factor` on every empty poll and by `error_factor` on errors,
+    capped at `max_interval`.
+    """
+    def __init__(self, min_interval: float, max_interval: float,
+                 idle_factor: float = 1.5, error_factor: float = 2.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.idle_factor = idle_factor
+        self.error_factor = error_factor
+        self.current = min_interval
+
+    def on_event(self) -> float:
+        self.current = self.min_interval
+        return self.current
+
+    def on_idle(self) -> float:
+        self.current = min(self.max_interval, self.current * self.idle_factor)
+        return self.current
+
+    def on_error(self) -> float:
+        self.current = min(self.max_interval, self.current * self.error_factor)
+        return self.current
+
+
 class SagoSystem:
-    def __init__(self):
+    def __init__(self, num_workers: Optional[int] = None, queue_size: Optional[int] = None,
+                 idempotency_store: Optional[IdempotencyStore] = None, webhook_port: Optional[int] = None,
+                 max_attempts: Optional[int] = None):
         self.orchestrator = AgentOrchestrator()
         self.connectors: List[BaseIntegration] = []
-        self.event_queue = Queue()
+        self.num_workers = num_workers or int(os.getenv("SAGO_WORKERS", "2"))
+        # Bounded so that a burst of inbound decks applies backpressure to connectors
+        self.event_queue: PriorityQueue = PriorityQueue(maxsize=queue_size or int(os.getenv("SAGO_QUEUE_SIZE", "100")))
         self.is_running = False
-        
+        self._accepting = False
+        self._sequence = itertools.count()
+        self._workers: List[threading.Thread] = []
+        self._pollers: List[threading.Thread] = []
+        # Polling connectors return the same event repeatedly; each one is only processed once
+        self.idempotency = idempotency_store or IdempotencyStore(os.path.join(cache_dir(), "seen_events.sqlite"))
+        # Redeliveries of an event that keeps failing for a transient reason are accepted this many times in total
+        self.max_attempts = max(1, max_attempts or int(os.getenv("SAGO_EVENT_MAX_ATTEMPTS", "3")))
+        # Local push endpoint; disabled unless a port is given or SAGO_WEBHOOK_PORT is set
+        port = webhook_port if webhook_port is not None else os.getenv("SAGO_WEBHOOK_PORT")
+        self.webhook_port = int(port) if port not in (None, "") else None
+        self.webhook_server: Optional[WebhookServer] = None
+        self._stop_event = threading.Event()
+        metrics.QUEUE_DEPTH.set_function(self.event_queue.qsize)
+
         self._register_connector(GmailIntegration())
         self._register_connector(SlackIntegration())
 
@@ -27,68 +84,230 @@ class SagoSystem:
 
     def start(self):
         self.is_running = True
-        logger.info("Sago System Started. Listening for inputs...")
-        
+        self._accepting = True
+        logger.info(f"Sago System Started with {self.num_workers} workers. Listening for inputs...")
+
+        self._stop_event.clear()
+
+        if self.webhook_port is not None:
+            # Raises before any worker starts if no token is configured
+            self.webhook_server = WebhookServer(self.enqueue, port=self.webhook_port)
+        self._start_workers()
+        if self.webhook_server is not None:
+            self.webhook_server.start()
+
         for connector in self.connectors:
+            if connector.supports_push:
+                try:
+                    connector.start_push(self.enqueue)
+                    logger.info(f"{connector.__class__.__name__} delivering events by push")
+                    continue
+                except Exception as e:
+                    logger.error(f"Push setup failed for {connector.__class__.__name__}, falling back to polling: {e}")
             thread = threading.Thread(target=self._poll_connector, args=(connector,))
             thread.daemon = True
             thread.start()
+            self._pollers.append(thread)
 
         try:
             while self.is_running:
-                try:
-                    event = self.event_queue.get(timeout=1.0) 
-                    self._process_event(event)
-                    self.event_queue.task_done()
-                except Empty:
-                    continue
-                except KeyboardInterrupt:
-                    self.stop()
+                time.sleep(0.5)
         except KeyboardInterrupt:
             self.stop()
 
+    def _start_workers(self):
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"sago-worker-{i}")
+            worker.start()
+            self._workers.append(worker)
+
+    def enqueue(self, event: Dict[str, Any]) -> bool:
+        """
+        Queues an event by source priority. Blocks while the queue is full.
+        Returns False for an event that was already accepted, or if the system stops
+        accepting events before there is room.
+        The event's key is forgotten again if it is never queued, or if its analysis fails for a
+        transient reason and it has had fewer than `max_attempts` attempts, so a redelivery is retried.
+        """
+        if not self._accepting:
+            return False
+        key = event_key(event)
+        if key and not self.idempotency.check_and_record(key):
+            logger.debug(f"Dropping duplicate event {key}")
+            metrics.EVENTS_DROPPED.inc(source=event.get('source'))
+            return False
+
+        priority = SOURCE_PRIORITY.get(event.get('source'), DEFAULT_PRIORITY)
+        # The sequence number keeps FIFO order within a priority and avoids comparing dicts
+        item = (priority, next(self._sequence), time.time(), event)
+        while self._accepting:
+            try:
+                self.event_queue.put(item, timeout=1.0)
+                return True
+            except Full:
+                logger.warning(f"Event queue full ({self.event_queue.maxsize}). Waiting to enqueue {event.get('source')} event...")
+        if key:
+            # Never queued, so it should be accepted again after a restart
+            self.idempotency.forget(key)
+        return False
+
+    @property
+    def duplicates_dropped(self) -> int:
+        return self.idempotency.stats()["duplicates_dropped"]
+
+    def _worker_loop(self):
+        # Keeps draining after stop() until the queue is empty
+        while True:
+            try:
+                _, _, enqueued_at, event = self.event_queue.get(timeout=0.5)
+            except Empty:
+                if not self.is_running:
+                    break
+                continue
+            metrics.QUEUE_WAIT.observe(time.time() - enqueued_at, source=event.get('source'))
+            try:
+                self._process_event(event)
+            finally:
+                self.event_queue.task_done()
+
     def _poll_connector(self, connector: BaseIntegration):
+        interval = AdaptivePollInterval(*connector.poll_interval_range)
         while self.is_running:
             try:
                 event = connector.listen()
-                if event:
+                if event and self.enqueue(event):
                     logger.info(f"Event Received from {event.get('source')}")
-                    self.event_queue.put(event)
-                time.sleep(5)
+                    delay = interval.on_event()
+                else:
+                    delay = interval.on_idle()
             except Exception as e:
                 logger.error(f"Connector Error ({connector.__class__.__name__}): {e}")
-                time.sleep(10)
+                delay = interval.on_error()
+            self._stop_event.wait(delay)
+
+    def _reply_channel(self, event: Dict[str, Any]) -> Optional[Tuple[BaseIntegration, str]]:
+        """The connector that should answer `event`, and where to post the reply."""
+        source = event.get('source')
+        for conn in self.connectors:
+            if isinstance(conn, GmailIntegration) and source == 'gmail':
+                return conn, event.get('thread_id')
+            elif isinstance(conn, SlackIntegration) and source == 'slack':
+                return conn, event.get('channel_id')
+        return None
 
     def _process_event(self, event: Dict[str, Any]):
         source = event.get('source')
         pdf_path = event.get('attachment_path')
-        
+
         if not pdf_path:
             logger.warning(f"Event from {source} has no attachment. Ignoring.")
             return
 
         logger.info(f"Processing Request from {source}...")
-        
+        results = self._analyze_event(event, source, pdf_path)
+        key = event_key(event)
+        if results.get('status') == 'success' or not key:
+            return
+        # Connectors redeliver the same message until it is accepted, so a deck that can never
+        # succeed would be analyzed (and answered) again on every poll
+        if results.get('retryable') is False:
+            logger.warning(f"Not retrying {key}: the failure is permanent")
+            return
+        attempts = self.idempotency.record_failure(key)
+        if attempts >= self.max_attempts:
+            logger.error(f"Giving up on {key} after {attempts} failed attempts")
+            return
+        self.idempotency.forget(key)
+
+    def _analyze_event(self, event: Dict[str, Any], source: str, pdf_path: str) -> Dict[str, Any]:
+        """Runs the analysis and delivers the reply. Returns the orchestrator's result."""
+        channel = self._reply_channel(event)
+        handle = None
+        on_update = None
+        delivered = {"content": None, "ok": False}
+        if channel:
+            conn, destination = channel
+            try:
+                # Acknowledge right away, then grow the same message as results come in
+                handle = conn.start_reply(destination, f"Analyzing {os.path.basename(pdf_path)}... verified claims and the memo will appear here.")
+            except Exception as e:
+                logger.error(f"Could not post placeholder reply for {source}: {e}")
+
+            if handle is not None:
+                def on_update(content: str):
+                    delivered["content"], delivered["ok"] = content, False
+                    delivered["ok"] = conn.update_reply(handle, content)
+
+        try:
+            # Optional limits set by the requester, e.g. "best answer in 30 seconds"
+            deadline_seconds, max_llm_calls, max_search_calls = parse_budget_limits(
+                event.get('deadline_seconds'), event.get('max_llm_calls'), event.get('max_search_calls')
+            )
+        except ValueError as e:
+            logger.warning(f"Ignoring invalid limits in {source} event: {e}")
+            deadline_seconds = max_llm_calls = max_search_calls = None
+
         try:
             results = self.orchestrator.run(
-                pdf_path, 
+                pdf_path,
                 user_context={
                     "user_id": event.get('sender'),
                     "source": source
-                }
+                },
+                on_update=on_update,
+                deadline_seconds=deadline_seconds,
+                max_llm_calls=max_llm_calls,
+                max_search_calls=max_search_calls
             )
-            
-            if results['status'] == 'success':
-                reply_content = results['report']
-                for conn in self.connectors:
-                    if isinstance(conn, GmailIntegration) and source == 'gmail':
-                        conn.send_reply(event.get('thread_id'), reply_content)
-                    elif isinstance(conn, SlackIntegration) and source == 'slack':
-                        conn.send_reply(event.get('channel_id'), reply_content)
-                        
         except Exception as e:
             logger.error(f"System Error processing event: {e}")
+            results = {"status": "error", "report": None}
+
+        succeeded = results.get('status') == 'success'
+        if channel:
+            if not succeeded:
+                content = results.get('report') or "Analysis failed."
+            else:
+                # Reused analyses are not streamed; failed updates get one more attempt
+                content = None if delivered["ok"] else (delivered["content"] or results['report'])
+            self._deliver(conn, destination, handle, content)
+        return results
 
-    def stop(self):
+    @staticmethod
+    def _deliver(conn: BaseIntegration, destination: str, handle: Any, content: Optional[str]):
+        """Final delivery: `content` (None if already delivered) into the streamed reply, or as a new reply."""
+        try:
+            if handle is None:
+                conn.send_reply(destination, content)
+                return
+            if content is not None:
+                conn.update_reply(handle, content)
+            conn.finish_reply(handle)
+        except Exception as e:
+            logger.error(f"Failed to deliver reply via {conn.__class__.__name__}: {e}")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stops intake, lets workers finish queued and in-flight events, then releases resources."""
+        if not self._accepting and not self._workers:
+            self.is_running = False
+            return
+        logger.info("Sago System Stopping... draining in-flight work")
+        self._accepting = False
         self.is_running = False
-        logger.info("Sago System Stopping...")
+        self._stop_event.set()
+        if self.webhook_server is not None:
+            self.webhook_server.stop()
+            self.webhook_server = None
+        for connector in self.connectors:
+            if connector.supports_push:
+                connector.stop_push()
+        # Pollers only wake from their wait to exit, but one may be mid-listen()
+        for poller in self._pollers:
+            poller.join(timeout)
+        self._pollers = []
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+        self.orchestrator.close()
+        self.idempotency.close()
+        logger.info(f"Sago System Stopped. Duplicate events dropped: {self.duplicates_dropped}")
@@ -1,35 +1,129 @@
+import os
+import time
+import hashlib
 import logging
-from pypdf import PdfReader
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, Dict, Any, TYPE_CHECKING
+
+from ..utils import metrics
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
 
 logger = logging.getLogger(__name__)
 
+# Decks with at least this many pages are extracted on a process pool
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("SAGO_PDF_PARALLEL_PAGES", "40"))
+
+# Separates pages in extracted text so downstream agents can recover page numbers
+PAGE_BREAK = "\f"
+
+
+def _extract_from_reader(reader: "PdfReader", start: int, end: int) -> List[Dict[str, Any]]:
+    pages = []
+    for page_num in range(start, end):
+        page_start = time.perf_counter()
+        page_text = reader.pages[page_num].extract_text() or ""
+        pages.append({
+            "page": page_num + 1,
+            "text": page_text,
+            "elapsed_ms": round((time.perf_counter() - page_start) * 1000, 2)
+        })
+    return pages
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[Dict[str, Any]]:
+    """Process pool worker: each worker opens its own reader over [start, end)."""
+    from pypdf import PdfReader
+    return _extract_from_reader(PdfReader(file_path), start, end)
+
+
 class PDFIngestor:
     @staticmethod
-    def extract_text(file_path: str) -> str:
+    def fingerprint(file_path: str) -> str:
+        """SHA-256 of the raw PDF bytes, used to recognise decks that were already analyzed."""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def extract_text(file_path: str, parallel: Optional[bool] = None) -> str:
+        """
+        Whole-deck text with pages joined by PAGE_BREAK ("\\f"), one segment per page
+        including blank ones, so `text.split(PAGE_BREAK)[n - 1]` is page n.
+        """
+        path = Path(file_path)
+        pages = PDFIngestor.extract_pages(file_path, parallel=parallel)
+
+        # Blank pages are kept as empty segments so page numbers stay aligned
+        full_text = PAGE_BREAK.join(p["text"] for p in pages)
+        logger.info(f"Successfully extracted {len(full_text)} characters from {path.name}")
+        return full_text
+
+    @staticmethod
+    def extract_pages(file_path: str, parallel: Optional[bool] = None,
+                      max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Extracts text page by page, in page order.
+        Each entry is {"page": 1-based number, "text": str, "elapsed_ms": float}.
+        `parallel=None` picks the process pool automatically for decks of
+        PARALLEL_PAGE_THRESHOLD pages or more.
+        """
         path = Path(file_path)
         if not path.exists():
             raise FileNotFoundError(f"PDF file not found at: {file_path}")
-            
+
         if path.suffix.lower() != '.pdf':
             raise ValueError(f"File at {file_path} is not a PDF.")
 
+        # pypdf is imported on first use to keep startup fast
+        from pypdf import PdfReader
         try:
             reader = PdfReader(path)
-            text_content = []
-            
-            for page_num, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    text_content.append(page_text)
-                else:
-                    logger.warning(f"Could not extract text from page {page_num + 1}")
-            
-            full_text = "\n".join(text_content)
-            logger.info(f"Successfully extracted {len(full_text)} characters from {path.name}")
-            return full_text
+            page_count = len(reader.pages)
+            if parallel is None:
+                parallel = page_count >= PARALLEL_PAGE_THRESHOLD
+
+            pages = None
+            mode = "serial"
+            if parallel and page_count > 1:
+                try:
+                    pages = PDFIngestor._extract_parallel(str(path), page_count, max_workers)
+                    mode = "parallel"
+                except Exception as e:
+                    logger.warning(f"Parallel extraction failed, falling back to serial: {e}")
+            if pages is None:
+                pages = _extract_from_reader(reader, 0, page_count)
+
+            for page in pages:
+                metrics.PDF_PAGE_LATENCY.observe(page["elapsed_ms"] / 1000)
+                if not page["text"]:
+                    logger.warning(f"Could not extract text from page {page['page']}")
+
+            slowest = sorted(pages, key=lambda p: p["elapsed_ms"], reverse=True)[:3]
+            if slowest:
+                timings = ", ".join(f"p{p['page']}={p['elapsed_ms']}ms" for p in slowest)
+                logger.info(f"Extracted {page_count} pages ({mode}). Slowest: {timings}")
+            return pages
 
         except Exception as e:
             logger.error(f"Error reading PDF {file_path}: {str(e)}")
+            from pypdf.errors import PyPdfError
+            if isinstance(e, PyPdfError):
+                # A malformed file fails the same way every time
+                raise ValueError(f"Could not read PDF {path.name}: {e}") from e
             raise
+
+    @staticmethod
+    def _extract_parallel(file_path: str, page_count: int, max_workers: Optional[int]) -> List[Dict[str, Any]]:
+        workers = max(1, min(max_workers or os.cpu_count() or 1, page_count))
+        # A few ranges per worker keeps the pool busy when some pages are much slower than others
+        chunk = max(1, -(-page_count // (workers * 4)))
+        ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_extract_page_range, file_path, start, end) for start, end in ranges]
+            return [page for future in futures for page in future.result()]
@@ -1,12 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Tuple
 
 class BaseIntegration(ABC):
     """
     Abstract Base Class for all External Integrations (Gmail, Slack, Drive).
     Follows the Adapter Pattern to normalize inputs/outputs for the Sago Agent.
     """
-    
+
+    # Connectors that deliver their own events (webhooks, sockets) set this and implement start_push
+    supports_push: bool = False
+    # (min, max) seconds between listen() calls for polling connectors
+    poll_interval_range: Tuple[float, float] = (1.0, 30.0)
+
     @abstractmethod
     def listen(self) -> Any:
         """
@@ -21,3 +26,39 @@ class BaseIntegration(ABC):
         Sends the agent's response back to the source.
         """
         pass
+
+    def start_reply(self, destination: str, content: str) -> Any:
+        """
+        Posts a reply that `update_reply` can later replace, e.g. a placeholder while the
+        analysis runs. Returns a handle for the posted reply.
+        Connectors that cannot edit messages fall back to `send_reply`.
+        """
+        self.send_reply(destination, content)
+        return destination
+
+    def update_reply(self, handle: Any, content: str) -> bool:
+        """
+        Replaces the content of a reply posted with `start_reply`. The default sends
+        `content` as a new reply, so it should only be called with substantial updates.
+        """
+        return self.send_reply(handle, content)
+
+    def finish_reply(self, handle: Any) -> bool:
+        """
+        Called once a reply posted with `start_reply` holds its final content,
+        e.g. to send a draft. The default does nothing.
+        """
+        return True
+
+    def start_push(self, emit: Callable[[Dict[str, Any]], bool]) -> None:
+        """
+        Optional push interface. Push connectors call `emit(event)` for every incoming
+        event instead of being polled; `emit` returns False for duplicates or on shutdown.
+        Only called when `supports_push` is set, so connectors that set it must override this;
+        the default does nothing.
+        """
+        pass
+
+    def stop_push(self) -> None:
+        """Stops push delivery started by `start_push`."""
+        pass
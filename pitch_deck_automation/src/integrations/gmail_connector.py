@@ -1,10 +1,13 @@
 import logging
+import uuid
 from typing import Dict, Any
 from .base import BaseIntegration
 
 logger = logging.getLogger(__name__)
 
 class GmailIntegration(BaseIntegration):
+    poll_interval_range = (5.0, 60.0)
+
     def __init__(self, api_key: str = "mock_key"):
         self.api_key = api_key
 
@@ -16,6 +19,7 @@ class GmailIntegration(BaseIntegration):
             "subject": "Seed Round Pitch Deck",
             "attachment_path": "temp_downloads/deck.pdf",
             "thread_id": "thread_123",
+            "message_id": "msg_123",
             "context": {
                 "source": "gmail",
                 "user_id": "founder@startup.com",
@@ -32,3 +36,28 @@ class GmailIntegration(BaseIntegration):
         except Exception as e:
             logger.error(f"Failed to send email: {e}")
             return False
+
+    def start_reply(self, thread_id: str, content: str) -> Dict[str, str]:
+        # Partners review drafts before sending, so the reply is a draft that is updated in place
+        draft_id = f"draft_{uuid.uuid4().hex[:12]}"
+        logger.info(f"[Gmail] Draft {draft_id} created for thread {thread_id}")
+        return {"thread_id": thread_id, "draft_id": draft_id}
+
+    def update_reply(self, handle: Dict[str, str], content: str) -> bool:
+        try:
+            logger.info(f"[Gmail] Draft {handle['draft_id']} updated for thread {handle['thread_id']}")
+            logger.info(f"   Content Preview: {content[:100]}...")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update draft: {e}")
+            return False
+
+    def finish_reply(self, handle: Dict[str, str]) -> bool:
+        # The draft only reaches the founder once the memo is complete
+        try:
+            logger.info(f"[Gmail] Draft {handle['draft_id']} sent in thread {handle['thread_id']}")
+            logger.info(f"   To: founder@startup.com")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to send email: {e}")
+            return False
@@ -1,3 +1,4 @@
+import time
 import logging
 import random
 from typing import Dict, Any, Optional
@@ -6,6 +7,8 @@ from .base import BaseIntegration
 logger = logging.getLogger(__name__)
 
 class SlackIntegration(BaseIntegration):
+    poll_interval_range = (1.0, 15.0)
+
     def listen(self) -> Optional[Dict[str, Any]]:
         if random.random() > 0.95:
             return {
@@ -13,10 +16,21 @@ class SlackIntegration(BaseIntegration):
                 "sender": "vc_partner_alice",
                 "message": "Check this deck",
                 "attachment_path": "temp_downloads/slack_deck.pdf",
-                "channel_id": "C12345"
+                "channel_id": "C12345",
+                "message_id": f"{time.time():.6f}"
             }
         return None
 
     def send_reply(self, destination: str, content: str) -> bool:
         logger.info(f"[Slack] Posted to {destination}")
         return True
+
+    def start_reply(self, destination: str, content: str) -> Dict[str, str]:
+        # chat.postMessage returns the message timestamp that chat.update needs
+        ts = f"{time.time():.6f}"
+        logger.info(f"[Slack] Posted to {destination} (ts={ts})")
+        return {"channel": destination, "ts": ts}
+
+    def update_reply(self, handle: Dict[str, str], content: str) -> bool:
+        logger.info(f"[Slack] Updated message {handle['ts']} in {handle['channel']} ({len(content)} chars)")
+        return True
@@ -0,0 +1,75 @@
+import os
+import json
+import hmac
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookServer:
+    """
+    Local HTTP endpoint that lets connectors push events straight into the event queue.
+    POST /events with a JSON event body (must include "source").
+    Responds 202 when queued, 200 when ignored (duplicate or shutting down), 400 for malformed events
+    and 401 when the X-Sago-Token header does not match SAGO_WEBHOOK_TOKEN.
+    A token is required: events name files on this host for the agent to read.
+    """
+    def __init__(self, emit: Callable[[Dict[str, Any]], bool], host: str = "127.0.0.1",
+                 port: int = 8085, token: Optional[str] = None):
+        self.emit = emit
+        self.token = token if token is not None else os.getenv("SAGO_WEBHOOK_TOKEN")
+        if not self.token:
+            raise ValueError("The webhook endpoint needs a token; set SAGO_WEBHOOK_TOKEN")
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.rstrip("/") != "/events":
+                    return self._respond(404, {"error": "not found"})
+                if not hmac.compare_digest(self.headers.get("X-Sago-Token", ""), server.token):
+                    return self._respond(401, {"error": "unauthorized"})
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    event = json.loads(self.rfile.read(length) or b"{}")
+                except (ValueError, json.JSONDecodeError):
+                    return self._respond(400, {"error": "invalid JSON"})
+                if not isinstance(event, dict) or not event.get("source"):
+                    return self._respond(400, {"error": "event must be an object with a source"})
+
+                if server.emit(event):
+                    logger.info(f"Event pushed from {event.get('source')}")
+                    return self._respond(202, {"status": "queued"})
+                return self._respond(200, {"status": "ignored"})
+
+            def _respond(self, status: int, body: Dict[str, Any]):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="sago-webhook", daemon=True)
+        self._thread.start()
+        logger.info(f"Webhook endpoint listening on http://{self._server.server_address[0]}:{self.port}/events")
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -2,20 +2,29 @@ import logging
 import argparse
 import sys
 import os
+import re
+import glob
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.ingestion.pdf_processor import PDFIngestor
 from src.analysis.claim_extractor import ClaimExtractor
-from src.analysis.verifier import Verifier
-from src.analysis.analyst import Analyst
+from src.analysis.verifier import (
+    Verifier, VerificationPipeline, VerificationBudget, VerificationScheduler, NOT_CHECKED_STATUS, parse_budget_limits
+)
+from src.analysis.claim_store import ClaimVerificationStore
+from src.analysis.analyst import Analyst, report_failed
 from src.utils.llm_client import LLMClient
 from src.utils.search_client import SearchClient
 from src.utils.db_client import DBClient
+from src.utils import metrics
+from src.utils.prompt_budget import truncate_to_tokens
 from src.analysis.portfolio_manager import PortfolioManager
+from src.batch import BatchRunner, resolve_inputs
 
 import logging
 
@@ -27,6 +36,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger("SagoAgent")
 
+# Failures caused by the input itself; retrying the same deck cannot succeed
+PERMANENT_ERRORS = (FileNotFoundError, ValueError)
+# Verdicts that mean no evidence was weighed, e.g. during a search outage
+FAILED_VERIFICATION_STATUSES = {"Unverified", "Error"}
+
 # ... (Logging config remains same)
 
 class AgentOrchestrator:
@@ -34,7 +48,21 @@ class AgentOrchestrator:
     Orchestrates the multi-agent workflow:
     Ingestion -> Extraction -> Verification -> Analysis -> Output
     """
-    def __init__(self):
+    # Share of a run's deadline kept for the report; verification stops starting new claims before it
+    REPORT_RESERVE_FRACTION = 0.25
+    def __init__(self, max_concurrency: Optional[int] = None, batch_size: Optional[int] = None,
+                 reuse_max_age_hours: Optional[float] = None, pipeline: Optional[bool] = None):
+        # Upper bound on claims verified at the same time within one run
+        self.max_concurrency = max_concurrency or int(os.getenv("SAGO_VERIFY_CONCURRENCY", "4"))
+        # Claims per batched synthesis call; 1 verifies each claim on its own
+        self.batch_size = batch_size if batch_size is not None else int(os.getenv("SAGO_VERIFY_BATCH_SIZE", "5"))
+        # Identical decks analyzed within this window are served from the DB; 0 disables reuse
+        self.reuse_max_age_hours = reuse_max_age_hours if reuse_max_age_hours is not None \
+            else float(os.getenv("SAGO_REUSE_MAX_AGE_HOURS", "24"))
+        # Stream extraction and start verifying each claim as soon as it is parsed. Opt-in: lower latency,
+        # but claims are batched as they arrive, which costs an extra LLM call per extra batch
+        self.pipeline = pipeline if pipeline is not None else os.getenv("SAGO_PIPELINE_VERIFICATION", "0") == "1"
+
         self.llm_client = LLMClient()
         self.search_client = SearchClient()
         self.db_client = DBClient() # Initialize Persistence
@@ -42,39 +70,113 @@ class AgentOrchestrator:
         
         # Initialize Agents
         self.ingestor = PDFIngestor()
-        self.extractor = ClaimExtractor(self.llm_client)
-        self.verifier = Verifier(self.llm_client, self.search_client)
+        self.extractor = ClaimExtractor(self.llm_client, max_workers=self.max_concurrency)
+        self.claim_store = ClaimVerificationStore.from_env()
+        self.verifier = Verifier(self.llm_client, self.search_client, claim_store=self.claim_store)
         self.analyst = Analyst(self.llm_client)
 
     
-    def run(self, pdf_path: str, user_context: Dict[str, str] = None) -> Dict[str, Any]:
+    def run(self, pdf_path: str, user_context: Dict[str, str] = None,
+            max_concurrency: Optional[int] = None, force: bool = False,
+            on_update: Optional[Callable[[str], None]] = None, deadline_seconds: Optional[float] = None,
+            max_llm_calls: Optional[int] = None, max_search_calls: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Analyzes one deck. If `on_update` is given, it is called with the reply so far as it
+        grows: first the claim verdict table, then the memo one section at a time.
+        With `deadline_seconds` or a call budget for verification, claims are verified most important
+        first and those that do not fit are marked "Not checked (budget)" instead of delaying the report.
+        A deadline of 0 has already expired. Raises ValueError for limits that are not numbers.
+        """
+        deadline_seconds, max_llm_calls, max_search_calls = parse_budget_limits(
+            deadline_seconds, max_llm_calls, max_search_calls
+        )
         start_time = time.time()
         user_context = user_context or {"user_id": "cli_user", "source": "cli"}
         
         logger.info(f"Starting Sago Agent for: {pdf_path}")
         logger.info(f"User Context: {user_context}")
 
+        run_metrics = metrics.RunMetrics()
+        with metrics.run_scope(run_metrics):
+            budget = None
+            if deadline_seconds is not None or max_llm_calls is not None or max_search_calls is not None:
+                budget = VerificationBudget(
+                    deadline=start_time + deadline_seconds * (1 - self.REPORT_RESERVE_FRACTION)
+                    if deadline_seconds is not None else None,
+                    max_llm_calls=max_llm_calls,
+                    max_search_calls=max_search_calls
+                )
+            return self._run(pdf_path, user_context, max_concurrency, force, start_time, run_metrics, on_update, budget)
+
+    def _run(self, pdf_path: str, user_context: Dict[str, str], max_concurrency: Optional[int],
+             force: bool, start_time: float, run_metrics: "metrics.RunMetrics",
+             on_update: Optional[Callable[[str], None]] = None,
+             budget: Optional[VerificationBudget] = None) -> Dict[str, Any]:
         try:
+            fingerprint = self.ingestor.fingerprint(pdf_path)
+            if not force and self.reuse_max_age_hours > 0:
+                prior = self.db_client.find_recent_analysis(fingerprint, self.reuse_max_age_hours * 3600)
+                # An analysis cut short by a deadline or budget, or otherwise unfit to store, is not served to later requests
+                if prior and ((prior["metadata"].get("budget") or {}).get("not_checked")
+                              or self._not_reusable(prior["analysis"].get("final_report"), prior["analysis"].get("claims"))):
+                    prior = None
+                if prior:
+                    execution_time = int((time.time() - start_time) * 1000)
+                    metrics.record_first_content(time.time() - start_time)
+                    logger.info(f"Deck {fingerprint[:12]} was analyzed at {prior['metadata'].get('timestamp')}. Reusing stored analysis.")
+                    return {
+                        "claims": prior["analysis"]["claims"],
+                        "report": prior["analysis"]["final_report"],
+                        "status": "success",
+                        "reused": True,
+                        "metrics": {"time_ms": execution_time}
+                    }
+
             logger.info("--- Step 1: Ingestion ---")
-            text_content = self.ingestor.extract_text(pdf_path)
+            with metrics.stage("ingestion"):
+                text_content = self.ingestor.extract_text(pdf_path)
             logger.info("PDF Text Extracted.")
             
-            logger.info("--- Step 1.5: Portfolio Context ---")
-            portfolio_ctx = self.portfolio_manager.get_context()
+            max_concurrency = max_concurrency or self.max_concurrency
+            # A budget needs the whole claim list to prioritize, so it is not combined with pipelining
+            pipeline = VerificationPipeline(self.verifier, max_concurrency, self.batch_size) \
+                if self.pipeline and budget is None else None
+            try:
+                logger.info("--- Step 2: Claim Extraction ---")
+                with metrics.stage("extraction"):
+                    claims = self.extractor.extract_claims(
+                        text_content, on_claim=pipeline.submit if pipeline else None
+                    )
+                logger.info(f"Extracted {len(claims)} verifyable claims.")
 
-            logger.info("--- Step 2: Claim Extraction ---")
-            claims = self.extractor.extract_claims(text_content)
-            logger.info(f"Extracted {len(claims)} verifyable claims.")
+                logger.info("--- Step 2.5: Portfolio Context ---")
+                with metrics.stage("portfolio_context"):
+                    portfolio_ctx = self.portfolio_manager.get_context(
+                        query_text=self._portfolio_query(claims, text_content), deck_text=text_content
+                    )
 
-            logger.info("--- Step 3: Verification (Parallel-Simulated) ---")
-            verified_claims = []
-            for claim in claims:
-                result = self.verifier.verify_claim(claim)
-                verified_claims.append(result)
-                logger.info(f"Verified: {result.get('statement')} -> {result.get('verification_status')}")
+                logger.info("--- Step 3: Verification (Parallel) ---")
+                with metrics.stage("verification"):
+                    if pipeline:
+                        # Claims streamed during extraction are already being verified
+                        verified_claims = pipeline.results(claims)
+                    elif budget:
+                        verified_claims = VerificationScheduler(
+                            self.verifier, budget, max_concurrency, self.batch_size
+                        ).verify(claims)
+                    else:
+                        verified_claims = self._verify_claims(claims, max_concurrency)
+            finally:
+                if pipeline:
+                    pipeline.close()
 
             logger.info("--- Step 4: Analyst Review ---")
-            final_report = self.analyst.generate_report(verified_claims, portfolio_context=portfolio_ctx)
+            if on_update is None:
+                with metrics.stage("analysis"):
+                    final_report = self.analyst.generate_report(verified_claims, portfolio_context=portfolio_ctx)
+            else:
+                final_report = self._stream_report(verified_claims, portfolio_ctx, on_update, start_time)
+            metrics.record_first_content(time.time() - start_time)
             
             execution_time = int((time.time() - start_time) * 1000)
             logger.info(f"--- Step 5: Persistence ({execution_time}ms) ---")
@@ -83,20 +185,36 @@ class AgentOrchestrator:
                 "user_id": user_context.get("user_id"),
                 "source": user_context.get("source"),
                 "filename": os.path.basename(pdf_path),
+                "fingerprint": fingerprint,
+                "company": user_context.get("company") or self._company_name(final_report),
                 "execution_time_ms": execution_time
             }
+            if budget:
+                metadata["budget"] = {
+                    **budget.as_dict(),
+                    "not_checked": sum(c.get("verification_status") == NOT_CHECKED_STATUS for c in verified_claims)
+                }
             
-            self.db_client.save_analysis(
-                metadata=metadata,
-                claims=verified_claims,
-                report=final_report
-            )
+            not_reusable = self._not_reusable(final_report, verified_claims)
+            if not_reusable:
+                # Stored analyses are reused for later requests, so a failed run is not kept
+                logger.warning(f"Analysis not saved: {not_reusable}.")
+            else:
+                with metrics.stage("persistence"):
+                    metadata["metrics"] = run_metrics.snapshot()
+                    self.db_client.save_analysis(
+                        metadata=metadata,
+                        claims=verified_claims,
+                        report=final_report
+                    )
             
             return {
                 "claims": verified_claims,
                 "report": final_report,
                 "status": "success",
-                "metrics": {"time_ms": execution_time}
+                "reused": False,
+                "budget": metadata.get("budget"),
+                "metrics": {"time_ms": execution_time, **run_metrics.snapshot()}
             }
 
         except Exception as e:
@@ -105,28 +223,137 @@ class AgentOrchestrator:
             return {
                 "claims": [],
                 "report": f"Analysis Failed: {str(e)}",
-                "status": "error"
+                "status": "error",
+                # A missing or unreadable deck fails the same way on every retry
+                "retryable": not isinstance(e, PERMANENT_ERRORS)
             }
 
+    def _not_reusable(self, report: Any, claims: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+        """Why an analysis must not be saved or served again, or None if it may be."""
+        if report_failed(report):
+            return "report generation failed"
+        if self.llm_client.client is None:
+            return "the LLM ran in mock mode"
+        if claims and all(c.get("verification_status") in FAILED_VERIFICATION_STATUSES for c in claims):
+            return "every claim failed verification"
+        return None
+
+    def _stream_report(self, verified_claims: List[Dict[str, Any]], portfolio_ctx: str,
+                       on_update: Callable[[str], None], start_time: float) -> str:
+        """Publishes the verdict table right away, then each memo section as it is generated."""
+        verdicts = self.analyst.verdict_table(verified_claims)
+        self._publish(on_update, verdicts, start_time)
+
+        sections = []
+        with metrics.stage("analysis"):
+            for section in self.analyst.stream_report(verified_claims, portfolio_context=portfolio_ctx):
+                sections.append(section)
+                self._publish(on_update, f"{verdicts}\n{''.join(sections)}", start_time)
+        return "".join(sections)
+
+    @staticmethod
+    def _publish(on_update: Callable[[str], None], content: str, start_time: float):
+        metrics.record_first_content(time.time() - start_time)
+        try:
+            on_update(content)
+        except Exception as e:
+            # Delivery problems must not fail the analysis; the caller retries with the final reply
+            logger.warning(f"Progress update failed: {e}")
+
+    def _verify_claims(self, claims: List[Dict[str, Any]], max_concurrency: int) -> List[Dict[str, Any]]:
+        if self.batch_size > 1 and len(claims) > 1:
+            try:
+                verified_claims = self.verifier.verify_claims(
+                    claims, batch_size=self.batch_size, max_workers=max_concurrency
+                )
+                for result in verified_claims:
+                    logger.info(f"Verified: {result.get('statement')} -> {result.get('verification_status')}")
+                return verified_claims
+            except Exception as e:
+                logger.error(f"Batched verification failed, verifying claims individually: {e}")
+
+        return self._verify_claims_individually(claims, max_concurrency)
+
+    def _verify_claims_individually(self, claims: List[Dict[str, Any]], max_concurrency: int) -> List[Dict[str, Any]]:
+        """
+        Verifies claims on a bounded thread pool.
+        Results keep the original claim order; a failing claim is marked as such
+        without affecting the others.
+        """
+        if not claims:
+            return []
+
+        workers = max(1, min(max_concurrency, len(claims)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="verifier") as pool:
+            futures = [metrics.submit(pool, self.verifier.verify_claim, claim) for claim in claims]
+
+            verified_claims = []
+            for claim, future in zip(claims, futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Verification failed for claim '{claim.get('statement')}': {e}")
+                    result = dict(claim)
+                    result.update({
+                        "verification_status": "Error",
+                        "reasoning": f"Verification failed: {e}",
+                        "sources": []
+                    })
+                verified_claims.append(result)
+                logger.info(f"Verified: {result.get('statement')} -> {result.get('verification_status')}")
+
+        return verified_claims
+
+    @staticmethod
+    def _portfolio_query(claims: List[Dict[str, Any]], text: str) -> str:
+        """Retrieval query for portfolio context: the claims plus the opening of the deck."""
+        statements = " ".join(c.get("statement", "") for c in claims)
+        return f"{statements} {truncate_to_tokens(text, 500)}"
+
+    @staticmethod
+    def _company_name(report: str) -> Optional[str]:
+        """Company named in the memo heading, e.g. '# Investment Analysis: EcoStream AI'."""
+        if not isinstance(report, str):
+            return None
+        match = re.search(r"^#\s+[^:\n]*:\s*(.+?)\s*$", report, re.MULTILINE)
+        return match.group(1) if match else None
+
     def close(self):
         """Clean up resources"""
         if self.db_client:
             self.db_client.close()
+        if self.claim_store:
+            self.claim_store.close()
 
 
 def main():
     parser = argparse.ArgumentParser(description="Sago Pitch Deck Verifier Agent")
-    parser.add_argument("--input", required=True, help="Path to the pitch deck PDF")
+    parser.add_argument("--input", required=True, help="Path to the pitch deck PDF, or a directory or glob of decks for batch mode")
     parser.add_argument("--output", default="output_report.md", help="Path to save the output report")
+    parser.add_argument("--output-dir", default="batch_reports", help="Batch mode: directory for per-deck reports and summary.jsonl")
+    parser.add_argument("--jobs", type=int, default=None, help="Batch mode: decks analyzed at the same time")
+    parser.add_argument("--no-resume", action="store_true", help="Batch mode: re-analyze decks already listed as done in the summary")
     parser.add_argument("--user", default="admin@sago.vc", help="User ID (email) triggering the agent")
+    parser.add_argument("--force", action="store_true", help="Re-run the analysis even if this deck was analyzed recently")
+    parser.add_argument("--concurrency", type=int, default=None, help="Max claims verified in parallel")
+    parser.add_argument("--batch-size", type=int, default=None, help="Claims per batched verification call (1 disables batching)")
+    parser.add_argument("--deadline", type=float, default=None, help="Seconds until the report is due; lower-priority claims may go unchecked")
+    parser.add_argument("--max-llm-calls", type=int, default=None, help="LLM calls allowed for verification")
+    parser.add_argument("--max-search-calls", type=int, default=None, help="Web searches allowed for verification")
     args = parser.parse_args()
 
-    orchestrator = AgentOrchestrator()
+    orchestrator = AgentOrchestrator(max_concurrency=args.concurrency, batch_size=args.batch_size)
     
     try:
+        if os.path.isdir(args.input) or glob.has_magic(args.input):
+            sys.exit(run_batch(orchestrator, args))
+
         # Simulate user context from CLI args
         user_context = {"user_id": args.user, "source": "cli_tool"}
-        results = orchestrator.run(args.input, user_context=user_context)
+        results = orchestrator.run(
+            args.input, user_context=user_context, force=args.force, deadline_seconds=args.deadline,
+            max_llm_calls=args.max_llm_calls, max_search_calls=args.max_search_calls
+        )
         
         # Output Handling
         with open(args.output, "w") as f:
@@ -144,5 +371,25 @@ def main():
     finally:
         orchestrator.close()
 
+
+def run_batch(orchestrator: AgentOrchestrator, args: argparse.Namespace) -> int:
+    """Analyzes every deck matched by `--input` with the shared orchestrator. Returns the exit code."""
+    paths = resolve_inputs(args.input)
+    if not paths:
+        logger.error(f"No PDF decks found for {args.input}")
+        return 1
+
+    runner = BatchRunner(
+        orchestrator, args.output_dir, jobs=args.jobs,
+        user_context={"user_id": args.user, "source": "cli_batch"},
+        force=args.force, resume=not args.no_resume
+    )
+    counts = runner.run(paths)
+    logger.info(
+        f"Batch Complete: {counts['success']} analyzed, {counts['skipped']} skipped, "
+        f"{counts['error']} failed. Summary: {runner.summary_path}"
+    )
+    return 1 if counts["error"] else 0
+
 if __name__ == "__main__":
     main()
@@ -6,6 +6,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.core import SagoSystem
+from src.utils.metrics import MetricsServer
 
 # Configure logging
 logging.basicConfig(
@@ -14,8 +15,17 @@ logging.basicConfig(
 )
 
 if __name__ == "__main__":
+    # Prometheus scrape endpoint; SAGO_METRICS_PORT=0 disables it
+    metrics_port = int(os.getenv("SAGO_METRICS_PORT", "9100"))
+    metrics_server = MetricsServer(port=metrics_port) if metrics_port else None
+    if metrics_server:
+        metrics_server.start()
+
     system = SagoSystem()
     try:
         system.start()
     except KeyboardInterrupt:
         system.stop()
+    finally:
+        if metrics_server:
+            metrics_server.stop()
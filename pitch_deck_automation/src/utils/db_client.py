@@ -1,58 +1,465 @@
 import os
+import json
+import time
+import base64
 import logging
-from typing import Dict, Any, Optional
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
-from datetime import datetime
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+
+from .cache import cache_dir
 
 logger = logging.getLogger(__name__)
 
+# pymongo.DESCENDING; pymongo itself is only imported when connecting
+DESCENDING = -1
+
+# (name, keys) of every index the query API relies on; each ends in the listing sort order
+INDEXES = [
+    ("fingerprint_timestamp", [("metadata.fingerprint", DESCENDING), ("metadata.timestamp", DESCENDING)]),
+    ("timestamp_id", [("metadata.timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ("user_timestamp_id", [("metadata.user_id", DESCENDING), ("metadata.timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ("source_timestamp_id", [("metadata.source", DESCENDING), ("metadata.timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ("filename_timestamp_id", [("metadata.filename", DESCENDING), ("metadata.timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ("company_timestamp_id", [("metadata.company_key", DESCENDING), ("metadata.timestamp", DESCENDING), ("_id", DESCENDING)]),
+]
+
+# Listings leave out the heavy fields unless asked for
+HEAVY_FIELDS = {"report": "analysis.final_report", "claims": "analysis.claims"}
+LISTING_SORT = [("metadata.timestamp", DESCENDING), ("_id", DESCENDING)]
+MAX_PAGE_SIZE = 200
+# Mongo's duplicate key error: the document was already written by an earlier attempt
+DUPLICATE_KEY = 11000
+
+
+def _encode(value: Any) -> Any:
+    from bson import ObjectId
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    return str(value)
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if set(obj) == {"$date"}:
+        return datetime.fromisoformat(obj["$date"])
+    if set(obj) == {"$oid"}:
+        from bson import ObjectId
+        return ObjectId(obj["$oid"])
+    return obj
+
+
+def _assign_ids(documents: List[Dict[str, Any]]):
+    """Gives each document its _id up front, so a retried insert cannot write a second copy."""
+    from bson import ObjectId
+    for document in documents:
+        document.setdefault("_id", ObjectId())
+
+
+def _unwritten(documents: List[Dict[str, Any]], error: Exception) -> List[Dict[str, Any]]:
+    """
+    Documents of a failed insert_many that still need writing. A BulkWriteError lists the failed
+    indexes; duplicate keys were written by an earlier attempt. Any other error may have hit every document.
+    """
+    details = getattr(error, "details", None)
+    if not isinstance(details, dict) or "writeErrors" not in details:
+        return documents
+    failed = sorted({e["index"] for e in details["writeErrors"] if e.get("code") != DUPLICATE_KEY})
+    return [documents[i] for i in failed]
+
+
+def company_key(company: Optional[str]) -> Optional[str]:
+    """Case- and whitespace-insensitive form of a company name, used for indexed lookups."""
+    return " ".join(company.lower().split()) if company else None
+
+
+def encode_cursor(document: Dict[str, Any]) -> str:
+    """Opaque page cursor: the sort position (timestamp, _id) of the last document on a page."""
+    position = {"ts": document["metadata"]["timestamp"].isoformat(), "id": str(document["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    from bson import ObjectId
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(position["ts"]), ObjectId(position["id"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
 class DBClient:
-    def __init__(self, uri: Optional[str] = None):
+    """
+    MongoDB persistence for analyses.
+    By default writes are buffered and flushed by a background thread (write-behind),
+    so `save_analysis` returns without waiting on Mongo. Documents that cannot be written
+    are spilled to a local JSONL file (up to `max_spill_bytes`) and replayed once Mongo is
+    reachable again; while it is down, writes retry the connection every `reconnect_interval` seconds.
+    The connection is checked on a background thread, so construction never blocks on Mongo.
+    """
+    def __init__(self, uri: Optional[str] = None, write_behind: Optional[bool] = None,
+                 batch_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 max_buffer: Optional[int] = None, spill_path: Optional[str] = None,
+                 max_retries: int = 3, retry_backoff: float = 0.5,
+                 max_spill_bytes: Optional[int] = None, reconnect_interval: Optional[float] = None):
         self.uri = uri or os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-        self.client: Optional[MongoClient] = None
+        self.client: Optional[Any] = None
         self.db: Optional[Any] = None
         self.collection: Optional[Any] = None
-        
-        try:
-            self.client = MongoClient(self.uri, serverSelectionTimeoutMS=2000)
-            self.client.admin.command('ping')
-            self.db = self.client["sago_db"]
-            self.collection = self.db["pitch_deck_analyses"]
-            logger.info("Connected to MongoDB.")
-        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-            logger.warning(f"Could not connect to MongoDB at {self.uri}. Persistence will be disabled. Error: {e}")
-            self.client = None
+
+        self.write_behind = write_behind if write_behind is not None else os.getenv("SAGO_DB_WRITE_BEHIND", "1") != "0"
+        # A flush is triggered once `batch_size` documents are pending or every `flush_interval` seconds
+        self.batch_size = batch_size or int(os.getenv("SAGO_DB_BATCH_SIZE", "50"))
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("SAGO_DB_FLUSH_SECONDS", "2"))
+        # Pending documents beyond this go straight to the spill file
+        self.max_buffer = max_buffer or int(os.getenv("SAGO_DB_MAX_BUFFER", "1000"))
+        self.spill_path = spill_path or os.getenv("SAGO_DB_SPILL_PATH") or os.path.join(cache_dir(), "db_spill.jsonl")
+        self.max_spill_bytes = max_spill_bytes or int(os.getenv("SAGO_DB_SPILL_MAX_MB", "64")) * 1024 * 1024
+        self.reconnect_interval = (reconnect_interval if reconnect_interval is not None
+                                   else float(os.getenv("SAGO_DB_RECONNECT_SECONDS", "30")))
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._pending: "deque[Dict[str, Any]]" = deque()
+        self._cond = threading.Condition()
+        self._spill_lock = threading.Lock()
+        self._closing = False
+        self._flusher: Optional[threading.Thread] = None
+
+        # Connecting (and the ping that can take the full server selection timeout when Mongo is down)
+        # happens in the background; the first call that needs the collection waits for it
+        self._connect_lock = threading.Lock()
+        self._connected = False
+        self._last_connect_attempt = 0.0
+        if self.write_behind:
+            self._flusher = threading.Thread(target=self._flush_loop, name="db-write-behind", daemon=True)
+            self._flusher.start()
+        else:
+            threading.Thread(target=self._connect, name="db-connect", daemon=True).start()
+
+    def _connect(self, retry: bool = False) -> Optional[Any]:
+        """
+        Connects and pings Mongo once, then replays spilled analyses.
+        With `retry`, a failed connection is attempted again once `reconnect_interval` has passed.
+        Returns the collection, or None if Mongo is unreachable.
+        """
+        with self._connect_lock:
+            if self._connected and (not retry or self.collection is not None
+                                    or time.time() - self._last_connect_attempt < self.reconnect_interval):
+                return self.collection
+            self._last_connect_attempt = time.time()
+            from pymongo import MongoClient
+            client = None
+            try:
+                client = MongoClient(self.uri, serverSelectionTimeoutMS=2000)
+                client.admin.command('ping')
+                self.client = client
+                self.db = self.client["sago_db"]
+                self.collection = self.db["pitch_deck_analyses"]
+                self.ensure_indexes()
+                logger.info("Connected to MongoDB.")
+            except Exception as e:
+                # Runs on a background thread, so any failure just means Mongo is unavailable
+                logger.warning(f"Could not connect to MongoDB at {self.uri}. Analyses will be spilled to {self.spill_path}. Error: {e}")
+                if client is not None:
+                    client.close()
+                self.client = self.db = self.collection = None
+            finally:
+                self._connected = True
+            if self.collection is not None:
+                self.replay_spill()
+            return self.collection
+
+    def _get_collection(self) -> Optional[Any]:
+        return self.collection if self._connected else self._connect()
+
+    def ensure_indexes(self):
+        for name, keys in INDEXES:
+            self.collection.create_index(keys, name=name)
 
     def save_analysis(self, metadata: Dict[str, Any], claims: list, report: str) -> bool:
-        if self.collection is None:
-            logger.warning("Skipping DB save (No connection).")
-            return False
+        """
+        Persists an analysis. In write-behind mode the document is only queued;
+        returns True once it is queued, written or spilled to disk.
+        """
+        document = {
+            "metadata": {
+                "user_id": metadata.get("user_id", "anonymous"),
+                "source": metadata.get("source", "cli"),
+                "filename": metadata.get("filename", "unknown"),
+                "fingerprint": metadata.get("fingerprint"),
+                "company": metadata.get("company"),
+                "company_key": company_key(metadata.get("company")),
+                "timestamp": datetime.utcnow(),
+                "execution_time_ms": metadata.get("execution_time_ms", 0),
+                "metrics": metadata.get("metrics", {}),
+                "budget": metadata.get("budget")
+            },
+            "analysis": {
+                "claims_count": len(claims),
+                "claims": claims,
+                "final_report": report
+            }
+        }
+
+        if not self.write_behind:
+            return self._write_batch([document])
+
+        with self._cond:
+            if not self._closing and len(self._pending) < self.max_buffer:
+                self._pending.append(document)
+                if len(self._pending) >= self.batch_size:
+                    self._cond.notify()
+                logger.info(f"[DB] Analysis queued ({len(self._pending)} pending) | User: {document['metadata']['user_id']}")
+                return True
 
+        logger.warning("[DB] Write buffer full or closing. Spilling analysis to disk.")
+        return self._spill([document])
+
+    def _flush_loop(self):
+        self._connect()
+        while True:
+            if self.collection is None and os.path.exists(self.spill_path):
+                # Replays the spill as soon as Mongo is back, even with nothing new to write
+                self._connect(retry=True)
+            with self._cond:
+                if not self._closing and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                done = self._closing and not self._pending
+            if batch:
+                self._write_batch(batch)
+            if done:
+                break
+
+    def flush(self):
+        """Writes every pending document now, on the calling thread."""
+        while True:
+            with self._cond:
+                batch = list(self._pending)
+                self._pending.clear()
+            if not batch:
+                return
+            self._write_batch(batch)
+
+    def _write_batch(self, documents: List[Dict[str, Any]]) -> bool:
+        """
+        Inserts `documents` with retries and exponential backoff, spilling them on final failure.
+        Only the documents that failed are retried.
+        """
+        _assign_ids(documents)
+        collection = self._connect(retry=True)
+        if collection is None:
+            return self._spill(documents)
+
+        remaining = documents
+        for attempt in range(self.max_retries + 1):
+            try:
+                collection.insert_many([dict(d) for d in remaining], ordered=False)
+                logger.info(f"[DB] {len(remaining)} analyses saved.")
+                return True
+            except Exception as e:
+                remaining = _unwritten(remaining, e)
+                if not remaining:
+                    logger.info(f"[DB] {len(documents)} analyses saved.")
+                    return True
+                if attempt == self.max_retries:
+                    logger.error(f"Failed to save {len(remaining)} analyses to DB after {attempt + 1} attempts: {e}")
+                    break
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning(f"DB write of {len(remaining)} analyses failed ({e}). Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+        return self._spill(remaining)
+
+    def _spill(self, documents: List[Dict[str, Any]]) -> bool:
+        _assign_ids(documents)
+        lines = [json.dumps(document, default=_encode) + "\n" for document in documents]
         try:
-            document = {
-                "metadata": {
-                    "user_id": metadata.get("user_id", "anonymous"),
-                    "source": metadata.get("source", "cli"),
-                    "filename": metadata.get("filename", "unknown"),
-                    "timestamp": datetime.utcnow(),
-                    "execution_time_ms": metadata.get("execution_time_ms", 0)
-                },
-                "analysis": {
-                    "claims_count": len(claims),
-                    "claims": claims,
-                    "final_report": report
-                }
-            }
-            result = self.collection.insert_one(document)
-            logger.info(f"[DB] Analysis saved. ID: {result.inserted_id} | User: {document['metadata']['user_id']}")
+            with self._spill_lock:
+                directory = os.path.dirname(self.spill_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                size = os.path.getsize(self.spill_path) if os.path.exists(self.spill_path) else 0
+                if size + sum(len(line.encode("utf-8")) for line in lines) > self.max_spill_bytes:
+                    logger.error(f"[DB] Spill file {self.spill_path} is full ({size} bytes). Dropping {len(documents)} analyses.")
+                    return False
+                with open(self.spill_path, "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+            logger.warning(f"[DB] Spilled {len(documents)} analyses to {self.spill_path}")
             return True
         except Exception as e:
-            logger.error(f"Failed to save to DB: {e}")
+            logger.error(f"Failed to spill analyses to {self.spill_path}: {e}")
             return False
 
+    def replay_spill(self) -> int:
+        """
+        Inserts analyses spilled by earlier failures and clears the spill file. Analyses that still
+        fail are kept in it. Returns the number replayed.
+        """
+        if self._get_collection() is None:
+            return 0
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return 0
+            with open(self.spill_path, encoding="utf-8") as f:
+                documents = [json.loads(line, object_hook=_decode) for line in f if line.strip()]
+            # Spills written before documents carried their _id get one now
+            _assign_ids(documents)
+            remaining: List[Dict[str, Any]] = []
+            if documents:
+                try:
+                    self.collection.insert_many(documents, ordered=False)
+                except Exception as e:
+                    remaining = _unwritten(documents, e)
+                    if remaining:
+                        logger.error(f"Failed to replay {len(remaining)} spilled analyses, keeping them in {self.spill_path}: {e}")
+            if remaining:
+                with open(self.spill_path, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(document, default=_encode) + "\n" for document in remaining)
+            else:
+                os.remove(self.spill_path)
+        replayed = len(documents) - len(remaining)
+        logger.info(f"[DB] Replayed {replayed} spilled analyses.")
+        return replayed
+
+    @property
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def find_recent_analysis(self, fingerprint: str, max_age_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Returns the newest analysis of the deck with this fingerprint,
+        if one was saved within the last `max_age_seconds`.
+        Analyses still waiting in the write buffer are included.
+        """
+        if not fingerprint:
+            return None
+
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+        with self._cond:
+            for document in reversed(self._pending):
+                meta = document["metadata"]
+                if meta["fingerprint"] == fingerprint and meta["timestamp"] >= cutoff:
+                    return document
+
+        if self._get_collection() is None:
+            return None
+
+        try:
+            return self.collection.find_one(
+                {"metadata.fingerprint": fingerprint, "metadata.timestamp": {"$gte": cutoff}},
+                sort=[("metadata.timestamp", DESCENDING)]
+            )
+        except Exception as e:
+            logger.error(f"Failed to look up prior analysis: {e}")
+            return None
+
+    @staticmethod
+    def _build_filter(user_id: Optional[str] = None, source: Optional[str] = None, filename: Optional[str] = None,
+                      company: Optional[str] = None, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> Dict[str, Any]:
+        query: Dict[str, Any] = {}
+        if user_id:
+            query["metadata.user_id"] = user_id
+        if source:
+            query["metadata.source"] = source
+        if filename:
+            query["metadata.filename"] = filename
+        if company:
+            query["metadata.company_key"] = company_key(company)
+        if since or until:
+            query["metadata.timestamp"] = {
+                **({"$gte": since} if since else {}),
+                **({"$lt": until} if until else {})
+            }
+        return query
+
+    @staticmethod
+    def _projection(include_report: bool, include_claims: bool) -> Optional[Dict[str, int]]:
+        excluded = [field for key, field in HEAVY_FIELDS.items()
+                    if not {"report": include_report, "claims": include_claims}[key]]
+        return {field: 0 for field in excluded} or None
+
+    def find_analyses(self, user_id: Optional[str] = None, source: Optional[str] = None,
+                      filename: Optional[str] = None, company: Optional[str] = None,
+                      since: Optional[datetime] = None, until: Optional[datetime] = None,
+                      limit: int = 20, cursor: Optional[str] = None,
+                      include_report: bool = False, include_claims: bool = False) -> Dict[str, Any]:
+        """
+        Lists stored analyses, newest first, matching all given filters (`until` is exclusive).
+        Returns {"items": [...], "next_cursor": str or None}; pass `next_cursor` back to get
+        the following page. The report and claims are left out unless requested.
+        """
+        if self._get_collection() is None:
+            return {"items": [], "next_cursor": None}
+
+        query = self._build_filter(user_id, source, filename, company, since, until)
+        if cursor:
+            last_ts, last_id = decode_cursor(cursor)
+            # Keyset pagination: resume strictly after the last (timestamp, _id) seen
+            after = {"$or": [
+                {"metadata.timestamp": {"$lt": last_ts}},
+                {"metadata.timestamp": last_ts, "_id": {"$lt": last_id}}
+            ]}
+            query = {"$and": [query, after]} if query else after
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        try:
+            documents = list(
+                self.collection.find(query, self._projection(include_report, include_claims))
+                .sort(LISTING_SORT)
+                .limit(limit + 1)
+            )
+        except Exception as e:
+            logger.error(f"Failed to query analyses: {e}")
+            return {"items": [], "next_cursor": None}
+
+        items = documents[:limit]
+        next_cursor = encode_cursor(items[-1]) if len(documents) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    def count_analyses(self, user_id: Optional[str] = None, source: Optional[str] = None,
+                       filename: Optional[str] = None, company: Optional[str] = None,
+                       since: Optional[datetime] = None, until: Optional[datetime] = None) -> int:
+        """Counts stored analyses matching the filters. Unfiltered counts come from collection metadata."""
+        if self._get_collection() is None:
+            return 0
+
+        query = self._build_filter(user_id, source, filename, company, since, until)
+        try:
+            if not query:
+                return self.collection.estimated_document_count()
+            return self.collection.count_documents(query)
+        except Exception as e:
+            logger.error(f"Failed to count analyses: {e}")
+            return 0
+
+    def get_analysis(self, analysis_id: str, include_report: bool = True,
+                     include_claims: bool = True) -> Optional[Dict[str, Any]]:
+        from bson import ObjectId
+        if self._get_collection() is None:
+            return None
+        try:
+            return self.collection.find_one({"_id": ObjectId(analysis_id)},
+                                            self._projection(include_report, include_claims))
+        except Exception as e:
+            logger.error(f"Failed to load analysis {analysis_id}: {e}")
+            return None
+
     def close(self):
-        """Close the MongoDB connection"""
-        if self.client:
-            self.client.close()
-            logger.info("MongoDB connection closed.")
+        """Flush pending writes and close the MongoDB connection"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+        # Waits for a connection attempt still running in the background
+        with self._connect_lock:
+            if self.client:
+                self.client.close()
+                logger.info("MongoDB connection closed.")
@@ -0,0 +1,93 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def event_key(event: Dict[str, Any]) -> Optional[str]:
+    """
+    Identity of an inbound event: its source plus its message id. None (no deduplication)
+    without one; thread and channel ids are shared by every later deck in the conversation.
+    """
+    if not event.get("message_id"):
+        return None
+    return f"{event.get('source')}:message_id:{event['message_id']}"
+
+
+class IdempotencyStore:
+    """
+    Remembers which events were already accepted.
+    A bounded in-memory LRU answers repeat lookups; SQLite makes the record survive restarts.
+    """
+    def __init__(self, path: str, max_memory_keys: int = 10000, retention_days: float = 30):
+        self.path = path
+        self.max_memory_keys = max_memory_keys
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen_events (key TEXT PRIMARY KEY, first_seen REAL NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS failed_events (key TEXT PRIMARY KEY, attempts INTEGER NOT NULL, last_failed REAL NOT NULL)"
+        )
+        cutoff = time.time() - retention_days * 86400
+        self._conn.execute("DELETE FROM seen_events WHERE first_seen < ?", (cutoff,))
+        self._conn.execute("DELETE FROM failed_events WHERE last_failed < ?", (cutoff,))
+        self._conn.commit()
+
+    def check_and_record(self, key: str) -> bool:
+        """Records `key` and returns True if it is new; returns False for a duplicate."""
+        with self._lock:
+            if key in self._recent:
+                self._recent.move_to_end(key)
+                self.duplicates += 1
+                return False
+
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO seen_events (key, first_seen) VALUES (?, ?)", (key, time.time())
+            )
+            self._conn.commit()
+            self._remember(key)
+            if cursor.rowcount == 0:
+                self.duplicates += 1
+                return False
+            return True
+
+    def forget(self, key: str):
+        """Removes `key`, e.g. when an accepted event could not be queued or processed."""
+        with self._lock:
+            self._recent.pop(key, None)
+            self._conn.execute("DELETE FROM seen_events WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def record_failure(self, key: str) -> int:
+        """Counts a failed attempt at `key` and returns the attempts so far. Kept across `forget`."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO failed_events (key, attempts, last_failed) VALUES (?, 1, ?) "
+                "ON CONFLICT(key) DO UPDATE SET attempts = attempts + 1, last_failed = excluded.last_failed",
+                (key, time.time())
+            )
+            self._conn.commit()
+            return self._conn.execute("SELECT attempts FROM failed_events WHERE key = ?", (key,)).fetchone()[0]
+
+    def _remember(self, key: str):
+        self._recent[key] = None
+        while len(self._recent) > self.max_memory_keys:
+            self._recent.popitem(last=False)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"duplicates_dropped": self.duplicates, "recent_keys": len(self._recent)}
@@ -1,44 +1,339 @@
 import os
+import re
+import json
+import time
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
-from openai import OpenAI
+import threading
+from types import SimpleNamespace
+from typing import Optional, List, Dict, Any, Iterator, Tuple, TYPE_CHECKING
 from dotenv import load_dotenv
 
+from .rate_limiter import RateLimiter, get_rate_limiter
+from .cache import TTLCache, SQLiteCache, TieredCache, make_cache_key, cache_dir
+from .prompt_budget import count_tokens
+from .model_router import ModelRouter, ModelRoute
+from . import metrics
+
+if TYPE_CHECKING:
+    from openai import OpenAI, AsyncOpenAI
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Rough completion size used when estimating tokens per minute for the limiter
+EXPECTED_COMPLETION_TOKENS = 500
+
+
 class LLMClient:
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4"):
+    # Async clients are shared per event loop and API key: an AsyncOpenAI connection pool is bound
+    # to the loop it was first used on, and fails with "Event loop is closed" on any other
+    _async_clients: Dict[Tuple[Any, str], "AsyncOpenAI"] = {}
+    _async_clients_lock = threading.Lock()
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4",
+                 rate_limiter: Optional[RateLimiter] = None, cache: Optional[TieredCache] = None,
+                 router: Optional[ModelRouter] = None):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             logger.warning("OPENAI_API_KEY not found. LLM calls will fail unless mocked.")
-        self.client = OpenAI(api_key=self.api_key) if self.api_key else None
+        # The OpenAI SDK is slow to import, so the client is only built on first use
+        self._client: Optional["OpenAI"] = None
+        self._client_ready = not self.api_key
+        self._client_lock = threading.Lock()
         self.model = model
+        # Picks the model, timeout and max_tokens per call site; `model` is the default route's model
+        self.router = router or ModelRouter.from_env(model)
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # Responses are only cached for real API calls; mock responses never touch the cache
+        self.cache = cache if cache is not None else (self._default_cache() if self.api_key else None)
+
+    @property
+    def client(self) -> Optional["OpenAI"]:
+        if not self._client_ready:
+            with self._client_lock:
+                if not self._client_ready:
+                    from openai import OpenAI
+                    self._client = OpenAI(api_key=self.api_key)
+                    self._client_ready = True
+        return self._client
 
-    def chat_completion(self, messages: List[Dict[str, str]], json_mode: bool = False) -> str:
+    @client.setter
+    def client(self, value: Optional["OpenAI"]):
+        self._client = value
+        self._client_ready = True
+
+    @staticmethod
+    def _default_cache() -> Optional[TieredCache]:
+        if os.getenv("SAGO_LLM_CACHE", "1") == "0":
+            return None
+        ttl_seconds = float(os.getenv("SAGO_LLM_CACHE_TTL_HOURS", "168")) * 3600
+        try:
+            disk = SQLiteCache(
+                os.path.join(cache_dir(), "llm_cache.sqlite"),
+                ttl_seconds=ttl_seconds,
+                max_bytes=int(os.getenv("SAGO_LLM_CACHE_MAX_MB", "256")) * 1024 * 1024
+            )
+        except Exception as e:
+            logger.warning(f"LLM disk cache unavailable, using memory only: {e}")
+            disk = None
+        return TieredCache(TTLCache(max_entries=512, ttl_seconds=ttl_seconds), disk, name="llm")
+
+    @property
+    def async_client(self) -> Optional["AsyncOpenAI"]:
+        if not self.api_key:
+            return None
+        from openai import AsyncOpenAI
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside a loop there is nothing to share the pool with
+            return AsyncOpenAI(api_key=self.api_key)
+        with self._async_clients_lock:
+            for key in [key for key in self._async_clients if key[0].is_closed()]:
+                # The loop that owned this pool is gone, and so are its connections
+                del self._async_clients[key]
+            key = (loop, self.api_key)
+            if key not in self._async_clients:
+                self._async_clients[key] = AsyncOpenAI(api_key=self.api_key)
+            return self._async_clients[key]
+
+    def chat_completion(self, messages: List[Dict[str, str]], json_mode: bool = False,
+                        use_cache: bool = True, call_site: str = "default") -> str:
+        """
+        `call_site` names the caller (e.g. "claim_extraction"); it selects the model route
+        and labels per-site metrics.
+        """
         if not self.client:
             logger.warning("No API Key. Using MOCK response.")
-            return self._get_mock_response(messages, json_mode)
+            return self._mock_completion(messages, json_mode, call_site)
+
+        route_name, route = self.router.resolve(call_site)
+        models = self._models_to_try(route_name, route)
+        cache_key = self._cache_key(messages, json_mode, route.model)
+        if use_cache and self.cache is not None:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                metrics.record_llm_call(call_site, "cache")
+                return cached
 
+        started = time.perf_counter()
         try:
-            params: Dict[str, Any] = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": 0.0,
-            }
-            if json_mode:
-                params["response_format"] = {"type": "json_object"}
+            self.rate_limiter.acquire(self._estimate_tokens(messages))
+            for attempt, model in enumerate(models):
+                attempt_started = time.perf_counter()
+                try:
+                    response = self.client.chat.completions.create(**self._build_params(messages, json_mode, route, model))
+                except Exception as e:
+                    if not self._record_failure(route_name, model, attempt_started, e, attempt + 1 < len(models)):
+                        raise
+                    continue
+                self.router.record(route_name, model, time.perf_counter() - attempt_started, "ok")
+                break
+            content = self._extract_content(response)
+            self._record_api_call(call_site, started, response)
+            if self.cache is not None:
+                self._cache_set(cache_key, content, model)
+            return content
+
+        except Exception as e:
+            metrics.record_llm_call(call_site, "error", time.perf_counter() - started)
+            logger.error(f"LLM API Call failed: {str(e)}")
+            raise
+
+    async def achat_completion(self, messages: List[Dict[str, str]], json_mode: bool = False,
+                               use_cache: bool = True, call_site: str = "default") -> str:
+        """Async variant of `chat_completion` backed by the shared AsyncOpenAI client."""
+        client = self.async_client
+        if not client:
+            logger.warning("No API Key. Using MOCK response.")
+            return self._mock_completion(messages, json_mode, call_site)
 
-            response = self.client.chat.completions.create(**params)
-            content = response.choices[0].message.content
-            if not content:
-                raise ValueError("Received empty response from LLM.")
+        route_name, route = self.router.resolve(call_site)
+        models = self._models_to_try(route_name, route)
+        cache_key = self._cache_key(messages, json_mode, route.model)
+        if use_cache and self.cache is not None:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                metrics.record_llm_call(call_site, "cache")
+                return cached
+
+        started = time.perf_counter()
+        try:
+            await self.rate_limiter.acquire_async(self._estimate_tokens(messages))
+            for attempt, model in enumerate(models):
+                attempt_started = time.perf_counter()
+                try:
+                    response = await client.chat.completions.create(**self._build_params(messages, json_mode, route, model))
+                except Exception as e:
+                    if not self._record_failure(route_name, model, attempt_started, e, attempt + 1 < len(models)):
+                        raise
+                    continue
+                self.router.record(route_name, model, time.perf_counter() - attempt_started, "ok")
+                break
+            content = self._extract_content(response)
+            self._record_api_call(call_site, started, response)
+            if self.cache is not None:
+                self._cache_set(cache_key, content, model)
             return content
 
         except Exception as e:
+            metrics.record_llm_call(call_site, "error", time.perf_counter() - started)
             logger.error(f"LLM API Call failed: {str(e)}")
             raise
 
+    def stream_chat_completion(self, messages: List[Dict[str, str]], json_mode: bool = False,
+                               use_cache: bool = True, call_site: str = "default") -> Iterator[str]:
+        """
+        Streaming variant of `chat_completion`: yields the completion in chunks as they arrive.
+        Cached and mock responses are yielded line by line. A timed-out stream is not retried on
+        the fallback model, since part of it may already have been yielded.
+        """
+        if not self.client:
+            logger.warning("No API Key. Using MOCK response.")
+            yield from self._mock_completion(messages, json_mode, call_site).splitlines(keepends=True)
+            return
+
+        route_name, route = self.router.resolve(call_site)
+        model = self.router.select_model(route_name)
+        cache_key = self._cache_key(messages, json_mode, route.model)
+        if use_cache and self.cache is not None:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                metrics.record_llm_call(call_site, "cache")
+                yield from cached.splitlines(keepends=True)
+                return
+
+        started = time.perf_counter()
+        parts: List[str] = []
+        usage = None
+        try:
+            self.rate_limiter.acquire(self._estimate_tokens(messages))
+            stream = self.client.chat.completions.create(
+                **self._build_params(messages, json_mode, route, model), stream=True, stream_options={"include_usage": True}
+            )
+            for chunk in stream:
+                # The final chunk carries token usage and no choices
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            self._record_failure(route_name, model, started, e, False)
+            metrics.record_llm_call(call_site, "error", time.perf_counter() - started)
+            logger.error(f"LLM API Call failed: {str(e)}")
+            raise
+
+        content = "".join(parts)
+        if not content:
+            metrics.record_llm_call(call_site, "error", time.perf_counter() - started)
+            raise ValueError("Received empty response from LLM.")
+        self.router.record(route_name, model, time.perf_counter() - started, "ok")
+        self._record_api_call(call_site, started, SimpleNamespace(usage=usage))
+        if self.cache is not None:
+            self._cache_set(cache_key, content, model)
+
+    def _mock_completion(self, messages: List[Dict[str, str]], json_mode: bool, call_site: str) -> str:
+        content = self._get_mock_response(messages, json_mode)
+        # Mock calls still go through routing, so route selection and stats work offline
+        route_name, _ = self.router.resolve(call_site)
+        self.router.record(route_name, self.router.select_model(route_name), 0.0, "mock")
+        metrics.record_llm_call(
+            call_site, "mock",
+            prompt_tokens=sum(count_tokens(m.get("content") or "") for m in messages),
+            completion_tokens=count_tokens(content)
+        )
+        return content
+
+    @staticmethod
+    def _record_api_call(call_site: str, started: float, response: Any):
+        usage = getattr(response, "usage", None)
+        metrics.record_llm_call(
+            call_site, "api", time.perf_counter() - started,
+            prompt_tokens=int(getattr(usage, "prompt_tokens", 0) or 0),
+            completion_tokens=int(getattr(usage, "completion_tokens", 0) or 0)
+        )
+
+    def _models_to_try(self, route_name: str, route: ModelRoute) -> List[str]:
+        """The selected model, then the route's fallback if the primary was selected."""
+        model = self.router.select_model(route_name)
+        if model == route.model and route.fallback_model and route.fallback_model != model:
+            return [model, route.fallback_model]
+        return [model]
+
+    def _record_failure(self, route_name: str, model: str, started: float, error: Exception, can_retry: bool) -> bool:
+        """Records a failed attempt; returns True if it timed out and the next model should be tried."""
+        timed_out = self._is_timeout(error)
+        self.router.record(route_name, model, time.perf_counter() - started, "timeout" if timed_out else "error")
+        if timed_out and can_retry:
+            logger.warning(f"LLM call on route '{route_name}' timed out with {model}; retrying with fallback model")
+            return True
+        return False
+
+    @staticmethod
+    def _is_timeout(error: Exception) -> bool:
+        if isinstance(error, TimeoutError):
+            return True
+        try:
+            from openai import APITimeoutError
+        except ImportError:
+            return False
+        return isinstance(error, APITimeoutError)
+
+    @staticmethod
+    def _build_params(messages: List[Dict[str, str]], json_mode: bool, route: ModelRoute, model: str) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "temperature": 0.0,
+            "timeout": route.timeout,
+        }
+        if route.max_tokens:
+            params["max_tokens"] = route.max_tokens
+        if json_mode:
+            params["response_format"] = {"type": "json_object"}
+        return params
+
+    @staticmethod
+    def _cache_key(messages: List[Dict[str, str]], json_mode: bool, model: str) -> str:
+        """
+        Keyed on the route's primary `model` rather than the one that answered, so a response
+        from the fallback model is found again while the route is degraded.
+        Every call runs at temperature 0.0, so model + messages + json_mode determine the output.
+        """
+        return make_cache_key("route", model, messages, json_mode)
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        cached = self.cache.get(key)
+        return json.loads(cached)["content"] if cached is not None else None
+
+    def _cache_set(self, key: str, content: str, model: str):
+        # Records which model actually produced the response
+        self.cache.set(key, json.dumps({"content": content, "model": model}))
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.cache.stats() if self.cache is not None else {}
+
+    def route_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-route call counts, fallbacks, timeouts and latency."""
+        return self.router.stats()
+
+    @staticmethod
+    def _extract_content(response: Any) -> str:
+        content = response.choices[0].message.content
+        if not content:
+            raise ValueError("Received empty response from LLM.")
+        return content
+
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict[str, str]]) -> int:
+        # ~4 characters per token is close enough for rate limiting purposes
+        prompt_chars = sum(len(m.get("content") or "") for m in messages)
+        return prompt_chars // 4 + EXPECTED_COMPLETION_TOKENS
+
     def _get_mock_response(self, messages: List[Dict[str, str]], json_mode: bool) -> str:
         last_msg = messages[-1]['content']
         
@@ -77,39 +372,26 @@ class LLMClient:
             }
             '''
 
+        if "For each claim below, generate 2 specific google search queries" in last_msg:
+            ids = [int(i) for i in re.findall(r"^\[(\d+)\]", last_msg, re.MULTILINE)]
+            return json.dumps({
+                "claims": [
+                    {"id": i, "queries": ["waste management market size 2030 projection", "EcoStream AI Waste Management Inc partnership"]}
+                    for i in ids
+                ]
+            })
+
         if "Based on these results, verify the claim" in last_msg:
-            if "2000 Trillion" in last_msg:
-                return '''
-                {
-                    "verification_status": "Contradicted",
-                    "reasoning": "Market research indicates the market is in the billions, not trillions. $2000 Trillion is likely a hallucination or typo.",
-                    "sources": ["https://grandviewresearch.com/waste-management"]
-                }
-                '''
-            elif "Partnered with" in last_msg:
-                return '''
-                {
-                    "verification_status": "Verified",
-                    "reasoning": "Press releases confirm the pilot partnership with WM in 2024.",
-                    "sources": ["https://techcrunch.com/ecostream-wm-partnership"]
-                }
-                '''
-            elif "only company" in last_msg:
-                 return '''
-                {
-                    "verification_status": "Contradicted",
-                    "reasoning": "Multiple competitors like AMP Robotics exist in this space.",
-                    "sources": ["https://amprobotics.com"]
-                }
-                '''
-            else:
-                 return '''
-                {
-                    "verification_status": "Inconclusive",
-                    "reasoning": "No public financial records found for private company ARR.",
-                    "sources": []
-                }
-                '''
+            return json.dumps(self._mock_verdict(last_msg))
+
+        if "Based on these results, verify each claim" in last_msg:
+            sections = re.split(r"^### Claim \[(\d+)\]", last_msg, flags=re.MULTILINE)[1:]
+            return json.dumps({
+                "verdicts": [
+                    {"id": int(claim_id), **self._mock_verdict(section)}
+                    for claim_id, section in zip(sections[0::2], sections[1::2])
+                ]
+            })
 
         if "Summarize the verification findings" in last_msg:
             return """
@@ -125,3 +407,29 @@ The technology is promising, but the pitch deck contains significant inaccuracie
             """
             
         return "{}"
+
+    @staticmethod
+    def _mock_verdict(claim_text: str) -> Dict[str, Any]:
+        if "2000 Trillion" in claim_text:
+            return {
+                "verification_status": "Contradicted",
+                "reasoning": "Market research indicates the market is in the billions, not trillions. $2000 Trillion is likely a hallucination or typo.",
+                "sources": ["https://grandviewresearch.com/waste-management"]
+            }
+        elif "Partnered with" in claim_text:
+            return {
+                "verification_status": "Verified",
+                "reasoning": "Press releases confirm the pilot partnership with WM in 2024.",
+                "sources": ["https://techcrunch.com/ecostream-wm-partnership"]
+            }
+        elif "only company" in claim_text:
+            return {
+                "verification_status": "Contradicted",
+                "reasoning": "Multiple competitors like AMP Robotics exist in this space.",
+                "sources": ["https://amprobotics.com"]
+            }
+        return {
+            "verification_status": "Inconclusive",
+            "reasoning": "No public financial records found for private company ARR.",
+            "sources": []
+        }
@@ -0,0 +1,350 @@
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        return lines + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(self._labels(k))} {v}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, fn: Callable[[], float], **labels):
+        """Reads the value from `fn` at scrape time."""
+        with self._lock:
+            self._functions[self._key(labels)] = fn
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, fn in functions.items():
+            try:
+                values[key] = float(fn())
+            except Exception as e:
+                logger.debug(f"Gauge {self.name} callback failed: {e}")
+        return [f"{self.name}{_format_labels(self._labels(k))} {v}" for k, v in values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # Per-bucket counts followed by sum and count
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            series_items = [(k, list(v)) for k, v in self._series.items()]
+        for key, series in series_items:
+            labels = self._labels(key)
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': str(bound)})} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_LATENCY = REGISTRY.histogram("sago_stage_latency_seconds", "Pipeline stage latency.", ["stage"])
+LLM_CALLS = REGISTRY.counter("sago_llm_calls_total", "LLM calls by call site and outcome (api, cache, mock, error).",
+                             ["call_site", "outcome"])
+LLM_TOKENS = REGISTRY.counter("sago_llm_tokens_total", "LLM tokens by call site and kind (prompt, completion).",
+                              ["call_site", "kind"])
+LLM_LATENCY = REGISTRY.histogram("sago_llm_latency_seconds", "LLM call latency by call site.", ["call_site"])
+LLM_ROUTE_CALLS = REGISTRY.counter("sago_llm_route_calls_total",
+                                  "API calls by model route, model and outcome (ok, error, timeout, mock).",
+                                  ["route", "model", "outcome"])
+SEARCH_CALLS = REGISTRY.counter("sago_search_calls_total", "Search requests by outcome (network, cache, collapsed, error).",
+                                ["outcome"])
+SEARCH_LATENCY = REGISTRY.histogram("sago_search_latency_seconds", "Web search latency.")
+CACHE_LOOKUPS = REGISTRY.counter("sago_cache_lookups_total", "Cache lookups by cache and result (hit, miss).",
+                                 ["cache", "result"])
+PROMPT_TOKENS_SAVED = REGISTRY.counter("sago_prompt_tokens_saved_total", "Prompt tokens saved by budgeting.", ["call_site"])
+PDF_PAGE_LATENCY = REGISTRY.histogram("sago_pdf_page_extract_seconds", "Per-page PDF text extraction time.",
+                                      buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5))
+QUEUE_DEPTH = REGISTRY.gauge("sago_event_queue_depth", "Events waiting in the SagoSystem queue.")
+QUEUE_WAIT = REGISTRY.histogram("sago_event_queue_wait_seconds", "Time events spend queued before processing.", ["source"])
+TIME_TO_FIRST_CONTENT = REGISTRY.histogram("sago_time_to_first_content_seconds",
+                                           "Time from the start of an analysis until the user first sees results.")
+EVENTS_DROPPED = REGISTRY.counter("sago_events_dropped_total", "Inbound events dropped as duplicates.", ["source"])
+
+
+class RunMetrics:
+    """Per-analysis counters, persisted alongside each stored analysis."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages_ms: Dict[str, float] = {}
+        self.llm_calls: Dict[str, Dict[str, int]] = {}
+        self.search: Dict[str, int] = {}
+        self.search_ms = 0.0
+        self.cache: Dict[str, Dict[str, int]] = {}
+        self.first_content_ms: Optional[float] = None
+
+    def add_stage(self, stage: str, seconds: float):
+        with self._lock:
+            self.stages_ms[stage] = round(self.stages_ms.get(stage, 0.0) + seconds * 1000, 2)
+
+    def add_llm_call(self, call_site: str, outcome: str, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            site = self.llm_calls.setdefault(call_site, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            site["calls"] += 1
+            site[outcome] = site.get(outcome, 0) + 1
+            site["prompt_tokens"] += prompt_tokens
+            site["completion_tokens"] += completion_tokens
+
+    def add_search(self, outcome: str, seconds: float):
+        with self._lock:
+            self.search[outcome] = self.search.get(outcome, 0) + 1
+            self.search_ms = round(self.search_ms + seconds * 1000, 2)
+
+    def add_cache(self, cache: str, hit: bool):
+        with self._lock:
+            counts = self.cache.setdefault(cache, {"hit": 0, "miss": 0})
+            counts["hit" if hit else "miss"] += 1
+
+    def set_first_content(self, seconds: float) -> bool:
+        """Records time to first content once per run; returns False if it was already set."""
+        with self._lock:
+            if self.first_content_ms is not None:
+                return False
+            self.first_content_ms = round(seconds * 1000, 2)
+            return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "stages_ms": dict(self.stages_ms),
+                "llm_calls": {k: dict(v) for k, v in self.llm_calls.items()},
+                "llm_calls_total": sum(v["calls"] for v in self.llm_calls.values()),
+                "search": {**self.search, "total_ms": self.search_ms},
+                "cache": {k: dict(v) for k, v in self.cache.items()},
+                "time_to_first_content_ms": self.first_content_ms
+            }
+
+
+_current_run: contextvars.ContextVar[Optional[RunMetrics]] = contextvars.ContextVar("sago_run_metrics", default=None)
+
+
+@contextmanager
+def run_scope(run: RunMetrics) -> Iterator[RunMetrics]:
+    """Attributes everything recorded in this context (and in `submit`-ed work) to `run`."""
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+def current_run() -> Optional[RunMetrics]:
+    return _current_run.get()
+
+
+def submit(pool, fn: Callable, *args, **kwargs):
+    """`pool.submit` that carries the caller's run scope into the worker thread."""
+    ctx = contextvars.copy_context()
+    return pool.submit(ctx.run, fn, *args, **kwargs)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.observe(elapsed, stage=name)
+        run = current_run()
+        if run is not None:
+            run.add_stage(name, elapsed)
+
+
+def record_llm_call(call_site: str, outcome: str, seconds: float = 0.0,
+                    prompt_tokens: int = 0, completion_tokens: int = 0):
+    LLM_CALLS.inc(call_site=call_site, outcome=outcome)
+    if outcome == "api":
+        LLM_LATENCY.observe(seconds, call_site=call_site)
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, call_site=call_site, kind="prompt")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, call_site=call_site, kind="completion")
+    run = current_run()
+    if run is not None:
+        run.add_llm_call(call_site, outcome, prompt_tokens, completion_tokens)
+
+
+def record_first_content(seconds: float):
+    """Called when results first reach the user; only the first call per run counts."""
+    run = current_run()
+    if run is None or run.set_first_content(seconds):
+        TIME_TO_FIRST_CONTENT.observe(seconds)
+
+
+def record_search(outcome: str, seconds: float = 0.0):
+    SEARCH_CALLS.inc(outcome=outcome)
+    if outcome in ("network", "error"):
+        SEARCH_LATENCY.observe(seconds)
+    run = current_run()
+    if run is not None:
+        run.add_search(outcome, seconds)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+    run = current_run()
+    if run is not None:
+        run.add_cache(cache, hit)
+
+
+class MetricsServer:
+    """Serves REGISTRY in Prometheus text format on GET /metrics."""
+    def __init__(self, host: str = "0.0.0.0", port: int = 9100, registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def _handler_class(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0].rstrip("/") != "/metrics":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                payload = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="sago-metrics", daemon=True)
+        self._thread.start()
+        logger.info(f"Metrics endpoint listening on http://{self._server.server_address[0]}:{self.port}/metrics")
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import logging
+import threading
+import statistics
+from collections import deque
+from typing import Optional, Dict, Any, Tuple
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+FAST_MODEL = "gpt-4o-mini"
+
+
+class ModelRoute:
+    """
+    Model and request limits for one call site. When the primary model's recent median latency
+    exceeds `slow_after` seconds, or a call times out, the route switches to `fallback_model`.
+    """
+    def __init__(self, model: str, timeout: float = 60.0, max_tokens: Optional[int] = None,
+                 fallback_model: Optional[str] = None, slow_after: Optional[float] = None):
+        self.model = model
+        self.timeout = timeout
+        self.max_tokens = max_tokens
+        self.fallback_model = fallback_model
+        self.slow_after = slow_after
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"model": self.model, "timeout": self.timeout, "max_tokens": self.max_tokens,
+                "fallback_model": self.fallback_model, "slow_after": self.slow_after}
+
+
+def default_routes(model: str) -> Dict[str, ModelRoute]:
+    """Built-in routing table; `model` is the client's main model."""
+    return {
+        "default": ModelRoute(model, timeout=60),
+        "claim_extraction": ModelRoute(model, timeout=60, max_tokens=4000, fallback_model=FAST_MODEL, slow_after=30),
+        # Short JSON lists of search queries do not need the large model
+        "query_generation": ModelRoute(FAST_MODEL, timeout=15, max_tokens=200),
+        "query_generation_batch": ModelRoute(FAST_MODEL, timeout=30, max_tokens=1500),
+        "verification_synthesis": ModelRoute(model, timeout=45, max_tokens=600, fallback_model=FAST_MODEL, slow_after=20),
+        "verification_synthesis_batch": ModelRoute(model, timeout=90, max_tokens=3000, fallback_model=FAST_MODEL, slow_after=40),
+        "report": ModelRoute(model, timeout=120, max_tokens=2500),
+    }
+
+
+class _RouteState:
+    def __init__(self, window: int):
+        self.calls = 0
+        self.fallback_calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.models: Dict[str, int] = {}
+        self.latencies: "deque[float]" = deque(maxlen=200)
+        # Recent primary-model latencies, used to detect a slow primary
+        self.primary_recent: "deque[float]" = deque(maxlen=window)
+        self.fallback_until = 0.0
+
+
+class ModelRouter:
+    """
+    Maps LLM call sites to routes and keeps per-route stats.
+    A call site without its own route uses its base name (without "_batch"), then "default".
+    A route whose primary model is slow or timing out is sent to its fallback model for
+    `cooldown` seconds, after which the primary is tried again.
+    """
+    def __init__(self, routes: Dict[str, ModelRoute], window: int = 10, min_samples: int = 3,
+                 cooldown: float = 60.0):
+        if "default" not in routes:
+            raise ValueError("Routing table needs a 'default' route")
+        self.routes = routes
+        self.window = window
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self._state: Dict[str, _RouteState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, model: str = "gpt-4") -> "ModelRouter":
+        """
+        Default routes, overridden per call site by SAGO_MODEL_ROUTES: inline JSON or a path to a JSON
+        file, e.g. {"report": {"model": "gpt-4o", "max_tokens": 1500}}. Unset fields keep their defaults.
+        """
+        routes = default_routes(model)
+        raw = os.getenv("SAGO_MODEL_ROUTES")
+        if raw:
+            try:
+                if os.path.exists(raw):
+                    with open(raw, encoding="utf-8") as f:
+                        raw = f.read()
+                for name, fields in json.loads(raw).items():
+                    base = routes.get(name, routes["default"]).as_dict()
+                    routes[name] = ModelRoute(**{**base, **fields})
+            except Exception as e:
+                logger.warning(f"Ignoring invalid SAGO_MODEL_ROUTES: {e}")
+        return cls(
+            routes,
+            cooldown=float(os.getenv("SAGO_MODEL_FALLBACK_COOLDOWN", "60"))
+        )
+
+    def resolve(self, call_site: str) -> Tuple[str, ModelRoute]:
+        for name in (call_site, call_site[:-len("_batch")] if call_site.endswith("_batch") else None, "default"):
+            if name and name in self.routes:
+                return name, self.routes[name]
+        return "default", self.routes["default"]
+
+    def _get_state(self, name: str) -> _RouteState:
+        state = self._state.get(name)
+        if state is None:
+            state = self._state[name] = _RouteState(self.window)
+        return state
+
+    def select_model(self, name: str) -> str:
+        """The route's primary model, or its fallback while the primary is marked slow."""
+        route = self.routes[name]
+        with self._lock:
+            state = self._get_state(name)
+            if route.fallback_model and time.time() < state.fallback_until:
+                return route.fallback_model
+        return route.model
+
+    def record(self, name: str, model: str, seconds: float, outcome: str):
+        """`outcome` is one of ok, error, timeout or mock."""
+        route = self.routes[name]
+        metrics.LLM_ROUTE_CALLS.inc(route=name, model=model, outcome=outcome)
+        with self._lock:
+            state = self._get_state(name)
+            state.calls += 1
+            state.models[model] = state.models.get(model, 0) + 1
+            if model != route.model:
+                state.fallback_calls += 1
+            if outcome == "error":
+                state.errors += 1
+            elif outcome == "timeout":
+                state.timeouts += 1
+            elif outcome == "ok":
+                state.latencies.append(seconds)
+
+            if model != route.model or not route.fallback_model:
+                return
+            if outcome == "timeout":
+                self._degrade(name, state, f"timed out after {seconds:.1f}s")
+            elif outcome == "ok" and route.slow_after is not None:
+                state.primary_recent.append(seconds)
+                if len(state.primary_recent) >= self.min_samples:
+                    median = statistics.median(state.primary_recent)
+                    if median > route.slow_after:
+                        self._degrade(name, state, f"median latency {median:.1f}s > {route.slow_after}s")
+
+    def _degrade(self, name: str, state: _RouteState, reason: str):
+        state.fallback_until = time.time() + self.cooldown
+        # The primary starts from a clean window when it is tried again
+        state.primary_recent.clear()
+        logger.warning(f"Route '{name}': {reason}; using {self.routes[name].fallback_model} for {self.cooldown:.0f}s")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            result = {}
+            for name, state in self._state.items():
+                ordered = sorted(state.latencies)
+                result[name] = {
+                    "calls": state.calls,
+                    "fallback_calls": state.fallback_calls,
+                    "errors": state.errors,
+                    "timeouts": state.timeouts,
+                    "models": dict(state.models),
+                    "avg_ms": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else None,
+                    "p95_ms": round(ordered[max(0, -(-len(ordered) * 95 // 100) - 1)] * 1000, 1) if ordered else None,
+                    "on_fallback": now < state.fallback_until
+                }
+            return result
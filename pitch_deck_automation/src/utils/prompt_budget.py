@@ -0,0 +1,139 @@
+import re
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# Order in which claims are omitted when even the slimmest form is over budget;
+# contradictions are the red flags the memo exists to surface, so they go last
+_OMIT_ORDER = {"Verified": 0, "Error": 1, "Not checked (budget)": 1, "Unverified": 2, "Inconclusive": 2}
+_OMIT_LAST = 3
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """tiktoken is optional; without it we fall back to a local approximation."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts tokens locally. Uses tiktoken when it is installed; otherwise each
+    punctuation mark counts as one token and each word as one token per 4 characters,
+    which tracks cl100k closely for English prose and JSON.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PATTERN.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = "") -> str:
+    """Longest prefix of `text` within `max_tokens` (including `marker`, appended when cut)."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    budget = max(0, max_tokens - count_tokens(marker))
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid]) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] + marker
+
+
+def compact_json(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def compact_claims(claims: List[Dict[str, Any]], max_tokens: int,
+                   reasoning_tokens: Tuple[int, ...] = (120, 40)) -> Tuple[str, Dict[str, int]]:
+    """
+    Serializes verified claims for a prompt, shedding low-value detail until the
+    result fits `max_tokens`. In order:
+    compact JSON without empty fields -> source URLs replaced by a count ->
+    reasoning shortened to each of `reasoning_tokens` -> reasoning dropped ->
+    claims omitted, Verified and low-confidence ones first and Contradicted last
+    (the count is noted in the output; the rest keep their order).
+    Returns the serialized claims and token stats against the old indented JSON dump.
+    """
+    original_tokens = count_tokens(json.dumps(claims, indent=2, default=str))
+
+    slim = [{k: v for k, v in claim.items() if v not in (None, "", [], {})} for claim in claims]
+    stages = [lambda c: c, _drop_sources]
+    stages += [lambda c, n=n: _shorten_reasoning(c, n) for n in reasoning_tokens]
+    stages.append(lambda c: {k: v for k, v in c.items() if k != "reasoning"})
+
+    serialized = compact_json(slim)
+    for stage in stages:
+        slim = [stage(claim) for claim in slim]
+        serialized = compact_json(slim)
+        if count_tokens(serialized) <= max_tokens:
+            break
+    else:
+        # Least valuable first; among equals, lower confidence and later claims go first
+        omit_order = sorted(
+            range(len(slim)),
+            key=lambda i: (_OMIT_ORDER.get(slim[i].get("verification_status"), _OMIT_LAST),
+                           _confidence(slim[i]), -i)
+        )
+        omitted = set()
+        for i in omit_order:
+            if count_tokens(serialized) <= max_tokens:
+                break
+            omitted.add(i)
+            kept = [claim for j, claim in enumerate(slim) if j not in omitted]
+            serialized = compact_json(kept + [{"omitted_claims": len(omitted)}])
+
+    final_tokens = count_tokens(serialized)
+    stats = {
+        "original_tokens": original_tokens,
+        "final_tokens": final_tokens,
+        "saved_tokens": max(0, original_tokens - final_tokens)
+    }
+    return serialized, stats
+
+
+def _confidence(claim: Dict[str, Any]) -> float:
+    try:
+        return float(claim.get("confidence_score", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _drop_sources(claim: Dict[str, Any]) -> Dict[str, Any]:
+    if "sources" not in claim:
+        return claim
+    slim = {k: v for k, v in claim.items() if k != "sources"}
+    slim["source_count"] = len(claim["sources"]) if isinstance(claim["sources"], list) else 1
+    return slim
+
+
+def _shorten_reasoning(claim: Dict[str, Any], max_tokens: int) -> Dict[str, Any]:
+    if "reasoning" not in claim:
+        return claim
+    return {**claim, "reasoning": truncate_to_tokens(str(claim["reasoning"]), max_tokens, marker="...")}
+
+
+def fit_text(text: str, max_tokens: Optional[int], label: str = "text") -> str:
+    """Token-aware replacement for character slicing; logs when text is cut."""
+    if max_tokens is None:
+        return text
+    fitted = truncate_to_tokens(text, max_tokens, marker="\n[...truncated]")
+    if fitted is not text:
+        logger.info(f"Trimmed {label} from {count_tokens(text)} to {count_tokens(fitted)} tokens.")
+    return fitted
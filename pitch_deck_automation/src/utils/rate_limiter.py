@@ -0,0 +1,76 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that hands out reservations.
+    A caller reserves `amount` units and is told how long to wait before using them,
+    so concurrent callers queue up in arrival order instead of all retrying at once.
+    """
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Reserves `amount` units and returns the number of seconds to wait."""
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_second)
+            self._updated_at = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_second
+
+
+class RateLimiter:
+    """
+    Limits LLM traffic on requests per minute (RPM) and estimated tokens per minute (TPM).
+    """
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+
+    def acquire(self, estimated_tokens: int = 0):
+        """Blocks the calling thread until the request fits within the limits."""
+        delay = self._reserve(estimated_tokens)
+        if delay > 0:
+            logger.info(f"Rate limit reached. Waiting {delay:.2f}s before LLM call.")
+            time.sleep(delay)
+
+    async def acquire_async(self, estimated_tokens: int = 0):
+        """Async counterpart of `acquire` that yields to the event loop while waiting."""
+        delay = self._reserve(estimated_tokens)
+        if delay > 0:
+            logger.info(f"Rate limit reached. Waiting {delay:.2f}s before LLM call.")
+            await asyncio.sleep(delay)
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Returns the process-wide limiter shared by every LLMClient."""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(
+                requests_per_minute=int(os.getenv("SAGO_LLM_RPM", "500")),
+                tokens_per_minute=int(os.getenv("SAGO_LLM_TPM", "90000"))
+            )
+        return _shared_limiter
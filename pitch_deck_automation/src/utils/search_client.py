@@ -1,18 +1,116 @@
+import os
+import re
+import json
+import time
 import logging
-from typing import List, Dict
-from duckduckgo_search import DDGS
+import threading
+from typing import Any, List, Dict, Optional
+
+from .cache import TTLCache, SQLiteCache, TieredCache, cache_dir
+from . import metrics
 
 logger = logging.getLogger(__name__)
 
-class SearchClient:
+# Words that do not change what a web search returns
+_STOPWORDS = {"a", "an", "the", "of", "in", "on", "for", "to", "and", "by", "with", "is", "are"}
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form used to detect equivalent queries: case, punctuation, whitespace and
+    stopwords are ignored. Word order and repeats are kept; "Acme acquired Beta" and
+    "Beta acquired Acme" are different searches.
+    """
+    tokens = (t.strip(".") for t in re.findall(r"[\w$%.]+", query.lower()))
+    return " ".join(t for t in tokens if t and t not in _STOPWORDS)
+
+
+class _InFlight:
     def __init__(self):
-        self.ddgs = DDGS()
+        self.done = threading.Event()
+        self.results: List[Dict[str, str]] = []
+
+
+class SearchClient:
+    def __init__(self, cache: Optional[TieredCache] = None):
+        # Built on the first search that misses the cache
+        self._ddgs: Optional[Any] = None
+        self._ddgs_lock = threading.Lock()
+        self.cache = cache if cache is not None else self._default_cache()
+        self._inflight: Dict[str, _InFlight] = {}
+        self._inflight_lock = threading.Lock()
+        self.collapsed_requests = 0
+
+    @property
+    def ddgs(self) -> Any:
+        with self._ddgs_lock:
+            if self._ddgs is None:
+                from duckduckgo_search import DDGS
+                self._ddgs = DDGS()
+            return self._ddgs
+
+    @staticmethod
+    def _default_cache() -> Optional[TieredCache]:
+        if os.getenv("SAGO_SEARCH_CACHE", "1") == "0":
+            return None
+        ttl_seconds = float(os.getenv("SAGO_SEARCH_CACHE_TTL_HOURS", "24")) * 3600
+        try:
+            disk = SQLiteCache(os.path.join(cache_dir(), "search_cache.sqlite"), ttl_seconds=ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Search disk cache unavailable, using memory only: {e}")
+            disk = None
+        return TieredCache(TTLCache(max_entries=2048, ttl_seconds=ttl_seconds), disk, name="search")
 
     def search(self, query: str, max_results: int = 3) -> List[Dict[str, str]]:
+        # "ordered|" keeps entries cached under the old order-insensitive keys from being served
+        key = f"ordered|{max_results}|{normalize_query(query)}"
+
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"Search cache hit for: {query}")
+                metrics.record_search("cache")
+                return json.loads(cached)
+
+        # Collapse concurrent requests for an equivalent query into one fetch
+        with self._inflight_lock:
+            inflight = self._inflight.get(key)
+            is_leader = inflight is None
+            if is_leader:
+                inflight = _InFlight()
+                self._inflight[key] = inflight
+            else:
+                self.collapsed_requests += 1
+
+        if not is_leader:
+            metrics.record_search("collapsed")
+            inflight.done.wait()
+            return list(inflight.results)
+
+        try:
+            inflight.results = self._fetch(query, max_results, key)
+            return list(inflight.results)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            inflight.done.set()
+
+    def _fetch(self, query: str, max_results: int, key: str) -> List[Dict[str, str]]:
+        started = time.perf_counter()
         try:
             logger.info(f"Searching web for: {query}")
             results = list(self.ddgs.text(query, max_results=max_results))
-            return results
+            metrics.record_search("network", time.perf_counter() - started)
         except Exception as e:
+            metrics.record_search("error", time.perf_counter() - started)
             logger.error(f"Search failed for query '{query}': {str(e)}")
+            # Failures are not cached so the next run retries
             return []
+
+        if self.cache is not None:
+            self.cache.set(key, json.dumps(results))
+        return results
+
+    def cache_stats(self) -> Dict[str, int]:
+        stats = self.cache.stats() if self.cache is not None else {}
+        return {**stats, "collapsed_requests": self.collapsed_requests}
@@ -1,3 +1,3 @@
 class MockLLMClient:
-    def chat_completion(self, messages, json_mode=False):
+    def chat_completion(self, messages, json_mode=False, **kwargs):
         return '{"claims": []}' if json_mode else "Mock Report"
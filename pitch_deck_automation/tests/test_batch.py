@@ -0,0 +1,47 @@
+import json
+import hashlib
+from unittest.mock import MagicMock
+from src.batch import BatchRunner, resolve_inputs
+
+def _orchestrator(failing=()):
+    orchestrator = MagicMock()
+    orchestrator.ingestor.fingerprint.side_effect = lambda path: hashlib.sha256(open(path, 'rb').read()).hexdigest()
+
+    def run(path, **kwargs):
+        if path.endswith(failing):
+            return {'status': 'error', 'report': 'Analysis Failed: boom'}
+        return {'status': 'success', 'report': f'# Report for {path}', 'claims': [{}], 'metrics': {'time_ms': 5}}
+    orchestrator.run.side_effect = run
+    return orchestrator
+
+def _summary(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+def test_batch_writes_reports_and_resumes(tmp_path):
+    decks = tmp_path / "decks"
+    (decks / "q3").mkdir(parents=True)
+    for name, body in [("a.pdf", b"A"), ("q3/b.pdf", b"B"), ("q3/c.pdf", b"C"), ("copy_of_a.pdf", b"A")]:
+        (decks / name).write_bytes(body)
+    (decks / "notes.txt").write_text("not a deck")
+    out = tmp_path / "out"
+
+    assert len(resolve_inputs(str(decks))) == 4
+    assert resolve_inputs(str(decks / "q3" / "*.pdf")) == [str(decks / "q3" / "b.pdf"), str(decks / "q3" / "c.pdf")]
+
+    orchestrator = _orchestrator(failing=("c.pdf",))
+    counts = BatchRunner(orchestrator, str(out), jobs=3).run(resolve_inputs(str(decks)))
+
+    # The duplicate of a.pdf is analyzed once
+    assert counts == {"total": 4, "success": 2, "error": 1, "skipped": 1}
+    entries = _summary(out / "summary.jsonl")
+    assert sorted(e["status"] for e in entries) == ["error", "success", "success"]
+    for entry in entries:
+        if entry["status"] == "success":
+            assert open(entry["report_path"]).read().startswith("# Report for")
+
+    # Only the failed deck is retried
+    retry = _orchestrator()
+    counts = BatchRunner(retry, str(out), jobs=3).run(resolve_inputs(str(decks)))
+    assert counts == {"total": 4, "success": 1, "error": 0, "skipped": 3}
+    assert [c.args[0] for c in retry.run.call_args_list] == [str(decks / "q3" / "c.pdf")]
@@ -0,0 +1,45 @@
+from benchmarks.deck_generator import generate_deck
+from benchmarks.fakes import FakeLLMClient, FakeSearchClient, LatencyProfile
+from benchmarks.run_benchmark import parse_args, run_benchmark, compare, percentile
+from benchmarks.startup_benchmark import run_startup_benchmark
+from src.ingestion.pdf_processor import PDFIngestor
+from src.analysis.claim_extractor import ClaimExtractor
+
+def test_fake_llm_recovers_generated_claims(tmp_path):
+    path = str(tmp_path / "deck.pdf")
+    statements = generate_deck(path, pages=6, claims=9, seed=3)
+
+    claims = ClaimExtractor(FakeLLMClient()).extract_claims(PDFIngestor().extract_text(path))
+
+    assert sorted(c["statement"] for c in claims) == sorted(statements)
+    assert all(2 <= c["source_page"] <= 6 for c in claims)
+
+def test_fakes_inject_failures():
+    search = FakeSearchClient(LatencyProfile(failure_rate=1.0))
+    assert search.search("anything") == []
+    assert search.failures == 1
+
+def test_benchmark_runs_offline_and_compares():
+    args = parse_args(["--decks", "3", "--distinct-decks", "2", "--pages", "4", "--claims", "4",
+                       "--llm-latency-ms", "0", "--search-latency-ms", "0"])
+    results = run_benchmark(args)
+
+    for mode in ("orchestrator", "system"):
+        summary = results["modes"][mode]
+        assert summary["errors"] == 0
+        assert summary["llm_calls_per_deck"] > 0
+        assert summary["search_calls_per_deck"] == 8  # 2 queries per claim
+        assert sum(route["calls"] for route in summary["llm_routes"].values()) == summary["llm_calls_per_deck"] * 3
+    assert results["config"]["pipeline"] is False
+    assert compare(results, results, tolerance=0.1) == []
+
+def test_percentile_nearest_rank():
+    assert percentile([3, 1, 2, 4], 50) == 2
+    assert percentile([3, 1, 2, 4], 99) == 4
+    assert percentile([], 95) == 0.0
+
+def test_cold_start_defers_heavy_clients():
+    results = run_startup_benchmark(runs=1)
+
+    # Timing is left to `python -m benchmarks.startup_benchmark --max-ms`; wall-clock limits are flaky under load
+    assert results["heavy_modules_imported"] == []
@@ -0,0 +1,44 @@
+import time
+from unittest.mock import MagicMock
+from src.utils.cache import TTLCache, SQLiteCache, TieredCache
+from src.utils.llm_client import LLMClient
+from src.utils.rate_limiter import RateLimiter
+
+def test_ttl_cache_lru_and_expiry():
+    cache = TTLCache(max_entries=2, ttl_seconds=0.05)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None  # least recently used was evicted
+    assert cache.get("a") == "1"
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+def test_sqlite_cache_persists_and_evicts_by_size(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SQLiteCache(path, max_bytes=10)
+    cache.set("a", "12345")
+    cache.set("b", "12345")
+    cache.set("c", "12345")
+    cache.close()
+
+    reopened = SQLiteCache(path, max_bytes=10)
+    assert reopened.get("a") is None
+    assert reopened.get("c") == "12345"
+
+def test_cached_rerun_makes_no_api_calls(tmp_path):
+    cache = TieredCache(TTLCache(), SQLiteCache(str(tmp_path / "llm.sqlite")))
+    llm = LLMClient(api_key="test-key", rate_limiter=RateLimiter(600, 100000), cache=cache)
+    llm.client = MagicMock()
+    llm.client.chat.completions.create.return_value.choices = [MagicMock(message=MagicMock(content='{"ok": true}'))]
+    messages = [{"role": "user", "content": "Verify this claim"}]
+
+    assert llm.chat_completion(messages, json_mode=True) == '{"ok": true}'
+    assert llm.chat_completion(messages, json_mode=True) == '{"ok": true}'
+    assert llm.chat_completion(messages, json_mode=False) == '{"ok": true}'
+    assert llm.chat_completion(messages, json_mode=True, use_cache=False) == '{"ok": true}'
+
+    assert llm.client.chat.completions.create.call_count == 3
+    assert llm.cache_stats()["hits"] == 1
@@ -0,0 +1,60 @@
+import json
+from unittest.mock import MagicMock
+from src.analysis.claim_extractor import ClaimExtractor, merge_claims, is_near_duplicate, extract_numbers
+
+def _respond(messages, json_mode=False, **kwargs):
+    deck_text = messages[-1]["content"]
+    claims = []
+    if "[Page 1]" in deck_text:
+        claims.append({"statement": "We have 50k DAU.", "category": "Traction", "confidence_score": 0.7, "page": 1})
+    if "[Page 3]" in deck_text:
+        claims.append({"statement": "We have 50k DAU", "category": "Traction", "confidence_score": 0.9, "page": 3})
+        claims.append({"statement": "ARR grew to $5M.", "category": "Financials", "confidence_score": 0.8, "page": 99})
+    return json.dumps({"claims": claims})
+
+def test_chunked_extraction_covers_all_pages_and_dedupes():
+    llm = MagicMock()
+    llm.chat_completion.side_effect = _respond
+    pages = ["Intro " + "x" * 300, "Team " + "y" * 300, "Traction " + "z" * 300]
+
+    claims = ClaimExtractor(llm, chunk_tokens=100).extract_claims("\f".join(pages))
+
+    assert llm.chat_completion.call_count == 3
+    assert [c["statement"] for c in claims] == ["We have 50k DAU.", "ARR grew to $5M."]
+    assert claims[0]["source_page"] == 1
+    assert claims[0]["confidence_score"] == 0.9
+    # Out-of-range page numbers fall back to the chunk's first page
+    assert claims[1]["source_page"] == 3
+
+def test_near_duplicates_require_matching_figures():
+    assert is_near_duplicate("Market will reach $2T by 2030", "The market will reach $2T by 2030.")
+    assert not is_near_duplicate("Market will reach $2T by 2030", "Market will reach $2000T by 2030")
+    merged = merge_claims([[{"statement": "Market will reach $2T by 2030"}],
+                           [{"statement": "Market will reach $2000T by 2030"}]])
+    assert len(merged) == 2
+
+def test_figures_compare_with_magnitude_and_unit():
+    assert not is_near_duplicate("TAM is $2B", "TAM is $2T")
+    assert not is_near_duplicate("Churn is 5% monthly", "Churn is 5 monthly")
+    assert extract_numbers("TAM is $2 billion") == extract_numbers("TAM is $2B") == ["$2000000000"]
+    assert extract_numbers("Reached 1,500 users (1.5k)") == ["1500", "1500"]
+    merged = merge_claims([[{"statement": "TAM is $2B"}], [{"statement": "TAM is $2T"}]])
+    assert len(merged) == 2
+
+def test_streamed_extraction_matches_and_forwards_claims_early():
+    llm = MagicMock()
+    llm.chat_completion.side_effect = _respond
+    # Stream each response a few characters at a time
+    llm.stream_chat_completion.side_effect = lambda messages, **kw: (
+        lambda text: (text[i:i + 7] for i in range(0, len(text), 7))
+    )(json.dumps(json.loads(_respond(messages)), indent=1))
+    pages = ["Intro " + "x" * 300, "Team " + "y" * 300, "Traction " + "z" * 300]
+
+    streamed = []
+    extractor = ClaimExtractor(llm, chunk_tokens=100, max_workers=1)
+    claims = extractor.extract_claims("\f".join(pages), on_claim=streamed.append)
+
+    assert claims == extractor.extract_claims("\f".join(pages))
+    # The near-duplicate on page 3 is not forwarded a second time
+    assert [c["statement"] for c in streamed] == ["We have 50k DAU.", "ARR grew to $5M."]
+    assert streamed[1]["source_page"] == 3
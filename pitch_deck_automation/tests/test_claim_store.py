@@ -0,0 +1,85 @@
+import time
+from unittest.mock import MagicMock
+from src.analysis.claim_store import ClaimVerificationStore
+from src.analysis.verifier import Verifier
+from src.analysis.analyst import Analyst
+from src.utils.llm_client import LLMClient
+from src.utils.rate_limiter import RateLimiter
+
+VERDICT = {"verification_status": "Contradicted", "reasoning": "Market is ~$2T.", "sources": ["https://example.com"]}
+MARKET = "Market Size"
+
+def test_near_duplicate_reuses_verdict_only_with_same_figures(tmp_path):
+    store = ClaimVerificationStore(str(tmp_path / "verdicts.sqlite"))
+    store.record("The global waste management market will reach $2T by 2030.", VERDICT, MARKET)
+
+    reused = store.lookup("Global waste management market is projected to reach $2T by 2030", MARKET)
+    assert reused["verification_status"] == "Contradicted"
+    assert reused["reused_verdict"] is True
+    assert reused["matched_statement"] == "The global waste management market will reach $2T by 2030."
+
+    assert store.lookup("Global waste management market is projected to reach $3T by 2030", MARKET) is None
+    assert store.lookup("Global waste management market is not projected to reach $2T by 2030", MARKET) is None
+    assert store.lookup("We have 50k daily active users", MARKET) is None
+    store.close()
+
+def test_figures_must_match_in_magnitude(tmp_path):
+    store = ClaimVerificationStore(str(tmp_path / "verdicts.sqlite"))
+    store.record("The global cloud security market will reach $2B by 2030.", VERDICT, MARKET)
+
+    assert store.lookup("The global cloud security market will reach $2T by 2030.", MARKET) is None
+    assert store.lookup("The global cloud security market will reach $2 trillion by 2030.", MARKET) is None
+    assert store.lookup("The global cloud security market will reach $2000M by 2030.", MARKET) is not None
+    store.close()
+
+def test_company_specific_claims_are_never_shared(tmp_path):
+    store = ClaimVerificationStore(str(tmp_path / "verdicts.sqlite"))
+    store.record("Generated $5M ARR in 2024.", VERDICT, "Financials")
+    store.record("Partnered with Waste Management Inc (WM).", VERDICT, "Traction")
+    assert store.stats()["entries"] == 0
+    assert store.lookup("Generated $5M ARR in 2024", "Financials") is None
+
+    store.record("We are the only company using AI for waste sorting.", VERDICT, "Competitors")
+    assert store.lookup("We are not the only company using AI for waste sorting", "Competitors") is None
+    assert store.lookup("The only company using AI for waste sorting", "Competitors") is not None
+    store.close()
+
+def test_verdicts_persist_and_expire(tmp_path):
+    path = str(tmp_path / "verdicts.sqlite")
+    store = ClaimVerificationStore(path)
+    store.record("Waste sorting market reaches $5B in 2024.", VERDICT, MARKET)
+    store.record("Nothing found for this $1 claim.", {"verification_status": "Unverified", "sources": []}, MARKET)
+    store.close()
+
+    reopened = ClaimVerificationStore(path)
+    assert reopened.stats()["entries"] == 1
+    assert reopened.lookup("Waste sorting market reaches $5B in 2024", MARKET) is not None
+    reopened.max_age_seconds = 0
+    time.sleep(0.01)
+    assert reopened.lookup("Waste sorting market reaches $5B in 2024", MARKET) is None
+    reopened.close()
+
+def test_verifier_skips_search_for_reused_verdicts_and_report_lists_them(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    llm = LLMClient(api_key=None, rate_limiter=RateLimiter(600, 100000))
+    search = MagicMock()
+    search.search.return_value = [{"title": "t", "body": "b", "href": "https://example.com"}]
+    store = ClaimVerificationStore(str(tmp_path / "verdicts.sqlite"))
+    store.record("The waste sorting market will reach $2T by 2030.", VERDICT, MARKET)
+    verifier = Verifier(llm, search, claim_store=store)
+
+    claims = verifier.verify_claims([
+        {"statement": "Waste sorting market will reach $2T by 2030", "category": MARKET},
+        {"statement": "We are the only company using AI for waste sorting.", "category": "Competitors"}
+    ], batch_size=5)
+
+    assert claims[0]["reused_verdict"] is True
+    assert "reused_verdict" not in claims[1]
+    assert search.search.call_count == 2  # only the second claim was searched
+    # Verdicts from the mock LLM (no API key) are not stored
+    assert store.lookup("The only company using AI for waste sorting", "Competitors") is None
+
+    report = Analyst(llm).generate_report(claims)
+    assert "## Reused Verdicts" in report
+    assert "Waste sorting market will reach $2T by 2030" in report
+    store.close()
@@ -0,0 +1,157 @@
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from src.core import SagoSystem
+from src.utils.idempotency import IdempotencyStore
+
+@pytest.fixture
+def system_factory(tmp_path):
+    with patch('src.core.AgentOrchestrator') as MockOrchestrator:
+        def factory(**kwargs):
+            kwargs.setdefault('idempotency_store', IdempotencyStore(str(tmp_path / "seen.sqlite")))
+            system = SagoSystem(**kwargs)
+            system.orchestrator.run.return_value = {'status': 'success', 'report': '# Report'}
+            return system
+        yield factory
+
+def test_workers_serve_slack_before_gmail_and_drain_on_stop(system_factory):
+    system = system_factory(num_workers=1, queue_size=10)
+    processed = []
+    system.orchestrator.run.side_effect = lambda path, **kw: processed.append(path) or {'status': 'error'}
+
+    system.is_running = system._accepting = True
+    system.enqueue({'source': 'gmail', 'attachment_path': 'gmail_1.pdf'})
+    system.enqueue({'source': 'gmail', 'attachment_path': 'gmail_2.pdf'})
+    system.enqueue({'source': 'slack', 'attachment_path': 'slack_1.pdf'})
+
+    system._start_workers()
+    system.stop(timeout=5)
+
+    assert processed == ['slack_1.pdf', 'gmail_1.pdf', 'gmail_2.pdf']
+    system.orchestrator.close.assert_called_once()
+
+def test_full_queue_blocks_producer_until_stop(system_factory):
+    system = system_factory(num_workers=1, queue_size=1)
+    system.is_running = system._accepting = True
+    assert system.enqueue({'source': 'gmail', 'attachment_path': 'a.pdf'})
+
+    outcome = []
+    producer = threading.Thread(target=lambda: outcome.append(system.enqueue({'source': 'gmail', 'attachment_path': 'b.pdf'})))
+    producer.start()
+    producer.join(timeout=0.3)
+    assert producer.is_alive()
+
+    system._accepting = False
+    producer.join(timeout=3)
+    assert outcome == [False]
+
+def test_duplicate_events_dropped_across_restarts(system_factory, tmp_path):
+    event = {'source': 'gmail', 'thread_id': 'thread_123', 'message_id': 'msg_1', 'attachment_path': 'deck.pdf'}
+
+    system = system_factory(queue_size=10)
+    system._accepting = True
+    assert system.enqueue(dict(event))
+    assert not system.enqueue(dict(event))
+    assert system.duplicates_dropped == 1
+    system.idempotency.close()
+
+    restarted = system_factory(queue_size=10, idempotency_store=IdempotencyStore(str(tmp_path / "seen.sqlite")))
+    restarted._accepting = True
+    assert not restarted.enqueue(dict(event))
+    assert restarted.enqueue({**event, 'message_id': 'msg_2'})
+    # Later decks in the same thread or channel are not duplicates
+    assert restarted.enqueue({'source': 'slack', 'channel_id': 'C1', 'attachment_path': 'a.pdf'})
+    assert restarted.enqueue({'source': 'slack', 'channel_id': 'C1', 'attachment_path': 'b.pdf'})
+
+def test_failed_analysis_can_be_redelivered(system_factory):
+    event = {'source': 'slack', 'channel_id': 'C1', 'message_id': '1.0', 'attachment_path': 'deck.pdf'}
+    system = system_factory(queue_size=10)
+    system._accepting = True
+    system.orchestrator.run.side_effect = RuntimeError("boom")
+
+    assert system.enqueue(dict(event))
+    system._process_event(dict(event))
+    assert system.enqueue(dict(event))
+
+    system.orchestrator.run.side_effect = None
+    system._process_event(dict(event))
+    assert not system.enqueue(dict(event))
+
+def test_repeatedly_failing_event_is_retried_a_bounded_number_of_times(system_factory):
+    event = {'source': 'gmail', 'thread_id': 't1', 'message_id': 'msg_9', 'attachment_path': 'deck.pdf'}
+    system = system_factory(queue_size=10, max_attempts=3)
+    system._accepting = True
+    system.orchestrator.run.return_value = {'status': 'error', 'report': 'Analysis Failed: timeout'}
+    gmail = system.connectors[0]
+    gmail.start_reply = MagicMock(return_value=None)
+    gmail.send_reply = MagicMock(return_value=True)
+
+    accepted = 0
+    for _ in range(10):
+        if system.enqueue(dict(event)):
+            accepted += 1
+            system._process_event(dict(event))
+    assert accepted == 3
+    assert gmail.send_reply.call_count == 3  # one "Analysis failed." reply per attempt
+
+    # A deck that can never be read is answered once and not retried
+    bad = {**event, 'message_id': 'msg_10'}
+    system.orchestrator.run.return_value = {'status': 'error', 'report': 'Analysis Failed: not a PDF', 'retryable': False}
+    assert system.enqueue(dict(bad))
+    system._process_event(dict(bad))
+    assert not system.enqueue(dict(bad))
+
+def test_slack_reply_is_posted_then_updated_with_streamed_content(system_factory):
+    system = system_factory()
+    slack = next(c for c in system.connectors if c.__class__.__name__ == 'SlackIntegration')
+    slack.start_reply = MagicMock(return_value={'channel': 'C1', 'ts': '1.0'})
+    slack.update_reply = MagicMock(return_value=True)
+
+    def fake_run(path, on_update=None, **kw):
+        on_update("| verdicts |")
+        on_update("| verdicts |\n# Report")
+        return {'status': 'success', 'report': '# Report'}
+    system.orchestrator.run.side_effect = fake_run
+
+    system._process_event({'source': 'slack', 'channel_id': 'C1', 'attachment_path': 'deck.pdf'})
+
+    slack.start_reply.assert_called_once()
+    assert [c.args[1] for c in slack.update_reply.call_args_list] == ["| verdicts |", "| verdicts |\n# Report"]
+
+def test_gmail_draft_is_sent_once_final(system_factory):
+    system = system_factory()
+    gmail = next(c for c in system.connectors if c.__class__.__name__ == 'GmailIntegration')
+    gmail.update_reply = MagicMock(return_value=True)
+    gmail.finish_reply = MagicMock(return_value=True)
+
+    system._process_event({'source': 'gmail', 'thread_id': 't1', 'attachment_path': 'deck.pdf'})
+
+    gmail.update_reply.assert_called_once()
+    assert gmail.update_reply.call_args.args[1] == '# Report'
+    gmail.finish_reply.assert_called_once()
+
+def test_reply_failures_do_not_block_analysis_or_leave_placeholder(system_factory):
+    system = system_factory()
+    slack = next(c for c in system.connectors if c.__class__.__name__ == 'SlackIntegration')
+    slack.start_reply = MagicMock(side_effect=RuntimeError("slack down"))
+    slack.send_reply = MagicMock(return_value=True)
+
+    system._process_event({'source': 'slack', 'channel_id': 'C1', 'attachment_path': 'deck.pdf'})
+    system.orchestrator.run.assert_called_once()
+    slack.send_reply.assert_called_once_with('C1', '# Report')
+
+    slack.start_reply = MagicMock(return_value={'channel': 'C1', 'ts': '1.0'})
+    slack.update_reply = MagicMock(return_value=True)
+    system.orchestrator.run.side_effect = TypeError("bad deadline")
+    system._process_event({'source': 'slack', 'channel_id': 'C1', 'attachment_path': 'deck.pdf'})
+    slack.update_reply.assert_called_once_with({'channel': 'C1', 'ts': '1.0'}, "Analysis failed.")
+
+def test_event_limits_are_coerced_before_running(system_factory):
+    system = system_factory()
+    system._process_event({'source': 'cli', 'attachment_path': 'deck.pdf', 'deadline_seconds': '0', 'max_llm_calls': 'many'})
+    kwargs = system.orchestrator.run.call_args.kwargs
+    assert (kwargs['deadline_seconds'], kwargs['max_llm_calls']) == (None, None)
+
+    system._process_event({'source': 'cli', 'attachment_path': 'deck.pdf', 'deadline_seconds': '0', 'max_llm_calls': '12'})
+    kwargs = system.orchestrator.run.call_args.kwargs
+    assert (kwargs['deadline_seconds'], kwargs['max_llm_calls']) == (0.0, 12)
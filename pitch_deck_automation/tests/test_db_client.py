@@ -0,0 +1,145 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+import pytest
+from bson import ObjectId
+from src.utils.db_client import DBClient
+
+@pytest.fixture
+def make_client(tmp_path):
+    clients = []
+
+    # Clients connect in the background, so the patch stays active for the whole test
+    with patch("pymongo.MongoClient") as mongo:
+        def factory(collection=None, **kwargs):
+            mongo.return_value.__getitem__.return_value.__getitem__.return_value = collection or MagicMock()
+            client = DBClient(spill_path=str(tmp_path / "spill.jsonl"), retry_backoff=0, **kwargs)
+            client._connect()
+            clients.append(client)
+            return client
+
+        yield factory
+        for client in clients:
+            client.close()
+
+def test_write_behind_batches_inserts_off_the_request_path(make_client):
+    collection = MagicMock()
+    db = make_client(collection, batch_size=10, flush_interval=60)
+
+    for i in range(3):
+        assert db.save_analysis({"fingerprint": f"fp{i}"}, claims=[], report="r")
+    collection.insert_many.assert_not_called()
+    assert db.find_recent_analysis("fp1", 60)["metadata"]["fingerprint"] == "fp1"
+
+    db.close()
+    documents = collection.insert_many.call_args[0][0]
+    assert [d["metadata"]["fingerprint"] for d in documents] == ["fp0", "fp1", "fp2"]
+
+def test_failed_writes_are_spilled_and_replayed(make_client, tmp_path):
+    failing = MagicMock()
+    failing.insert_many.side_effect = RuntimeError("mongo down")
+    db = make_client(failing, max_retries=2)
+    db.save_analysis({"fingerprint": "fp"}, claims=[{"statement": "x"}], report="r")
+    db.close()
+
+    assert failing.insert_many.call_count == 3
+    spilled = [json.loads(line) for line in open(tmp_path / "spill.jsonl")]
+    assert spilled[0]["metadata"]["fingerprint"] == "fp"
+    # Every attempt and the replay use the same _id, so Mongo never stores two copies
+    first_ids = {d["_id"] for call in failing.insert_many.call_args_list for d in call[0][0]}
+    assert len(first_ids) == 1 and spilled[0]["_id"] == {"$oid": str(first_ids.pop())}
+
+    healthy = MagicMock()
+    db = make_client(healthy, write_behind=False)
+    replayed = healthy.insert_many.call_args[0][0]
+    assert replayed[0]["analysis"]["claims"] == [{"statement": "x"}]
+    assert replayed[0]["_id"] == ObjectId(spilled[0]["_id"]["$oid"])
+    assert not (tmp_path / "spill.jsonl").exists()
+
+def test_partial_bulk_failure_retries_only_failed_documents(make_client):
+    from pymongo.errors import BulkWriteError
+    collection = MagicMock()
+    collection.insert_many.side_effect = [
+        BulkWriteError({"writeErrors": [{"index": 1, "code": 91, "errmsg": "shutdown"}]}),
+        None
+    ]
+    db = make_client(collection, write_behind=False)
+    assert db._write_batch([
+        {"metadata": {"fingerprint": "b"}}, {"metadata": {"fingerprint": "c"}}, {"metadata": {"fingerprint": "d"}}
+    ])
+
+    retried = collection.insert_many.call_args_list[-1][0][0]
+    assert [d["metadata"]["fingerprint"] for d in retried] == ["c"]
+
+def test_spill_is_capped_and_replayed_on_reconnect(make_client, tmp_path):
+    db = make_client(MagicMock(), write_behind=False, max_spill_bytes=600, reconnect_interval=0)
+    db.collection = None  # Mongo went away after startup
+
+    assert db._spill([{"metadata": {"fingerprint": "a"}, "pad": "x" * 200}])
+    assert not db._spill([{"metadata": {"fingerprint": "b"}, "pad": "x" * 500}])
+
+    # The next write reconnects, replays the spill and then writes the new document
+    with patch("pymongo.MongoClient") as mongo:
+        collection = mongo.return_value.__getitem__.return_value.__getitem__.return_value
+        assert db._write_batch([{"metadata": {"fingerprint": "c"}}])
+    written = [d["metadata"]["fingerprint"] for call in collection.insert_many.call_args_list for d in call[0][0]]
+    assert written == ["a", "c"]
+    assert not (tmp_path / "spill.jsonl").exists()
+
+def test_indexes_are_created_at_startup(make_client):
+    collection = MagicMock()
+    make_client(collection)
+
+    names = {call.kwargs["name"] for call in collection.create_index.call_args_list}
+    assert {"fingerprint_timestamp", "user_timestamp_id", "company_timestamp_id", "timestamp_id"} <= names
+
+def test_find_analyses_projects_filters_and_paginates(make_client):
+    collection = MagicMock()
+    now = datetime(2026, 1, 1)
+    page = [{"_id": ObjectId(), "metadata": {"timestamp": now - timedelta(minutes=i)}} for i in range(3)]
+    collection.find.return_value.sort.return_value.limit.return_value = page
+    db = make_client(collection)
+
+    result = db.find_analyses(user_id="a@sago.vc", company="  EcoStream AI ", since=now - timedelta(days=1), limit=2)
+
+    query, projection = collection.find.call_args[0]
+    assert query["metadata.user_id"] == "a@sago.vc"
+    assert query["metadata.company_key"] == "ecostream ai"
+    assert projection == {"analysis.final_report": 0, "analysis.claims": 0}
+    collection.find.return_value.sort.return_value.limit.assert_called_with(3)
+    assert result["items"] == page[:2]
+
+    db.find_analyses(user_id="a@sago.vc", limit=2, cursor=result["next_cursor"], include_report=True)
+    query, projection = collection.find.call_args[0]
+    resume = query["$and"][1]["$or"]
+    assert resume[1] == {"metadata.timestamp": page[1]["metadata"]["timestamp"], "_id": {"$lt": page[1]["_id"]}}
+    assert projection == {"analysis.claims": 0}
+
+    with pytest.raises(ValueError):
+        db.find_analyses(cursor="not-a-cursor")
+
+def test_count_analyses_uses_metadata_count_when_unfiltered(make_client):
+    collection = MagicMock()
+    collection.estimated_document_count.return_value = 500000
+    collection.count_documents.return_value = 12
+    db = make_client(collection)
+
+    assert db.count_analyses() == 500000
+    assert db.count_analyses(source="slack") == 12
+    collection.count_documents.assert_called_with({"metadata.source": "slack"})
+
+def test_constructor_does_not_wait_for_mongo(tmp_path):
+    release = threading.Event()
+    with patch("pymongo.MongoClient") as mongo:
+        mongo.return_value.admin.command.side_effect = lambda *args: release.wait(5)
+        collection = mongo.return_value.__getitem__.return_value.__getitem__.return_value
+        collection.estimated_document_count.return_value = 7
+
+        db = DBClient(spill_path=str(tmp_path / "spill.jsonl"), write_behind=False)
+        assert not db._connected
+
+        # The first call that needs Mongo waits for the background check
+        release.set()
+        assert db.count_analyses() == 7
+        db.close()
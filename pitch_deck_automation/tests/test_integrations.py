@@ -0,0 +1,59 @@
+import json
+import urllib.request
+import urllib.error
+import pytest
+from src.core import AdaptivePollInterval
+from src.integrations.webhook_server import WebhookServer
+
+def test_adaptive_poll_interval_backs_off_and_recovers():
+    interval = AdaptivePollInterval(1.0, 10.0)
+
+    assert interval.on_idle() == 1.5
+    assert interval.on_error() == 3.0
+    for _ in range(10):
+        interval.on_idle()
+    assert interval.current == 10.0
+    assert interval.on_event() == 1.0
+
+def _post(port, body, token=None):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/events", data=json.dumps(body).encode(), method="POST",
+        headers={"Content-Type": "application/json", **({"X-Sago-Token": token} if token else {})}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+@pytest.fixture
+def webhook():
+    received = []
+    seen = set()
+
+    def emit(event):
+        if event.get("message_id") in seen:
+            return False
+        seen.add(event.get("message_id"))
+        received.append(event)
+        return True
+
+    server = WebhookServer(emit, port=0, token="secret")
+    server.start()
+    yield server, received
+    server.stop()
+
+def test_webhook_pushes_events_into_queue(webhook):
+    server, received = webhook
+    event = {"source": "slack", "message_id": "1700000000.000100", "attachment_path": "deck.pdf"}
+
+    assert _post(server.port, event, token="secret") == 202
+    assert _post(server.port, event, token="secret") == 200
+    assert _post(server.port, {"attachment_path": "deck.pdf"}, token="secret") == 400
+    assert _post(server.port, event, token="wrong") == 401
+    assert received == [event]
+
+def test_webhook_requires_a_token(monkeypatch):
+    monkeypatch.delenv("SAGO_WEBHOOK_TOKEN", raising=False)
+    with pytest.raises(ValueError):
+        WebhookServer(lambda event: True, port=0)
@@ -0,0 +1,145 @@
+import json
+import asyncio
+from unittest.mock import MagicMock
+from src.utils.llm_client import LLMClient
+from src.utils.model_router import ModelRouter, ModelRoute
+from src.utils.rate_limiter import RateLimiter, TokenBucket
+from src.utils.cache import TieredCache, TTLCache
+from src.analysis.claim_extractor import ClaimExtractor
+from src.analysis.verifier import Verifier
+
+def test_token_bucket_queues_callers():
+    bucket = TokenBucket(capacity=2, refill_per_second=1.0)
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # Third and fourth callers wait roughly one and two refill periods
+    assert 0.9 < bucket.reserve() <= 1.0
+    assert 1.9 < bucket.reserve() <= 2.0
+
+def test_async_mock_path_without_api_key(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    llm = LLMClient(api_key=None, rate_limiter=RateLimiter(60, 10000))
+
+    claims = asyncio.run(ClaimExtractor(llm).aextract_claims("EcoStream AI deck"))
+    assert len(claims) == 4
+
+    search = MagicMock()
+    search.search.return_value = [{"title": "WM", "body": "Pilot with WM", "href": "https://example.com"}]
+    result = asyncio.run(Verifier(llm, search).averify_claim(dict(claims[1])))
+
+    assert result["verification_status"] == "Verified"
+    assert search.search.call_count == 2
+
+def _chunk(content=None, usage=None):
+    choices = [MagicMock(delta=MagicMock(content=content))] if content is not None else []
+    return MagicMock(choices=choices, usage=usage)
+
+def test_stream_chat_completion_yields_chunks_and_caches(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    mock_llm = LLMClient(api_key=None, rate_limiter=RateLimiter(60, 10000))
+    messages = [{"role": "user", "content": "Summarize the verification findings"}]
+    assert "".join(mock_llm.stream_chat_completion(messages)) == mock_llm.chat_completion(messages)
+
+    cache = TieredCache(TTLCache())
+    llm = LLMClient(api_key="test", rate_limiter=RateLimiter(60, 10000), cache=cache)
+    llm.client = MagicMock()
+    llm.client.chat.completions.create.return_value = iter([
+        _chunk("# Memo\n"), _chunk("## Risks\n"), _chunk(""), _chunk(usage=MagicMock(prompt_tokens=10, completion_tokens=4))
+    ])
+
+    assert list(llm.stream_chat_completion(messages)) == ["# Memo\n", "## Risks\n"]
+    assert llm.client.chat.completions.create.call_args.kwargs["stream"] is True
+    # Served from the cache the second time
+    assert "".join(llm.stream_chat_completion(messages)) == "# Memo\n## Risks\n"
+    assert llm.client.chat.completions.create.call_count == 1
+
+def _router(**overrides):
+    routes = {
+        "default": ModelRoute("gpt-4"),
+        "query_generation": ModelRoute("gpt-4o-mini", timeout=15, max_tokens=200),
+        "verification_synthesis": ModelRoute("gpt-4", timeout=45, max_tokens=500,
+                                              fallback_model="gpt-4o-mini", slow_after=20),
+    }
+    routes.update(overrides)
+    return ModelRouter(routes, cooldown=60)
+
+def test_router_selects_model_and_limits_per_call_site():
+    llm = LLMClient(api_key="test", rate_limiter=RateLimiter(60, 10000), cache=TieredCache(TTLCache()), router=_router())
+    llm.client = MagicMock()
+    llm.client.chat.completions.create.return_value = MagicMock(choices=[MagicMock(message=MagicMock(content="{}"))])
+    messages = [{"role": "user", "content": "hi"}]
+
+    llm.chat_completion(messages, call_site="query_generation_batch")
+    params = llm.client.chat.completions.create.call_args.kwargs
+    assert (params["model"], params["timeout"], params["max_tokens"]) == ("gpt-4o-mini", 15, 200)
+
+    llm.chat_completion(messages, call_site="report")
+    params = llm.client.chat.completions.create.call_args.kwargs
+    assert params["model"] == "gpt-4" and "max_tokens" not in params
+    assert llm.route_stats()["query_generation"]["calls"] == 1
+
+def test_timeout_retries_on_fallback_model_and_degrades_route():
+    llm = LLMClient(api_key="test", rate_limiter=RateLimiter(60, 10000), cache=TieredCache(TTLCache()), router=_router())
+    llm.client = MagicMock()
+    ok = MagicMock(choices=[MagicMock(message=MagicMock(content="done"))])
+    llm.client.chat.completions.create.side_effect = [TimeoutError("slow"), ok, ok]
+    messages = [{"role": "user", "content": "verify"}]
+
+    assert llm.chat_completion(messages, call_site="verification_synthesis") == "done"
+    models = [c.kwargs["model"] for c in llm.client.chat.completions.create.call_args_list]
+    assert models == ["gpt-4", "gpt-4o-mini"]
+
+    # The primary stays on fallback until the cooldown expires
+    llm.chat_completion(messages, call_site="verification_synthesis", use_cache=False)
+    assert llm.client.chat.completions.create.call_args.kwargs["model"] == "gpt-4o-mini"
+    stats = llm.route_stats()["verification_synthesis"]
+    assert (stats["calls"], stats["timeouts"], stats["fallback_calls"], stats["on_fallback"]) == (3, 1, 2, True)
+
+def test_fallback_responses_are_cached_under_the_route_key():
+    cache = TieredCache(TTLCache())
+    llm = LLMClient(api_key="test", rate_limiter=RateLimiter(60, 10000), cache=cache, router=_router())
+    llm.client = MagicMock()
+    ok = MagicMock(choices=[MagicMock(message=MagicMock(content="done"))])
+    llm.client.chat.completions.create.side_effect = [TimeoutError("slow"), ok]
+    messages = [{"role": "user", "content": "verify"}]
+
+    assert llm.chat_completion(messages, call_site="verification_synthesis") == "done"
+    # The route is now on its fallback; the same request is served from the cache
+    assert llm.chat_completion(messages, call_site="verification_synthesis") == "done"
+    assert llm.client.chat.completions.create.call_count == 2
+    stored = json.loads(cache.get(llm._cache_key(messages, False, "gpt-4")))
+    assert stored == {"content": "done", "model": "gpt-4o-mini"}
+
+def test_slow_primary_switches_to_fallback():
+    router = _router()
+    for _ in range(3):
+        assert router.select_model("verification_synthesis") == "gpt-4"
+        router.record("verification_synthesis", "gpt-4", 25.0, "ok")
+    assert router.select_model("verification_synthesis") == "gpt-4o-mini"
+    # Routes without a fallback never switch
+    router.record("query_generation", "gpt-4o-mini", 99.0, "timeout")
+    assert router.select_model("query_generation") == "gpt-4o-mini"
+
+def test_mock_calls_are_routed(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("SAGO_MODEL_ROUTES", json.dumps({"report": {"model": "gpt-4o", "max_tokens": 1500}}))
+    llm = LLMClient(api_key=None, rate_limiter=RateLimiter(60, 10000))
+    assert llm.router.routes["report"].model == "gpt-4o"
+    assert llm.router.routes["report"].timeout == 120
+
+    llm.chat_completion([{"role": "user", "content": "Summarize the verification findings"}], call_site="report")
+    assert llm.route_stats()["report"]["models"] == {"gpt-4o": 1}
+
+def test_async_client_is_shared_per_event_loop():
+    llm = LLMClient(api_key="test", rate_limiter=RateLimiter(60, 10000), cache=TieredCache(TTLCache()))
+
+    async def clients():
+        return llm.async_client, llm.async_client
+
+    first, again = asyncio.run(clients())
+    assert first is again
+    # A new loop must not reuse a pool bound to the closed one
+    second, _ = asyncio.run(clients())
+    assert second is not first
+    assert first not in LLMClient._async_clients.values()
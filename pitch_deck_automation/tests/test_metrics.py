@@ -0,0 +1,54 @@
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import metrics
+from src.utils.metrics import MetricsRegistry, MetricsServer, RunMetrics
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    calls = registry.counter("test_calls_total", "Calls.", ["site"])
+    latency = registry.histogram("test_latency_seconds", "Latency.", buckets=(0.1, 1))
+    calls.inc(site='say "hi"')
+    calls.inc(2, site='say "hi"')
+    latency.observe(0.5)
+
+    text = registry.render()
+
+    assert "# TYPE test_calls_total counter" in text
+    assert 'test_calls_total{site="say \\"hi\\""} 3.0' in text
+    assert 'test_latency_seconds_bucket{le="0.1"} 0.0' in text
+    assert 'test_latency_seconds_bucket{le="1"} 1.0' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 1.0' in text
+    assert "test_latency_seconds_count 1.0" in text
+
+def test_run_scope_follows_work_into_thread_pools():
+    run = RunMetrics()
+    with metrics.run_scope(run):
+        with metrics.stage("verification"):
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [
+                    metrics.submit(pool, metrics.record_llm_call, "query_generation", "mock", 0.0, 10, 5)
+                    for _ in range(3)
+                ]
+                for future in futures:
+                    future.result()
+        metrics.record_cache("search", hit=True)
+    metrics.record_llm_call("query_generation", "mock")  # outside the scope
+
+    snapshot = run.snapshot()
+    assert "verification" in snapshot["stages_ms"]
+    assert snapshot["llm_calls_total"] == 3
+    assert snapshot["llm_calls"]["query_generation"]["prompt_tokens"] == 30
+    assert snapshot["cache"]["search"]["hit"] == 1
+
+def test_metrics_endpoint_serves_registry():
+    registry = MetricsRegistry()
+    registry.gauge("test_depth", "Depth.").set(4)
+    server = MetricsServer(host="127.0.0.1", port=0, registry=registry)
+    server.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+            body = response.read().decode()
+        assert response.status == 200
+        assert "test_depth 4" in body
+    finally:
+        server.stop()
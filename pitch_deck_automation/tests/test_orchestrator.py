@@ -10,11 +10,15 @@ def mock_components():
          patch('src.main.PDFIngestor') as MockIngestor, \
          patch('src.main.ClaimExtractor') as MockExtractor, \
          patch('src.main.Verifier') as MockVerifier, \
+         patch('src.main.ClaimVerificationStore'), \
          patch('src.main.Analyst') as MockAnalyst, \
          patch('src.main.PortfolioManager') as MockPortfolio:
-        
+
+        MockDB.return_value.find_recent_analysis.return_value = None
+
         yield {
             'llm': MockLLM,
+            'db': MockDB,
             'ingestor': MockIngestor,
             'extractor': MockExtractor,
             'verifier': MockVerifier,
@@ -49,3 +53,132 @@ def test_run_success(mock_components):
         [{'statement': 'Claim 1', 'verification_status': 'Verified'}], 
         portfolio_context="Mock Context"
     )
+
+def test_verification_keeps_order_and_isolates_failures(mock_components):
+    orchestrator = AgentOrchestrator(max_concurrency=3, batch_size=1)
+
+    def fake_verify(claim):
+        if claim['statement'] == 'Claim 2':
+            raise RuntimeError("search down")
+        return {**claim, 'verification_status': 'Verified'}
+
+    orchestrator.verifier.verify_claim.side_effect = fake_verify
+    claims = [{'statement': f'Claim {i}'} for i in range(5)]
+
+    results = orchestrator._verify_claims(claims, max_concurrency=3)
+
+    assert [r['statement'] for r in results] == [c['statement'] for c in claims]
+    assert results[2]['verification_status'] == 'Error'
+    assert all(r['verification_status'] == 'Verified' for i, r in enumerate(results) if i != 2)
+
+def test_identical_deck_reuses_stored_analysis(mock_components):
+    orchestrator = AgentOrchestrator()
+    orchestrator.ingestor.fingerprint.return_value = "abc123"
+    orchestrator.db_client.find_recent_analysis.return_value = {
+        "metadata": {"fingerprint": "abc123"},
+        "analysis": {"claims": [{'statement': 'Claim 1'}], "final_report": "# Stored Report"}
+    }
+
+    result = orchestrator.run("dummy.pdf")
+
+    assert result['reused'] is True
+    assert result['report'] == "# Stored Report"
+    orchestrator.ingestor.extract_text.assert_not_called()
+
+    orchestrator.ingestor.extract_text.return_value = "Mock PDF Content"
+    forced = orchestrator.run("dummy.pdf", force=True)
+    assert forced['reused'] is False
+    orchestrator.ingestor.extract_text.assert_called_once()
+
+def test_failed_report_is_neither_saved_nor_reused(mock_components):
+    orchestrator = AgentOrchestrator(batch_size=1)
+    orchestrator.ingestor.fingerprint.return_value = "abc123"
+    orchestrator.db_client.find_recent_analysis.return_value = {
+        "metadata": {"fingerprint": "abc123"},
+        "analysis": {"claims": [], "final_report": "Error generating report."}
+    }
+    orchestrator.ingestor.extract_text.return_value = "Mock PDF Content"
+    orchestrator.extractor.extract_claims.return_value = [{'statement': 'Claim 1'}]
+    orchestrator.verifier.verify_claim.return_value = {'statement': 'Claim 1', 'verification_status': 'Verified'}
+    orchestrator.analyst.generate_report.return_value = "Error generating report."
+
+    result = orchestrator.run("dummy.pdf")
+
+    assert result['reused'] is False
+    orchestrator.ingestor.extract_text.assert_called_once()
+    orchestrator.db_client.save_analysis.assert_not_called()
+
+def test_runs_without_real_verification_are_neither_saved_nor_reused(mock_components):
+    orchestrator = AgentOrchestrator(batch_size=1)
+    orchestrator.ingestor.fingerprint.return_value = "abc123"
+    orchestrator.db_client.find_recent_analysis.return_value = {
+        "metadata": {"fingerprint": "abc123"},
+        "analysis": {"claims": [{'statement': 'Claim 1', 'verification_status': 'Unverified'}], "final_report": "# Old"}
+    }
+    orchestrator.ingestor.extract_text.return_value = "Mock PDF Content"
+    orchestrator.extractor.extract_claims.return_value = [{'statement': 'Claim 1'}]
+    orchestrator.verifier.verify_claim.return_value = {'statement': 'Claim 1', 'verification_status': 'Error'}
+    orchestrator.analyst.generate_report.return_value = "# Report"
+
+    # Every verification failed, e.g. during a search outage
+    result = orchestrator.run("dummy.pdf")
+    assert result['reused'] is False
+    orchestrator.db_client.save_analysis.assert_not_called()
+
+    # Mock-mode output is never stored, even when it looks successful
+    orchestrator.verifier.verify_claim.return_value = {'statement': 'Claim 1', 'verification_status': 'Verified'}
+    orchestrator.llm_client.client = None
+    assert orchestrator.run("dummy.pdf")['reused'] is False
+    orchestrator.db_client.save_analysis.assert_not_called()
+
+def test_streamed_run_publishes_verdicts_then_sections(mock_components):
+    orchestrator = AgentOrchestrator(batch_size=1)
+    orchestrator.ingestor.extract_text.return_value = "Mock PDF Content"
+    orchestrator.portfolio_manager.get_context.return_value = "Mock Context"
+    orchestrator.extractor.extract_claims.return_value = [{'statement': 'Claim 1'}]
+    orchestrator.verifier.verify_claim.return_value = {'statement': 'Claim 1', 'verification_status': 'Verified'}
+    orchestrator.analyst.verdict_table.return_value = "| Claim 1 | Verified |\n"
+    orchestrator.analyst.stream_report.return_value = iter(["# Memo\n", "## Risks\nNone\n"])
+
+    updates = []
+    result = orchestrator.run("dummy.pdf", on_update=updates.append)
+
+    assert updates == [
+        "| Claim 1 | Verified |\n",
+        "| Claim 1 | Verified |\n\n# Memo\n",
+        "| Claim 1 | Verified |\n\n# Memo\n## Risks\nNone\n"
+    ]
+    assert result['report'] == "# Memo\n## Risks\nNone\n"
+    assert result['metrics']['time_to_first_content_ms'] is not None
+    orchestrator.analyst.generate_report.assert_not_called()
+
+def test_expired_deadline_reports_unchecked_claims(mock_components):
+    orchestrator = AgentOrchestrator()
+    orchestrator.ingestor.extract_text.return_value = "Mock PDF Content"
+    orchestrator.portfolio_manager.get_context.return_value = "Mock Context"
+    orchestrator.extractor.extract_claims.return_value = [{'statement': 'Claim 1', 'category': 'Financials'}]
+    orchestrator.analyst.generate_report.return_value = "# Final Report"
+
+    # A zero deadline, as a string from an event payload, has already expired
+    result = orchestrator.run("dummy.pdf", deadline_seconds="0")
+
+    assert result['status'] == 'success'
+    assert result['claims'][0]['verification_status'] == "Not checked (budget)"
+    assert result['budget']['not_checked'] == 1
+    orchestrator.verifier.verify_claim.assert_not_called()
+    orchestrator.analyst.generate_report.assert_called_once()
+
+def test_invalid_limits_are_rejected(mock_components):
+    orchestrator = AgentOrchestrator()
+    with pytest.raises(ValueError):
+        orchestrator.run("dummy.pdf", max_llm_calls="lots")
+
+def test_errors_report_whether_a_retry_can_help(mock_components):
+    orchestrator = AgentOrchestrator()
+
+    orchestrator.ingestor.fingerprint.side_effect = FileNotFoundError("PDF file not found at: gone.pdf")
+    assert orchestrator.run("gone.pdf")["retryable"] is False
+
+    orchestrator.ingestor.fingerprint.side_effect = TimeoutError("search backend timed out")
+    result = orchestrator.run("deck.pdf")
+    assert result["status"] == "error" and result["retryable"] is True
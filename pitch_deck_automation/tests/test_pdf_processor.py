@@ -0,0 +1,40 @@
+import logging
+import pytest
+from unittest.mock import patch
+from reportlab.lib.pagesizes import LETTER
+from reportlab.pdfgen import canvas
+from src.ingestion.pdf_processor import PDFIngestor, PAGE_BREAK
+
+@pytest.fixture
+def deck_path(tmp_path):
+    path = tmp_path / "deck.pdf"
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    for i in range(1, 7):
+        if i != 4:  # page 4 is left blank
+            c.drawString(100, 700, f"Slide {i}: We grew revenue {i * 10}% last quarter.")
+        c.showPage()
+    c.save()
+    return str(path)
+
+def test_parallel_extraction_matches_serial(deck_path):
+    serial = PDFIngestor.extract_pages(deck_path, parallel=False)
+    parallel = PDFIngestor.extract_pages(deck_path, parallel=True, max_workers=2)
+
+    assert [p["page"] for p in parallel] == list(range(1, 7))
+    assert [p["text"] for p in parallel] == [p["text"] for p in serial]
+    assert parallel[3]["text"] == ""
+    assert all(p["elapsed_ms"] >= 0 for p in parallel)
+
+def test_extract_text_keeps_one_segment_per_page(deck_path):
+    segments = PDFIngestor.extract_text(deck_path).split(PAGE_BREAK)
+    assert len(segments) == 6
+    assert "Slide 1" in segments[0] and "Slide 6" in segments[5]
+    assert segments[3] == ""  # the blank page keeps its place
+
+def test_pool_failure_falls_back_and_logs_serial(deck_path, caplog):
+    with patch.object(PDFIngestor, "_extract_parallel", side_effect=OSError("no semaphores")), \
+            caplog.at_level(logging.INFO, logger="src.ingestion.pdf_processor"):
+        pages = PDFIngestor.extract_pages(deck_path, parallel=True)
+
+    assert len(pages) == 6
+    assert "Extracted 6 pages (serial)" in caplog.text
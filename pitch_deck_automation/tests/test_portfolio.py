@@ -1,5 +1,6 @@
 import pytest
 from src.analysis.portfolio_manager import PortfolioManager
+from src.analysis.keyword_matcher import KeywordMatcher
 
 def test_portfolio_context_retrieval():
     pm = PortfolioManager()
@@ -20,3 +21,59 @@ def test_conflict_detection():
     # Should NOT detect conflict
     conflicts_idx = pm.check_conflict("Agriculture")
     assert len(conflicts_idx) == 0
+
+    # Partial sector names match, as they always have
+    assert any("GreenGrid" in c for c in pm.check_conflict("Climate"))
+    assert any("DocuFlow" in c for c in pm.check_conflict("saas"))
+
+def test_context_is_limited_to_relevant_companies(tmp_path):
+    pm = PortfolioManager(index_path=str(tmp_path / "portfolio"), top_k=2)
+    pm.add_companies([
+        {"name": f"Filler{i}", "sector": "Consumer", "description": f"Pet grooming marketplace number {i}"}
+        for i in range(200)
+    ])
+    pm.add_thesis_document("climate", "Climate memo", "We back grid software that cuts energy waste.")
+
+    context = pm.get_context(query_text="AI that optimizes the energy grid for utilities")
+
+    assert "GreenGrid" in context
+    assert context.count("Filler") <= 1
+    assert "Climate memo" in context
+
+def test_index_persists_and_supports_incremental_adds(tmp_path):
+    path = str(tmp_path / "portfolio")
+    pm = PortfolioManager(index_path=path)
+    pm.add_companies([{"name": "RoboSort", "sector": "Climate Tech", "description": "Robotic recycling sorting lines"}])
+    pm.save()
+
+    reloaded = PortfolioManager(index_path=path)
+    assert any(co["name"] == "RoboSort" for co in reloaded.portfolio_companies)
+    assert "RoboSort" in reloaded.get_context(query_text="waste recycling robots")
+
+    reloaded.add_companies([{"name": "RoboSort", "sector": "Climate Tech", "description": "Compost analytics"}])
+    assert len(reloaded.index) == 4
+    assert "RoboSort" in reloaded.get_context(query_text="compost analytics")
+
+def test_keyword_matcher_finds_whole_words_in_one_pass():
+    matcher = KeywordMatcher()
+    for term, payload in [("ai", "A"), ("climate tech", "B"), ("tech", "C"), ("he", "D")]:
+        matcher.add(term, payload)
+
+    found = [(m[2], "Our Climate Tech platform uses AI. Email us."[m[0]:m[1]])
+             for m in matcher.find_all("Our Climate Tech platform uses AI. Email us.")]
+
+    assert found == [("B", "Climate Tech"), ("C", "Tech"), ("A", "AI")]
+
+def test_deck_conflicts_and_memoized_context(tmp_path):
+    pm = PortfolioManager(index_path=str(tmp_path / "portfolio"))
+    deck = "We sell developer tooling. Unlike CloudScale we focus on legal document automation for B2B SaaS teams."
+
+    assert [c["company"] for c in pm.find_conflicts(deck)] == ["CloudScale", "DocuFlow"]
+
+    first = pm.get_context(query_text="legal automation")
+    assert pm.get_context(query_text="legal automation") is first
+    pm.add_companies([{"name": "LexBot", "sector": "Vertical AI", "description": "Legal automation copilots",
+                       "keywords": ["developer tooling"]}])
+    refreshed = pm.get_context(query_text="legal automation", deck_text=deck)
+    assert "LexBot" in refreshed
+    assert "## Detected Portfolio Overlaps" in refreshed and "- LexBot (deck mentions 'developer tooling')" in refreshed
@@ -0,0 +1,44 @@
+import json
+from src.utils.prompt_budget import compact_claims, count_tokens, truncate_to_tokens
+
+CLAIMS = [
+    {
+        "statement": f"Claim number {i} about market size reaching ${i}B by 2030.",
+        "category": "Market Size",
+        "confidence_score": 0.9,
+        "verification_status": "Contradicted",
+        "reasoning": "Several independent market research reports put the figure far lower. " * 5,
+        "sources": [f"https://example.com/report-{i}-{j}" for j in range(4)],
+    }
+    for i in range(10)
+]
+
+def test_truncate_to_tokens_respects_budget():
+    text = "The global waste management market is projected to grow quickly. " * 50
+    cut = truncate_to_tokens(text, 20, marker="...")
+    assert count_tokens(cut) <= 20
+    assert cut.endswith("...")
+    assert truncate_to_tokens("short", 20) == "short"
+
+def test_compact_claims_fits_budget_and_reports_savings():
+    serialized, stats = compact_claims(CLAIMS, max_tokens=400)
+
+    assert stats["final_tokens"] <= 400
+    assert stats["saved_tokens"] == stats["original_tokens"] - stats["final_tokens"]
+    data = json.loads(serialized)
+    assert all("sources" not in c for c in data if "statement" in c)
+
+def test_compact_claims_keeps_detail_when_budget_allows():
+    serialized, _ = compact_claims(CLAIMS[:1], max_tokens=10000)
+    assert json.loads(serialized)[0]["sources"] == CLAIMS[0]["sources"]
+
+def test_compact_claims_omits_verified_before_contradicted():
+    claims = [dict(c, verification_status="Verified", statement=f"Verified claim {i}") for i, c in enumerate(CLAIMS[:6])]
+    claims.append(dict(CLAIMS[6], statement="Churn is below 1% a month."))
+    serialized, stats = compact_claims(claims, max_tokens=120)
+
+    assert stats["final_tokens"] <= 120
+    data = json.loads(serialized)
+    kept = [c["statement"] for c in data if "statement" in c]
+    assert "Churn is below 1% a month." in kept
+    assert data[-1]["omitted_claims"] == len(claims) - len(kept) > 0
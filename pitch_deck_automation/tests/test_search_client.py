@@ -0,0 +1,42 @@
+import time
+import threading
+from unittest.mock import patch
+from src.utils.cache import TTLCache, TieredCache
+from src.utils.search_client import SearchClient, normalize_query
+
+def test_normalize_query_ignores_case_punctuation_and_stopwords():
+    assert normalize_query("Waste management market size 2030") == \
+        normalize_query("the  waste management market size, 2030?")
+    assert normalize_query("Acme acquired Beta") != normalize_query("Beta acquired Acme")
+    assert normalize_query("market size") != normalize_query("market market size")
+
+def test_equivalent_queries_hit_cache():
+    with patch('duckduckgo_search.DDGS') as MockDDGS:
+        MockDDGS.return_value.text.return_value = [{"title": "t", "body": "b", "href": "h"}]
+        client = SearchClient(cache=TieredCache(TTLCache(ttl_seconds=60)))
+
+        first = client.search("Waste Management market size 2030")
+        second = client.search("the waste management market  size, 2030?")
+
+    assert first == second
+    assert MockDDGS.return_value.text.call_count == 1
+
+def test_concurrent_requests_collapse_into_one_fetch():
+    def slow_text(query, max_results):
+        time.sleep(0.1)
+        return [{"title": query, "body": "b", "href": "h"}]
+
+    with patch('duckduckgo_search.DDGS') as MockDDGS:
+        MockDDGS.return_value.text.side_effect = slow_text
+        client = SearchClient(cache=TieredCache(TTLCache(ttl_seconds=60)))
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(client.search("EcoStream WM partnership")))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert len(results) == 5
+    assert MockDDGS.return_value.text.call_count == 1
@@ -0,0 +1,140 @@
+import json
+import time
+from collections import deque
+import pytest
+from unittest.mock import MagicMock
+from src.analysis.verifier import (
+    Verifier, VerificationPipeline, VerificationBudget, VerificationScheduler, NOT_CHECKED_STATUS, parse_budget_limits
+)
+from src.utils import metrics
+from src.utils.llm_client import LLMClient
+from src.utils.rate_limiter import RateLimiter
+
+CLAIMS = [
+    {"statement": "The global waste management market is projected to reach $2000 Trillion by 2030."},
+    {"statement": "Partnered with Waste Management Inc (WM)."},
+    {"statement": "Generated $5M in ARR in our first year."},
+    {"statement": "We are the only company using AI for waste sorting."},
+]
+
+def _search():
+    search = MagicMock()
+    search.search.return_value = [{"title": "t", "body": "b", "href": "https://example.com"}]
+    return search
+
+def test_verify_claims_batches_llm_calls(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    llm = LLMClient(api_key=None, rate_limiter=RateLimiter(600, 100000))
+    llm.chat_completion = MagicMock(wraps=llm.chat_completion)
+
+    results = Verifier(llm, _search()).verify_claims([dict(c) for c in CLAIMS], batch_size=2)
+
+    # 1 query call + 2 synthesis batches instead of 2 calls per claim
+    assert llm.chat_completion.call_count == 3
+    assert [r["verification_status"] for r in results] == ["Contradicted", "Verified", "Inconclusive", "Contradicted"]
+
+def test_malformed_batch_falls_back_per_claim():
+    llm = MagicMock()
+
+    def respond(messages, json_mode=False, **kwargs):
+        prompt = messages[-1]["content"]
+        if "For each claim below" in prompt:
+            return json.dumps({"claims": [{"id": 0, "queries": ["q0"]}, {"id": 1, "queries": ["q1"]}]})
+        if "verify each claim" in prompt:
+            return json.dumps({"verdicts": [{"id": 0, "verification_status": "Verified", "reasoning": "ok"}]})
+        return json.dumps({"verification_status": "Inconclusive", "reasoning": "single", "sources": []})
+
+    llm.chat_completion.side_effect = respond
+    results = Verifier(llm, _search()).verify_claims([dict(c) for c in CLAIMS[:2]], batch_size=5)
+
+    assert results[0]["verification_status"] == "Verified"
+    assert results[1]["reasoning"] == "single"
+
+def test_failed_batch_only_errors_its_own_claims(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    verifier = Verifier(LLMClient(api_key=None, rate_limiter=RateLimiter(600, 100000)), _search())
+    synthesize = verifier._synthesize_verification_batch
+
+    def flaky(statements, search_results):
+        if statements[0] == CLAIMS[0]["statement"]:
+            raise RuntimeError("upstream 500")
+        return synthesize(statements, search_results)
+
+    verifier._synthesize_verification_batch = flaky
+    results = verifier.verify_claims([dict(c) for c in CLAIMS], batch_size=2)
+
+    assert [r["verification_status"] for r in results] == ["Error", "Error", "Inconclusive", "Contradicted"]
+    assert "upstream 500" in results[0]["reasoning"]
+
+def test_pipeline_results_follow_the_final_claim_list():
+    verifier = MagicMock()
+    verifier.verify_claim.side_effect = lambda claim: {**claim, "verification_status": "Verified"}
+    verifier.verify_claims.side_effect = lambda claims, **kw: [{**c, "verification_status": "Contradicted"} for c in claims]
+
+    pipeline = VerificationPipeline(verifier, max_workers=2, batch_size=2)
+    pipeline.submit({"statement": "A", "confidence_score": 0.5})
+    pipeline.submit({"statement": "B"})
+    pipeline.submit({"statement": "Dropped later"})
+    results = pipeline.results([{"statement": "B"}, {"statement": "A", "confidence_score": 0.9}, {"statement": "C"}])
+    pipeline.close()
+
+    assert [r["statement"] for r in results] == ["B", "A", "C"]
+    assert results[1] == {"statement": "A", "confidence_score": 0.9, "verification_status": "Contradicted"}
+    # C was never streamed; it is verified with the leftover claim after extraction
+    assert results[2]["verification_status"] == "Contradicted"
+    assert verifier.verify_claims.call_count == 2
+
+def test_scheduler_verifies_priority_claims_within_budget(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    llm = LLMClient(api_key=None, rate_limiter=RateLimiter(600, 100000))
+    claims = [
+        {**CLAIMS[3], "category": "Competitors", "confidence_score": 0.8},
+        {**CLAIMS[1], "category": "Traction", "confidence_score": 1.0},
+        {**CLAIMS[0], "category": "Market Size", "confidence_score": 0.95},
+        {**CLAIMS[2], "category": "Financials", "confidence_score": 0.9},
+    ]
+
+    # Two claims' worth of calls when each claim is verified on its own
+    budget = VerificationBudget(max_llm_calls=4)
+    with metrics.run_scope(metrics.RunMetrics()):
+        results = VerificationScheduler(Verifier(llm, _search()), budget, max_workers=1, batch_size=1).verify(claims)
+
+    assert [r["statement"] for r in results] == [c["statement"] for c in claims]
+    assert [r["verification_status"] for r in results] == [NOT_CHECKED_STATUS, NOT_CHECKED_STATUS, "Contradicted", "Inconclusive"]
+
+    expired = VerificationBudget(deadline=time.time() - 1)
+    results = VerificationScheduler(Verifier(llm, _search()), expired).verify([dict(c) for c in claims])
+    assert all(r["verification_status"] == NOT_CHECKED_STATUS for r in results)
+
+def test_scheduler_reuses_budget_that_finished_units_did_not_spend(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    llm = LLMClient(api_key=None, rate_limiter=RateLimiter(600, 100000))
+    claims = [{"statement": f"Competitor {i} has {i + 10} enterprise customers.", "category": "Competitors"}
+              for i in range(10)]
+
+    # The first batch of 4 reserves all 10 calls but uses 2; the rest must go to later units
+    with metrics.run_scope(metrics.RunMetrics()):
+        scheduler = VerificationScheduler(Verifier(llm, _search()), VerificationBudget(max_llm_calls=10),
+                                          max_workers=2, batch_size=5)
+        results = scheduler.verify(claims)
+        llm_used, _ = scheduler._usage()
+
+    checked = [r for r in results if r["verification_status"] != NOT_CHECKED_STATUS]
+    assert len(checked) > 4
+    assert llm_used <= 10
+
+def test_scheduler_charges_batches_their_worst_case():
+    scheduler = VerificationScheduler(MagicMock(), VerificationBudget(max_llm_calls=9), batch_size=5)
+    queue = deque(range(10))
+
+    # A batch of n claims can cost 2 + 2n calls if it falls back per claim, so only 3 fit in 9
+    assert scheduler._next_unit(queue, (0, 0), (0, 0)) == [0, 1, 2]
+    assert scheduler._next_unit(queue, (0, 0), (8, 0)) is None
+    assert scheduler._next_unit(queue, (0, 0), (6, 0)) == [3]
+
+def test_parse_budget_limits():
+    assert parse_budget_limits("30", "10", None) == (30.0, 10, None)
+    assert parse_budget_limits(0, -5, 2.0) == (0.0, 0, 2)
+    for bad in ("soon", float("nan"), [1]):
+        with pytest.raises(ValueError):
+            parse_budget_limits(deadline_seconds=bad)